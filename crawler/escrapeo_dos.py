@@ -3,12 +3,23 @@ import pandas as pd # Manejo de CSV y DataFrames
 import re    # Expresiones regulares para patrones
 import asyncio # Manejo de tareas asíncronas
 from crawl4ai import CrawlerHub # Crawler para scraping rápido
-from googlesearch import search  # Búsqueda de URLs oficiales
 from tqdm.asyncio import tqdm_asyncio # Barra de progreso en tareas asíncronas
 import aiohttp # Manejo de solicitudes HTTP asíncronas
-
-from playwright.sync_api import sync_playwright # Renderizado de páginas con JavaScript
-from bs4 import BeautifulSoup # Parsing de HTML
+import os, sys # Ruta para importar contact_extractor de logs/
+import argparse # Opción --resume
+
+# Renderizado de páginas con JavaScript reutilizando Chromium (pool en scraping_comun/navegador.py)
+from scraping_comun.navegador import obtener_html_renderizado_async, cerrar_pool
+from scraping_comun.cache_http import cacheado_async
+from scraping_comun.busqueda import buscar # Búsqueda de URLs oficiales con caché persistente
+from scraping_comun.motor_contacto import analizar_documento, buscar_clave, texto_visible # Parseo (lxml/selectolax) y extracción en una sola pasada
+# Parseo y logs fuera del event loop (hilos, o N procesos con configurar_parseo(N)) y selección de campos
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs"))
+from contact_extractor import EJECUTORES, VALORES_VACIOS, contacto_de_documento, escribir_log
+from scraping_comun.prefiltro_render import clasificar, registrar_decision # Decide si hace falta Playwright mirando el HTML crudo
+from scraping_comun.mini_crawler import rastrear_contacto # Home y, si faltan campos, páginas de contacto enlazadas
+from scraping_comun.checkpoint import abrir_checkpoint, guardar_registro, exportar_csv # Resultados en JSONL a medida que terminan
+from scraping_comun.indice_cif import normalizar_cif
 
 # Advertencia para ignorar SyntaxWarnings (no afecta al funcionamiento, pero limpia la salida)
 # Esto es útil si se usan versiones de librerías que generan estas advertencias.
@@ -16,20 +27,9 @@ import warnings    # Limpieza de salida en consola
 warnings.filterwarnings("ignore", category=SyntaxWarning)
 
 # ─── Configuración inicial ─────────────────────────────────────────────────────
-def obtener_html_renderizado(url):
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        page.goto(url, timeout=60000)
-        page.wait_for_timeout(3000)  # espera carga JS
-        html = page.content()
-        browser.close()
-        return html
-    
-# ─── Obtener HTML renderizado ────────────────────────────────────────────────
-html = obtener_html_renderizado("https://www.acciona.com/es/soluciones/agua")  # usa playwright
-soup = BeautifulSoup(html, "html.parser")  # ahora sí, con contenido dinámico
-texto = soup.get_text(separator=" ", strip=True)
+# El renderizado usa el pool asíncrono de scraping_comun/navegador.py dentro del mismo event loop:
+# un Playwright síncrono abierto a nivel de módulo impediría después el asyncio.run
+URL_EJEMPLO = "https://www.acciona.com/es/soluciones/agua"
 
 
 
@@ -60,7 +60,7 @@ if not REQUIRED_COLS.issubset(df.columns):
 def buscar_url(nombre_empresa):
     query = f"{nombre_empresa} sitio oficial España"
     try:
-        resultados = list(search(query, num_results=5))
+        resultados = buscar(query, num_resultados=5)
         return resultados[0] if resultados else "No encontrada"
     except Exception:
         return " Error en búsqueda"
@@ -69,17 +69,9 @@ def buscar_url(nombre_empresa):
 crawler = CrawlerHub()
 
 # ─── Función para buscar por palabra clave ──────────────────────────────────
-# con playwright
-def buscar_por_palabra_clave(soup, clave):
-    etiquetas = soup.find_all(string=re.compile(clave, re.IGNORECASE))
-
-    for etiqueta in etiquetas:
-        padre = etiqueta.find_parent()
-        if padre:
-            texto = padre.get_text(strip=True)
-            if len(texto) > 5 and len(texto) < 150:
-                return texto
-    return " Error"
+# con playwright; recibe el HTML y lo parsea con el parser de motor_contacto
+def buscar_por_palabra_clave(html, clave):
+    return buscar_clave(html, clave)
 
 # ─── Funciones de extracción ──────────────────────────────────────────────────
 def extraer_direccion(texto):
@@ -132,77 +124,117 @@ def extraer_email(texto):
 
     return " No encontrado"
 
+# Log de este script (contact_extractor escribe por defecto en logs_scraping.txt)
+RUTA_LOG = "logs_errores_scraping.txt"
+
 # ─── Función asíncrona principal ──────────────────────────────────────────────
-async def extraer_contacto_async(url):
-    try:
-        html = await crawler.fetch(url)
-        texto = crawler.extract_text(html)
-
-        # Si el texto es muy corto, usar playwright como fallback, solo si el contenido extraído es insuficiente (<500 caracteres).
-        if len(texto.strip()) < 500:
-            html = obtener_html_renderizado(url)
-            soup = BeautifulSoup(html, "html.parser")
-            texto = soup.get_text(separator=" ", strip=True)
-        else:
-            soup = BeautifulSoup(html, "html.parser")
+async def descargar(url):
+    return await cacheado_async(url, lambda: crawler.fetch(url), "crawlerhub")
+
+async def extraer_campos_async(url, html):
+    loop = asyncio.get_running_loop()
+    # Un solo parseo sirve para el prefiltro de render y para extraer el contacto
+    documento, renderizar, motivo = await loop.run_in_executor(EJECUTORES["parseo"], clasificar, html)
+    await loop.run_in_executor(
+        EJECUTORES["log"], registrar_decision, url, renderizar, motivo, len(documento["texto"])
+    )
 
-        direccion = buscar_por_palabra_clave(soup, "Dirección|Dónde estamos")
-        telefono = buscar_por_palabra_clave(soup, "Teléfono|Llámanos")
-        email = buscar_por_palabra_clave(soup, "Email|Correo")
-        if email == " Error":
-            email = buscar_email_regex(texto)
+    # Playwright como fallback solo si el HTML crudo indica contenido pintado por JavaScript
+    # (raíz SPA vacía, noscript, mucho script y poco texto); no en páginas cortas pero completas
+    # ni en páginas de error. El renderizado usa el pool asíncrono: no detiene las demás descargas.
+    if renderizar:
+        html = await obtener_html_renderizado_async(url)
+        documento = await loop.run_in_executor(EJECUTORES["parseo"], analizar_documento, html)
+
+    direccion, telefono, email = contacto_de_documento(documento)
+
+    await loop.run_in_executor(
+        EJECUTORES["log"], escribir_log,
+        f"{url} → Dirección: {direccion != ' Error'}, "
+        f"Teléfono: {telefono != ' Error'}, "
+        f"Email: {email != ' Error'}\n",
+        RUTA_LOG,
+    )
 
-        with open("logs_errores_scraping.txt", "a", encoding="utf-8") as f:
-            f.write(f"{url} → Dirección: {direccion != ' Error'}, "
-                    f"Teléfono: {telefono != ' Error'}, "
-                    f"Email: {email != ' Error'}\n")
+    # Para el mini-crawler, los marcadores de "no encontrado" pasan a None (campo pendiente)
+    campos = {"direccion": direccion, "telefono": telefono, "email": email}
+    return {campo: None if valor in VALORES_VACIOS else valor for campo, valor in campos.items()}, html
 
-        return direccion, telefono, email
+async def extraer_contacto_async(url):
+    # Primero la home; solo si falta algún campo se visitan (como mucho 3) páginas de
+    # contacto, aviso legal o quiénes somos enlazadas desde ella, hasta completar los tres
+    try:
+        html = await descargar(url)
+        campos, _ = await rastrear_contacto(url, html, extraer_campos_async, descargar)
+        return campos["direccion"] or " Error", campos["telefono"] or " Error", campos["email"] or " Error"
 
     except Exception:
         return " Error", " Error", " Error"
 
 # ─── Procesamiento asíncrono ──────────────────────────────────────────────────
-async def procesar_empresas_async(df):
+# Cada empresa terminada se añade al checkpoint: un corte no pierde lo ya hecho y
+# con reanudar=True se saltan los CIF que ya están en él
+RUTA_CHECKPOINT = "contacto_empresas_es_2.jsonl"
+
+async def procesar_empresas_async(df, ruta_checkpoint=RUTA_CHECKPOINT, reanudar=False):
+    checkpoint, hechas = abrir_checkpoint(ruta_checkpoint, reanudar)
+
     async def procesar_fila(row):
         nombre = row["NOMBRE_CORREGIDO_FINAL_MANUAL_NORMALIZADO"]
         cif = row["CIF"]
-        url = buscar_url(nombre)
+        url = await asyncio.to_thread(buscar_url, nombre)  # no bloquea el loop en consultas reales
 
         if url not in [" No encontrada", " Error en búsqueda"]:
             direccion, telefono, email = await extraer_contacto_async(url)
         else:
             direccion, telefono, email = " No disponible", " No disponible", " No disponible"
 
-        return {
+        guardar_registro(checkpoint, {
             "Empresa": nombre,
             "CIF": cif,
             "URL": url,
             "Dirección": direccion,
             "Teléfono": telefono,
             "Email": email
-        }
+        })
 
-    tareas = [procesar_fila(row) for _, row in df.iterrows()]
-    resultados = await tqdm_asyncio.gather(*tareas, desc="Procesando empresas")
-    return resultados
+    tareas = [procesar_fila(row) for _, row in df.iterrows() if normalizar_cif(row["CIF"]) not in hechas]
+    try:
+        await tqdm_asyncio.gather(*tareas, desc="Procesando empresas")
+    finally:
+        checkpoint.close()
+        await cerrar_pool()  # cierra los navegadores del pool de renderizado
+    return ruta_checkpoint
 
 
 def buscar_email_regex(texto):
     match = re.search(r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+", texto)
     return match.group(0) if match else " Error"
 
-# Ejemplo de uso
-direccion = buscar_por_palabra_clave(soup, "Dirección|Dónde estamos")
-telefono = buscar_por_palabra_clave(soup, "Teléfono|Llámanos")
-email = buscar_por_palabra_clave(soup, "Email|Correo")
-if email == " Error":
-    email = buscar_email_regex(texto)
+# Ejemplo de uso (renderizado con el pool asíncrono)
+async def ejemplo_de_uso(url=URL_EJEMPLO):
+    html = await obtener_html_renderizado_async(url)  # usa playwright
+    texto = texto_visible(html)  # con contenido dinámico (parser PARSER_HTML)
+    direccion = buscar_por_palabra_clave(html, "Dirección|Dónde estamos")
+    telefono = buscar_por_palabra_clave(html, "Teléfono|Llámanos")
+    email = buscar_por_palabra_clave(html, "Email|Correo")
+    if email == " Error":
+        email = buscar_email_regex(texto)
+    return direccion, telefono, email
+
+async def main(reanudar=False):
+    # Ejemplo y flujo principal en el mismo loop; procesar_empresas_async cierra el pool al terminar
+    print("Ejemplo:", await ejemplo_de_uso())
+    return await procesar_empresas_async(df, reanudar=reanudar)
 
 
 # ─── Ejecutar flujo principal ─────────────────────────────────────────────────
 if __name__ == "__main__":
-    resultados = asyncio.run(procesar_empresas_async(df))
-    df_resultado = pd.DataFrame(resultados)
-    df_resultado.to_csv("contacto_empresas_es_2.csv", index=False)
+    parser = argparse.ArgumentParser(description="Escrapeo híbrido de contacto de empresas")
+    parser.add_argument("--resume", action="store_true", help=f"continúa desde {RUTA_CHECKPOINT} saltando los CIF ya hechos")
+    args = parser.parse_args()
+
+    # El CSV final se construye desde el checkpoint
+    ruta_checkpoint = asyncio.run(main(args.resume))
+    exportar_csv(ruta_checkpoint, "contacto_empresas_es_2.csv", ["Empresa", "CIF", "URL", "Dirección", "Teléfono", "Email"])
     print("Datos guardados en contacto_empresas_es_2.csv")
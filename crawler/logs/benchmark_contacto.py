@@ -0,0 +1,128 @@
+# Librerías para medir páginas/segundo de la extracción de contacto contra un servidor local
+import argparse
+import asyncio
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Caché HTTP propia del benchmark: no lee renders de ejecuciones anteriores (falsearía
+# las páginas/s) ni llena la caché real con las páginas del servidor de prueba
+CACHE_TEMPORAL = tempfile.TemporaryDirectory(prefix="benchmark_contacto_")
+os.environ["CACHE_HTTP"] = os.path.join(CACHE_TEMPORAL.name, "cache_http.sqlite")
+
+import aiohttp
+from playwright.sync_api import sync_playwright
+import contact_extractor
+from contact_extractor import analizar_html, escribir_log, completar_contacto_async
+from scraping_utils import cerrar_pool
+
+LATENCIA_S = 0.05  # latencia simulada de red por respuesta
+
+# ─── Servidor de prueba: páginas estáticas largas y páginas que se rellenan con JS ───
+PARRAFO = "<p>Servicios de ingeniería, mantenimiento y obra civil para clientes públicos y privados.</p>"
+CONTACTO = ("<div><h3>Dirección: Calle Mayor 12, 28013 Madrid</h3><span>Teléfono: +34 912 345 678</span>"
+            "<span>Email: info{i}@empresa.es</span></div>")
+
+def pagina_estatica(i):
+    return f"<html><body>{PARRAFO * 400}{CONTACTO.format(i=i)}</body></html>"
+
+def pagina_dinamica(i):
+    contenido = (PARRAFO * 20 + CONTACTO.format(i=i)).replace('"', '\\"')
+    return f'<html><body><div id="app"></div><script>document.getElementById("app").innerHTML = "{contenido}";</script></body></html>'
+
+class Manejador(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(LATENCIA_S)
+        tipo, _, numero = self.path.strip("/").partition("/")
+        cuerpo = (pagina_dinamica if tipo == "dinamica" else pagina_estatica)(int(numero or 0)).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+def iniciar_servidor():
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}"
+
+# ─── Versión anterior: render con un Chromium nuevo por URL, parseo y log en el loop ───
+def renderizar_lanzando_chromium(url):
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        page.goto(url, timeout=60000)
+        page.wait_for_timeout(3000)
+        html = page.content()
+        browser.close()
+        return html
+
+HILO_RENDER = ThreadPoolExecutor(max_workers=1)  # la API síncrona no puede usarse dentro del loop
+
+async def completar_contacto_bloqueante(url, html, texto, ruta_log):
+    if len(texto.strip()) < 500:
+        html = HILO_RENDER.submit(renderizar_lanzando_chromium, url).result()  # bloquea el loop
+        texto = None
+    direccion, telefono, email = analizar_html(html, texto)
+    escribir_log(f"{url} | Dirección: {direccion != ' Error'}\n", ruta_log)
+    return direccion, telefono, email
+
+async def completar_contacto_no_bloqueante(url, html, texto, ruta_log):
+    return await completar_contacto_async(url, html)
+
+# ─── Medición ────────────────────────────────────────────────────────────────
+async def medir(urls, completar, concurrencia, ruta_log):
+    semaforo = asyncio.Semaphore(concurrencia)
+    conector = aiohttp.TCPConnector(limit=concurrencia)
+
+    async with aiohttp.ClientSession(connector=conector) as session:
+        async def procesar(url):
+            async with semaforo:
+                async with session.get(url) as respuesta:
+                    html = await respuesta.text()
+                texto = re.sub(r"<[^>]+>", " ", html)
+                return await completar(url, html, texto, ruta_log)
+
+        inicio = time.perf_counter()
+        resultados = await asyncio.gather(*(procesar(url) for url in urls))
+        return resultados, time.perf_counter() - inicio
+
+async def main(paginas, proporcion_dinamicas, concurrencia, procesos):
+    servidor, base = iniciar_servidor()
+    dinamicas = int(paginas * proporcion_dinamicas)
+    urls = [f"{base}/dinamica/{i}" for i in range(dinamicas)] + [f"{base}/estatica/{i}" for i in range(dinamicas, paginas)]
+    contact_extractor.configurar_parseo(procesos)
+    print(f"Páginas: {paginas} ({dinamicas} con JS) | concurrencia: {concurrencia} | procesos de parseo: {procesos or 0}")
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta_log = os.path.join(carpeta, "logs_scraping.txt")
+        os.chdir(carpeta)
+        try:
+            esperado, segundos = await medir(urls, completar_contacto_bloqueante, concurrencia, ruta_log)
+            print(f"{'bloqueante (antes)':<28} {paginas / segundos:8.1f} páginas/s")
+
+            obtenido, segundos = await medir(urls, completar_contacto_no_bloqueante, concurrencia, ruta_log)
+            print(f"{'asíncrono (pool + ejecutor)':<28} {paginas / segundos:8.1f} páginas/s")
+            assert obtenido == esperado, "Los resultados difieren entre versiones"
+        finally:
+            await cerrar_pool()
+            contact_extractor.configurar_parseo(None)
+            servidor.shutdown()
+
+    print("✅ Resultados idénticos")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de extraer_contacto_async contra un servidor local")
+    parser.add_argument("--paginas", type=int, default=200)
+    parser.add_argument("--dinamicas", type=float, default=0.2, help="proporción de páginas que requieren JS")
+    parser.add_argument("--concurrencia", type=int, default=16)
+    parser.add_argument("--procesos", type=int, default=0, help="procesos para el parseo (0 = hilos)")
+    args = parser.parse_args()
+    asyncio.run(main(args.paginas, args.dinamicas, args.concurrencia, args.procesos))
@@ -0,0 +1,261 @@
+# Librerías para comparar el motor de una pasada con las funciones de extracción anteriores
+import argparse
+import glob
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+import zlib
+import scraping_comun
+
+# El corpus por defecto son los cuerpos de la caché HTTP real, abierta solo para lectura;
+# cualquier otro uso de la caché durante el benchmark va a un archivo temporal
+RUTA_CACHE = os.environ.get("CACHE_HTTP", os.path.join(os.path.dirname(os.path.abspath(scraping_comun.__file__)), "cache_http.sqlite"))
+CACHE_TEMPORAL = tempfile.TemporaryDirectory(prefix="benchmark_extraccion_")
+os.environ["CACHE_HTTP"] = os.path.join(CACHE_TEMPORAL.name, "cache_http.sqlite")
+
+from bs4 import BeautifulSoup
+from scraping_comun.motor_contacto import (TOKENIZADORES, PARSER_HTML, DIGITOS_TELEFONO, analizar_documento, primera,
+                                           valores, valor_clave)
+from scraping_utils import extraer_email
+
+# ─── Versiones anteriores (copiadas tal cual para la comparación) ───────────
+def extraer_contacto_anterior(html_content):
+    # version_02/modulos_contacto/extractor.py antes del motor
+    soup = BeautifulSoup(html_content, 'html.parser')
+    posibles_secciones = soup.find_all(['footer', 'div', 'p', 'span'], class_=re.compile(r'contact|info|footer', re.I))
+    textos_a_buscar = [sec.get_text() for sec in posibles_secciones]
+    textos_a_buscar.append(soup.get_text())
+
+    texto_combinado = " ".join(textos_a_buscar)
+    texto_limpio = re.sub(r'\s+', ' ', texto_combinado).strip()
+
+    email_regex = r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+"
+    telefono_regex = r"(?:\+34)?[\s.-]?\d{2,3}[\s.-]?\d{2,3}[\s.-]?\d{2,3}"
+    direccion_regex = r"(?:Calle|Avda|Avenida|Plaza|Paseo|Camino|Ctra\.|Carrer)[\s\w.,º#-]+?\d{1,4}[A-Za-z]?(?:\s+\d{5})?\s+[A-ZÁÉÍÓÚÑa-záéíóúñüÜ]+"
+
+    email = re.search(email_regex, texto_limpio)
+    telefono = re.search(telefono_regex, texto_limpio)
+    direcciones = [match.group(0).strip() for match in re.finditer(direccion_regex, texto_limpio)]
+    direcciones_filtradas = [d for d in direcciones if any(loc in d for loc in ["Madrid", "Albacete", "Palma", "Málaga"])]
+
+    return {
+        "direccion": "; ".join(direcciones_filtradas) if direcciones_filtradas else "No encontrado",
+        "telefono": telefono.group(0).strip() if telefono else "No encontrado",
+        "email": email.group(0).strip() if email else "No encontrado"
+    }
+
+def buscar_por_palabra_clave_anterior(soup, clave):
+    # scraping_utils.buscar_por_palabra_clave antes del motor (recorre todos los nodos de texto)
+    etiquetas = soup.find_all(string=re.compile(clave, re.IGNORECASE))
+    for etiqueta in etiquetas:
+        padre = etiqueta.find_parent()
+        if padre:
+            texto = padre.get_text(strip=True)
+            if 5 < len(texto) < 150:
+                return texto
+    return " Error"
+
+def analizar_html_anterior(html, parser="html.parser"):
+    # contact_extractor.analizar_html antes del motor (BeautifulSoup + tres recorridos)
+    soup = BeautifulSoup(html, parser)
+    texto = soup.get_text(separator=" ", strip=True)
+    direccion = buscar_por_palabra_clave_anterior(soup, "Dirección|Dónde estamos")
+    telefono = buscar_por_palabra_clave_anterior(soup, "Teléfono|Llámanos")
+    email = buscar_por_palabra_clave_anterior(soup, "Email|Correo")
+    if email == " Error":
+        email = extraer_email(texto)
+    return direccion, telefono, email
+
+# ─── Versiones con el motor (mismo código que extractor.py y contact_extractor.py) ───
+def extraer_contacto_motor(html_content):
+    coincidencias = analizar_documento(html_content)["coincidencias"]
+    email = primera(coincidencias, "email")
+    telefono = primera(coincidencias, "telefono")
+    direcciones = [d for d in valores(coincidencias, "direccion") if any(loc in d for loc in ["Madrid", "Albacete", "Palma", "Málaga"])]
+    return {
+        "direccion": "; ".join(direcciones) if direcciones else "No encontrado",
+        "telefono": telefono["valor"] if telefono else "No encontrado",
+        "email": email["valor"] if email else "No encontrado"
+    }
+
+def analizar_html_motor(html, parser=None):
+    coincidencias = analizar_documento(html, parser)["coincidencias"]
+    email = valor_clave(coincidencias, "clave_email")
+    if email == " Error":
+        encontrado = primera(coincidencias, "email")
+        email = encontrado["valor"] if encontrado else " No encontrado"
+    return valor_clave(coincidencias, "clave_direccion"), valor_clave(coincidencias, "clave_telefono"), email
+
+# ─── Corpus ──────────────────────────────────────────────────────────────────
+def corpus_guardado(carpeta=None, ruta_cache=RUTA_CACHE):
+    # 1. Archivos .html de una carpeta; 2. cuerpos guardados en la caché HTTP
+    if carpeta:
+        paginas = []
+        for ruta in sorted(glob.glob(os.path.join(carpeta, "**", "*.htm*"), recursive=True)):
+            with open(ruta, encoding="utf-8", errors="replace") as f:
+                paginas.append(f.read())
+        return paginas
+    if not os.path.exists(ruta_cache):
+        return []
+    conexion = sqlite3.connect(f"file:{ruta_cache}?mode=ro", uri=True)
+    try:
+        return [zlib.decompress(datos).decode("utf-8") for (datos,) in conexion.execute("SELECT datos FROM cuerpos")]
+    finally:
+        conexion.close()
+
+PARRAFO = "<p>Servicios de ingeniería, mantenimiento y obra civil desde {anio} para clientes públicos y privados.</p>"
+# Marcado típico de una home corporativa: rejillas anidadas con muchos atributos y scripts de configuración grandes
+BLOQUE = ('<div class="row g-0 align-items-center section-{n}" data-aos="fade-up" data-aos-delay="{n}">'
+          '<div class="col-12 col-md-6 col-lg-4"><div class="card shadow-sm"><div class="card-body">{parrafo}'
+          '<a class="btn btn-link" href="/servicios/{n}" title="Ver más">Ver más</a></div></div></div></div>')
+SCRIPT_CONFIGURACION = "<script>window.__CONFIG__ = {" + ",".join(f'"k{i}": "{i:08x}"' for i in range(2000)) + "};</script>"
+CIUDADES = ["Madrid", "Albacete", "Palma", "Málaga", "Sevilla"]
+
+def corpus_sintetico(paginas, semilla=0):
+    # Páginas con estructura variada: navegación, scripts, cuerpo largo y bloque de contacto en distintas formas
+    azar = random.Random(semilla)
+    corpus = []
+    for i in range(paginas):
+        ciudad = azar.choice(CIUDADES)
+        email = azar.choice([f"info{i}@empresa{i}.es", f"ventas{i} [at] empresa{i} [dot] com"])
+        contacto = (
+            f"<h3>Dirección: Calle Mayor {i % 200 + 1}, 28{i % 1000:03d} {ciudad}</h3>"
+            f"<span>Teléfono: +34 9{i % 100:02d} 345 678</span><span>Email: {email}</span>"
+        )
+        if azar.random() < 0.5:
+            contacto = f'<div class="contact-info">{contacto}</div>'
+        else:
+            contacto = f"<footer>{contacto}</footer>"
+        cuerpo = "".join(
+            BLOQUE.format(n=n, parrafo=PARRAFO.format(anio=1950 + azar.randrange(70)))
+            for n in range(azar.randrange(50, 400))
+        )
+        corpus.append(
+            f"<html><head><title>Empresa {i}</title><script>var datos = {{id: {i}}};</script>"
+            f"{SCRIPT_CONFIGURACION}<style>.a{{color:red}}</style></head><body><nav><a href='/'>Inicio</a> | <a href='/c'>Contacto</a></nav>"
+            f"{cuerpo}{contacto}</body></html>"
+        )
+    return corpus
+
+# Fragmentos con los formatos que cubrían los patrones anteriores
+CASOS_COBERTURA = [
+    "<p>Tel. 91.234.56.78</p>", "<p>Tel: 912.345.678</p>", "<p>Tlf.912.345.678</p>", "<p>Teléfono: 912-345-678</p>",
+    "<p>+34 912 345 678</p>", "<p>(+34) 971 23 45 67</p>",
+    "<p>Calle Mayor 12, 28013 Madrid</p>", "<p>Calle mayor 12 bajo</p>", "<p>Avda. de la Paz 3 28010 Madrid</p>",
+    "<p>Plaza de España 1, 07001 Palma</p>", "<p>Ctra. de Valencia km 7 28051 Madrid</p>",
+    "<p>Carrer de Mallorca 401 08013 Barcelona</p>",
+    "<p>Email: juan.perez@empresa.es</p>", "<p>info@empresa-grupo.com.es</p>",
+]
+
+# ─── Medición ────────────────────────────────────────────────────────────────
+def normalizar(valor):
+    return " ".join(str(valor).split())
+
+def medir(funcion, corpus):
+    inicio = time.perf_counter()
+    resultados = [funcion(html) for html in corpus]
+    return resultados, time.perf_counter() - inicio
+
+def comparar(nombre, anterior, motor, corpus, campos):
+    esperado, segundos_anterior = medir(anterior, corpus)
+    obtenido, segundos_motor = medir(motor, corpus)
+    megas = sum(len(html) for html in corpus) / 1e6
+
+    print(f"\n{nombre}")
+    print(f"  {'anterior':<10} {len(corpus) / segundos_anterior:8.1f} páginas/s  {megas / segundos_anterior:6.2f} MB/s")
+    print(f"  {'motor':<10} {len(corpus) / segundos_motor:8.1f} páginas/s  {megas / segundos_motor:6.2f} MB/s"
+          f"  (x{segundos_anterior / segundos_motor:.1f})")
+    for campo, extraer in campos.items():
+        iguales = sum(normalizar(extraer(a)) == normalizar(extraer(b)) for a, b in zip(esperado, obtenido))
+        print(f"  coincidencia {campo:<10} {iguales / len(corpus):6.1%}")
+
+def comparar_parsers(corpus):
+    # Parseo + extracción (analizar_html) por página con cada parser disponible
+    referencia = [analizar_html_motor(html, "regex") for html in corpus]
+    opciones = [(f"BeautifulSoup {parser}", lambda html, parser=parser: analizar_html_anterior(html, parser))
+                for parser in ("html.parser", "lxml")]
+    for parser in TOKENIZADORES:
+        opciones.append((f"motor {parser}", lambda html, parser=parser: analizar_html_motor(html, parser)))
+
+    print(f"\nParseo + extracción por parser (por defecto: {PARSER_HTML})")
+    for nombre, funcion in opciones:
+        try:
+            resultados, segundos = medir(funcion, corpus)
+        except ImportError as error:
+            print(f"  {nombre:<26} no disponible ({error.name})")
+            continue
+        iguales = sum(a == b for a, b in zip(resultados, referencia))
+        print(f"  {nombre:<26} {segundos * 1000 / len(corpus):7.2f} ms/página   iguales al motor regex: {iguales / len(corpus):6.1%}")
+
+# ─── Cobertura de los patrones ───────────────────────────────────────────────
+PATRONES_ANTERIORES = {
+    "email": r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+",
+    "telefono": r"(?:\+34)?[\s.-]?\d{2,3}[\s.-]?\d{2,3}[\s.-]?\d{2,3}",
+    "direccion": r"(?:Calle|Avda|Avenida|Plaza|Paseo|Camino|Ctra\.|Carrer)[\s\w.,º#-]+?\d{1,4}[A-Za-z]?(?:\s+\d{5})?\s+[A-ZÁÉÍÓÚÑa-záéíóúñüÜ]+",
+}
+
+def limpiar(valor):
+    return " ".join(valor.split()).strip(" .,;:-")
+
+def comprobar_patrones(corpus):
+    """
+    Aplica los patrones anteriores y los del motor al mismo texto visible (así no cuentan
+    las diferencias de tokenización, como "MadridTeléfono") y cuenta por campo las páginas
+    en las que el motor no cubre algo que encontraba el patrón anterior: una coincidencia
+    anterior está cubierta si coincide con alguna del motor o una contiene a la otra.
+    Los teléfonos de menos de DIGITOS_TELEFONO cifras no cuentan (el motor los descarta
+    a propósito). Devuelve el total de páginas con pérdidas.
+    """
+    print("\nCobertura de los patrones sobre el mismo texto")
+    total_perdidas = 0
+    documentos = [analizar_documento(html) for html in corpus]
+    for campo, patron in PATRONES_ANTERIORES.items():
+        iguales, perdidas, ejemplos = 0, 0, []
+        for documento in documentos:
+            anteriores = {limpiar(m.group()) for m in re.finditer(patron, documento["texto"])} - {""}
+            if campo == "telefono":
+                anteriores = {v for v in anteriores if sum(c.isdigit() for c in v) >= DIGITOS_TELEFONO}
+            nuevos = {limpiar(c["valor"]) for c in documento["coincidencias"] if c["tipo"] == campo}
+            sin_cubrir = [v for v in anteriores if not any(v == n or v in n or n in v for n in nuevos)]
+            iguales += anteriores == nuevos
+            if sin_cubrir:
+                perdidas += 1
+                ejemplos.extend(sin_cubrir[:1])
+        total_perdidas += perdidas
+        print(f"  {campo:<10} iguales {iguales / len(documentos):6.1%}   páginas con pérdidas: {perdidas}"
+              + (f"  (p. ej. {ejemplos[:3]})" if ejemplos else ""))
+    return total_perdidas
+
+def main(carpeta, paginas, comprobar=False):
+    corpus = corpus_guardado(carpeta)
+    origen = carpeta or RUTA_CACHE
+    if not corpus:
+        corpus, origen = corpus_sintetico(paginas), "sintético"
+    print(f"Corpus: {len(corpus)} páginas ({origen}), {sum(len(h) for h in corpus) / 1e6:.1f} MB")
+
+    comparar(
+        "extractor.extraer_contacto", extraer_contacto_anterior, extraer_contacto_motor, corpus,
+        {"direccion": lambda r: r["direccion"], "telefono": lambda r: r["telefono"], "email": lambda r: r["email"]}
+    )
+    comparar(
+        "contact_extractor.analizar_html", analizar_html_anterior, analizar_html_motor, corpus,
+        {"direccion": lambda r: r[0], "telefono": lambda r: r[1], "email": lambda r: r[2]}
+    )
+    comparar_parsers(corpus)
+
+    perdidas = comprobar_patrones(corpus + CASOS_COBERTURA)
+    if comprobar and perdidas:
+        sys.exit(f"El motor pierde coincidencias de los patrones anteriores en {perdidas} páginas")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del motor de extracción de contacto")
+    parser.add_argument("--corpus", help="carpeta con archivos .html (por defecto, la caché HTTP en disco)")
+    parser.add_argument("--paginas", type=int, default=300, help="páginas del corpus sintético si no hay corpus guardado")
+    parser.add_argument("--comprobar", action="store_true",
+                        help="termina con error si el motor pierde coincidencias de los patrones anteriores")
+    args = parser.parse_args()
+    main(args.corpus, args.paginas, args.comprobar)
@@ -0,0 +1,113 @@
+# Librerías para comparar el render completo (espera fija) con el perfil ligero de navegador.py
+import argparse
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from playwright.async_api import async_playwright
+from scraping_comun.navegador import nuevo_contexto, esperar_lista
+
+LATENCIA_S = 0.05           # latencia simulada de red por respuesta
+IMAGENES_POR_PAGINA = 20
+TAMANO_RECURSO = 200_000    # bytes de cada imagen / fuente / hoja de estilos
+
+# ─── Servidor de prueba: página pintada por JS con imágenes, fuentes, CSS y un script grande ───
+CONTACTO = ("<footer><h3>Dirección: Calle Mayor 12, 28013 Madrid</h3><span>Teléfono: +34 912 345 678</span>"
+            "<span>Email: info{i}@empresa.es</span></footer>")
+
+def pagina(i):
+    imagenes = "".join(f'<img src="/img/{i}-{n}.jpg">' for n in range(IMAGENES_POR_PAGINA))
+    contenido = CONTACTO.format(i=i).replace('"', '\\"')
+    return (
+        f'<html><head><link rel="stylesheet" href="/css/{i}.css">'
+        f'<style>@font-face {{font-family: f; src: url("/font/{i}.woff2")}} body {{font-family: f}}</style>'
+        f'<script src="/analytics.js"></script></head>'
+        f'<body><div id="app"></div>{imagenes}'
+        f'<script>setTimeout(() => {{ document.getElementById("app").innerHTML = "{contenido}"; }}, 100);</script>'
+        f'</body></html>'
+    )
+
+TIPOS = {"img": "image/jpeg", "css": "text/css", "font": "font/woff2", "analytics.js": "application/javascript"}
+BYTES_SERVIDOS = {"total": 0}
+BLOQUEO_BYTES = threading.Lock()
+
+class Manejador(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(LATENCIA_S)
+        tipo, _, resto = self.path.strip("/").partition("/")
+        if tipo == "pagina":
+            cuerpo, contenido = pagina(int(resto)).encode("utf-8"), "text/html; charset=utf-8"
+        else:
+            cuerpo, contenido = b"x" * TAMANO_RECURSO, TIPOS.get(tipo, "application/octet-stream")
+        with BLOQUEO_BYTES:
+            BYTES_SERVIDOS["total"] += len(cuerpo)
+        self.send_response(200)
+        self.send_header("Content-Type", contenido)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+def iniciar_servidor():
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}"
+
+# ─── Perfiles ────────────────────────────────────────────────────────────────
+async def render_completo(navegador, url):
+    # Como antes: todos los recursos, "load" y espera fija de 3 s
+    contexto = await navegador.new_context()
+    try:
+        page = await contexto.new_page()
+        await page.goto(url, timeout=60000, wait_until="load")
+        await page.wait_for_timeout(3000)
+        return await page.content()
+    finally:
+        await contexto.close()
+
+async def render_ligero(navegador, url):
+    contexto = await nuevo_contexto(navegador)
+    try:
+        page = await contexto.new_page()
+        await page.goto(url, timeout=60000, wait_until="domcontentloaded")
+        await esperar_lista(page)
+        return await page.content()
+    finally:
+        await contexto.close()
+
+# ─── Medición ────────────────────────────────────────────────────────────────
+async def medir(navegador, urls, renderizar):
+    BYTES_SERVIDOS["total"] = 0
+    inicio = time.perf_counter()
+    resultados = [await renderizar(navegador, url) for url in urls]
+    return resultados, time.perf_counter() - inicio, BYTES_SERVIDOS["total"]
+
+async def main(paginas):
+    servidor, base = iniciar_servidor()
+    urls = [f"{base}/pagina/{i}" for i in range(paginas)]
+    print(f"Páginas: {paginas} | recursos por página: {IMAGENES_POR_PAGINA + 3} de {TAMANO_RECURSO // 1000} kB")
+
+    async with async_playwright() as p:
+        navegador = await p.chromium.launch(headless=True)
+        try:
+            mediciones = {}
+            for nombre, renderizar in (("completo (antes)", render_completo), ("ligero", render_ligero)):
+                resultados, segundos, servidos = await medir(navegador, urls, renderizar)
+                mediciones[nombre] = (segundos, servidos)
+                con_contacto = sum(f"info{i}@empresa.es" in html for i, html in enumerate(resultados))
+                print(f"  {nombre:<18} {segundos * 1000 / paginas:8.0f} ms/página  {servidos / paginas / 1e6:6.2f} MB/página"
+                      f"  contacto en {con_contacto}/{paginas}")
+        finally:
+            await navegador.close()
+            servidor.shutdown()
+
+    (antes, bytes_antes), (ahora, bytes_ahora) = mediciones.values()
+    print(f"Tiempo x{antes / ahora:.1f} | ancho de banda x{bytes_antes / max(bytes_ahora, 1):.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del perfil ligero de Playwright contra un servidor local")
+    parser.add_argument("--paginas", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.paginas))
@@ -1,42 +1,100 @@
 # Librerías para Flujo asíncrono y lógica de auditoría
 import asyncio
-from bs4 import BeautifulSoup
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from crawl4ai import CrawlerHub
-from scraping_utils import (
-    obtener_html_renderizado,
-    buscar_por_palabra_clave,
-    extraer_email,
-    extraer_telefono,
-    extraer_direccion
-)
+from scraping_comun.cache_http import cacheado_async
+from scraping_comun.motor_contacto import analizar_documento, primera, valor_clave
+from scraping_comun.prefiltro_render import clasificar, registrar_decision
+from scraping_comun.mini_crawler import rastrear_contacto
+from scraping_utils import obtener_html_renderizado_async
 
 crawler = CrawlerHub()
 
-async def extraer_contacto_async(url):
+# Parseo fuera del event loop: hilos por defecto, o N procesos con configurar_parseo(N).
+# El log se escribe desde un único hilo para que las líneas no se mezclen.
+EJECUTORES = {"parseo": None, "log": ThreadPoolExecutor(max_workers=1)}
+
+def configurar_parseo(procesos=None):
+    if EJECUTORES["parseo"] is not None:
+        EJECUTORES["parseo"].shutdown()
+    EJECUTORES["parseo"] = ProcessPoolExecutor(max_workers=procesos) if procesos else None
+
+def contacto_de_documento(documento):
+    # Selección de campos sobre el resultado de analizar_documento (sin volver a parsear)
+    coincidencias = documento["coincidencias"]
+    direccion = valor_clave(coincidencias, "clave_direccion")
+    telefono = valor_clave(coincidencias, "clave_telefono")
+    email = valor_clave(coincidencias, "clave_email")
+    if email == " Error":
+        encontrado = primera(coincidencias, "email")
+        email = encontrado["valor"] if encontrado else " No encontrado"
+    return direccion, telefono, email
+
+def analizar_html(html, texto=None):
+    # Trabajo de CPU (una pasada de motor_contacto con el parser PARSER_HTML); se ejecuta
+    # en el ejecutor de parseo. `texto` ya no hace falta: el motor lo obtiene del HTML
+    return contacto_de_documento(analizar_documento(html))
+
+def escribir_log(linea, ruta="logs_scraping.txt"):
+    with open(ruta, "a", encoding="utf-8") as f:
+        f.write(linea)
+
+async def analizar_pagina_async(url, html):
+    # A partir del HTML ya descargado: prefiltro de render, fallback renderizado, parseo y log
+    # sin bloquear el loop. El mismo parseo sirve para el prefiltro y para la extracción.
+    # Devuelve el contacto y el HTML analizado (el renderizado si hizo falta Playwright)
+    loop = asyncio.get_running_loop()
+    documento, renderizar, motivo = await loop.run_in_executor(EJECUTORES["parseo"], clasificar, html)
+    await loop.run_in_executor(
+        EJECUTORES["log"], registrar_decision, url, renderizar, motivo, len(documento["texto"])
+    )
+
+    if renderizar:
+        html = await obtener_html_renderizado_async(url)
+        documento = await loop.run_in_executor(EJECUTORES["parseo"], analizar_documento, html)
+        fuente = "Playwright"
+    else:
+        fuente = "CrawlerHub"
+
+    direccion, telefono, email = contacto_de_documento(documento)
+
+    await loop.run_in_executor(
+        EJECUTORES["log"], escribir_log,
+        f"{url} | Fuente: {fuente} | Dirección: {direccion != ' Error'} | "
+        f"Teléfono: {telefono != ' Error'} | Email: {email != ' Error'}\n"
+    )
+    return (direccion, telefono, email), html
+
+async def completar_contacto_async(url, html):
+    contacto, _ = await analizar_pagina_async(url, html)
+    return contacto
+
+# ─── Mini-crawler: home y, si faltan campos, contacto / aviso legal / quiénes somos ───
+VALORES_VACIOS = {" Error", " No encontrado"}
+
+async def descargar(url, turno=None):
+    # `turno(url, pedir)`, si se da, envuelve solo la petición real (no las lecturas de caché)
+    if turno is None:
+        return await cacheado_async(url, lambda: crawler.fetch(url), "crawlerhub")
+    return await cacheado_async(url, lambda: turno(url, lambda: crawler.fetch(url)), "crawlerhub")
+
+async def extraer_campos_async(url, html):
+    # Adaptador para rastrear_contacto: los marcadores de "no encontrado" pasan a None
+    (direccion, telefono, email), html = await analizar_pagina_async(url, html)
+    campos = {"direccion": direccion, "telefono": telefono, "email": email}
+    return {campo: None if valor in VALORES_VACIOS else valor for campo, valor in campos.items()}, html
+
+async def extraer_contacto_async(url, propagar_errores=False, turno=None):
+    # propagar_errores=True deja que el planificador reintente los fallos de red de la home;
+    # `turno` aplica su cortesía por dominio también a las páginas enlazadas
     try:
-        html = await crawler.fetch(url)
-        texto = crawler.extract_text(html)
-
-        if len(texto.strip()) < 500:
-            html = obtener_html_renderizado(url)
-            soup = BeautifulSoup(html, "html.parser")
-            texto = soup.get_text(separator=" ", strip=True)
-            fuente = "Playwright"
-        else:
-            soup = BeautifulSoup(html, "html.parser")
-            fuente = "CrawlerHub"
-
-        direccion = buscar_por_palabra_clave(soup, "Dirección|Dónde estamos")
-        telefono = buscar_por_palabra_clave(soup, "Teléfono|Llámanos")
-        email = buscar_por_palabra_clave(soup, "Email|Correo")
-        if email == " Error":
-            email = extraer_email(texto)
-
-        with open("logs_scraping.txt", "a", encoding="utf-8") as f:
-            f.write(f"{url} | Fuente: {fuente} | Dirección: {direccion != ' Error'} | "
-                    f"Teléfono: {telefono != ' Error'} | Email: {email != ' Error'}\n")
-
-        return direccion, telefono, email
+        html = await descargar(url)
+        campos, _ = await rastrear_contacto(
+            url, html, extraer_campos_async, lambda enlace: descargar(enlace, turno)
+        )
+        return campos["direccion"] or " Error", campos["telefono"] or " Error", campos["email"] or " No encontrado"
 
     except Exception:
+        if propagar_errores:
+            raise
         return " Error", " Error", " Error"
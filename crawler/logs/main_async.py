@@ -1,54 +1,176 @@
 # Librerías Carga de CSV, búsqueda de URLs y ejecución
+import argparse
 import pandas as pd
 import asyncio
-from googlesearch import search
-from tqdm.asyncio import tqdm_asyncio
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from scraping_comun.busqueda import buscar
+from scraping_comun.indice_cif import consultar_cif, registrar_url, normalizar_cif
+from scraping_comun.checkpoint import abrir_checkpoint, guardar_registro, exportar_csv
+from tqdm import tqdm
 from contact_extractor import extraer_contacto_async
+from scraping_utils import cerrar_pool
 
 RUTA_CSV = "nombres_normalizados_para_scraping.csv"
+RUTA_CHECKPOINT = "contacto_empresas_es_3.jsonl"
+RUTA_SALIDA = "contacto_empresas_es_3.csv"
 df = pd.read_csv(RUTA_CSV)
 
 REQUIRED_COLS = {"NOMBRE_CORREGIDO_FINAL_MANUAL_NORMALIZADO", "CIF"}
 if not REQUIRED_COLS.issubset(df.columns):
     raise ValueError(f"Faltan columnas requeridas: {REQUIRED_COLS - set(df.columns)}")
 
+# ─── Planificador: etapas de búsqueda y descarga unidas por colas acotadas ───
+CONCURRENCIA_BUSQUEDA = 2      # búsquedas simultáneas (bloqueantes, en hilos; el proveedor marca su propio ritmo)
+CONCURRENCIA_DESCARGA = 16     # descargas simultáneas en total (sockets abiertos)
+TAMANO_COLA = 64               # filas en espera entre etapas (memoria acotada)
+INTERVALO_DOMINIO = 1.0        # segundos mínimos entre peticiones al mismo dominio
+INTERVALO_MAXIMO = 60.0        # tope del backoff por dominio
+MAX_REINTENTOS = 3
+
 def buscar_url(nombre):
     query = f"{nombre} sitio oficial España"
     try:
-        resultados = list(search(query, num_results=5))
+        resultados = buscar(query, num_resultados=5)  # caché persistente + reintentos
         return resultados[0] if resultados else " No encontrada"
     except Exception:
         return " Error en búsqueda"
 
-async def procesar_empresas_async(df):
-    async def procesar_fila(row):
-        nombre = row["NOMBRE_CORREGIDO_FINAL_MANUAL_NORMALIZADO"]
-        cif = row["CIF"]
-        url = buscar_url(nombre)
-
-        if url not in [" No encontrada", " Error en búsqueda"]:
-            direccion, telefono, email = await extraer_contacto_async(url)
-        else:
-            direccion, telefono, email = " No disponible", " No disponible", " No disponible"
-
-        return {
-            "Empresa": nombre,
-            "CIF": cif,
-            "URL": url,
-            "Dirección": direccion,
-            "Teléfono": telefono,
-            "Email": email
-        }
-
-    tareas = [procesar_fila(row) for _, row in df.iterrows()]
-    resultados = await tqdm_asyncio.gather(*tareas, desc="Procesando empresas")
-    return resultados
+def resultado_fila(row, url, direccion, telefono, email):
+    return {
+        "Empresa": row["NOMBRE_CORREGIDO_FINAL_MANUAL_NORMALIZADO"],
+        "CIF": row["CIF"],
+        "URL": url,
+        "Dirección": direccion,
+        "Teléfono": telefono,
+        "Email": email
+    }
+
+# Cortesía por dominio: una petición cada `intervalo` segundos; el intervalo se duplica con cada fallo
+async def esperar_turno(dominios, dominio):
+    estado = dominios.setdefault(dominio, {"bloqueo": asyncio.Lock(), "siguiente": 0.0, "intervalo": INTERVALO_DOMINIO})
+    loop = asyncio.get_running_loop()
+    async with estado["bloqueo"]:
+        espera = estado["siguiente"] - loop.time()
+        if espera > 0:
+            await asyncio.sleep(espera)
+        estado["siguiente"] = loop.time() + estado["intervalo"]
+
+def registrar_intento(dominios, dominio, exito):
+    estado = dominios[dominio]
+    estado["intervalo"] = INTERVALO_DOMINIO if exito else min(estado["intervalo"] * 2, INTERVALO_MAXIMO)
+
+async def con_turno(dominios, url, pedir):
+    # Una petición suelta (páginas enlazadas del mini-crawler) con la misma cortesía que la home
+    dominio = urlparse(url).netloc or url
+    await esperar_turno(dominios, dominio)
+    try:
+        resultado = await pedir()
+    except Exception:
+        registrar_intento(dominios, dominio, exito=False)
+        raise
+    registrar_intento(dominios, dominio, exito=True)
+    return resultado
+
+async def procesar_empresas_async(df, concurrencia_busqueda=CONCURRENCIA_BUSQUEDA,
+                                  concurrencia_descarga=CONCURRENCIA_DESCARGA, tamano_cola=TAMANO_COLA,
+                                  ruta_checkpoint=RUTA_CHECKPOINT, reanudar=False):
+    """
+    Procesa las empresas y añade cada resultado al checkpoint JSONL en cuanto termina
+    (nada se acumula en memoria). Con `reanudar`, se saltan los CIF ya presentes.
+    """
+    loop = asyncio.get_running_loop()
+    cola_busqueda = asyncio.Queue(maxsize=tamano_cola)
+    cola_descarga = asyncio.Queue(maxsize=tamano_cola)
+    checkpoint, hechas = abrir_checkpoint(ruta_checkpoint, reanudar)
+    dominios = {}
+    progreso = tqdm(total=len(df), desc="Procesando empresas")
+    ejecutor_busqueda = ThreadPoolExecutor(max_workers=concurrencia_busqueda)
+
+    def guardar(posicion, resultado):
+        # La posición en la entrada permite exportar el CSV en el orden original
+        guardar_registro(checkpoint, {**resultado, "Posición": posicion})
+        progreso.update(1)
+
+    # 1. Productor: las filas entran a la cola a medida que hay sitio
+    async def productor():
+        for posicion, (_, row) in enumerate(df.iterrows()):
+            if normalizar_cif(row["CIF"]) in hechas:
+                progreso.update(1)  # ya está en el checkpoint de una ejecución anterior
+                continue
+            await cola_busqueda.put((posicion, row))
+        for _ in range(concurrencia_busqueda):
+            await cola_busqueda.put(None)
+
+    # 2. Búsqueda de la URL oficial (la cortesía con el buscador la aplica busqueda.py, solo en consultas reales)
+    async def buscador():
+        while (tarea := await cola_busqueda.get()) is not None:
+            posicion, row = tarea
+            nombre = row["NOMBRE_CORREGIDO_FINAL_MANUAL_NORMALIZADO"]
+            # Adjudicatarios repetidos: la URL sale del índice CIF sin buscar
+            conocida = await loop.run_in_executor(ejecutor_busqueda, consultar_cif, row["CIF"])
+            if conocida:
+                url = conocida["url"]
+            else:
+                url = await loop.run_in_executor(ejecutor_busqueda, buscar_url, nombre)
+                if url not in [" No encontrada", " Error en búsqueda"]:
+                    await loop.run_in_executor(
+                        ejecutor_busqueda, registrar_url, row["CIF"], url, "Dominio válido", False, nombre
+                    )
+            if url in [" No encontrada", " Error en búsqueda"]:
+                guardar(posicion, resultado_fila(row, url, " No disponible", " No disponible", " No disponible"))
+            else:
+                await cola_descarga.put((posicion, row, url))
+
+    # 3. Descarga y extracción con límite global, cortesía por dominio y reintentos con backoff
+    async def descargador():
+        while (tarea := await cola_descarga.get()) is not None:
+            posicion, row, url = tarea
+            dominio = urlparse(url).netloc or url
+            contacto = (" Error", " Error", " Error")
+            for _ in range(MAX_REINTENTOS):
+                await esperar_turno(dominios, dominio)
+                try:
+                    contacto = await extraer_contacto_async(
+                        url, propagar_errores=True, turno=lambda enlace, pedir: con_turno(dominios, enlace, pedir)
+                    )
+                    registrar_intento(dominios, dominio, exito=True)
+                    break
+                except Exception:
+                    registrar_intento(dominios, dominio, exito=False)
+            guardar(posicion, resultado_fila(row, url, *contacto))
+
+    async def busqueda_completa():
+        await asyncio.gather(*(buscador() for _ in range(concurrencia_busqueda)))
+        for _ in range(concurrencia_descarga):
+            await cola_descarga.put(None)
+
+    tareas = [
+        asyncio.create_task(etapa)
+        for etapa in (productor(), busqueda_completa(), *(descargador() for _ in range(concurrencia_descarga)))
+    ]
+    try:
+        await asyncio.gather(*tareas)
+    finally:
+        # Si una etapa falla, las demás se cancelan y se esperan antes de cerrar el checkpoint
+        # (ninguna puede seguir escribiendo en un archivo cerrado)
+        for tarea in tareas:
+            tarea.cancel()
+        await asyncio.gather(*tareas, return_exceptions=True)
+        progreso.close()
+        checkpoint.close()
+        ejecutor_busqueda.shutdown(wait=False)
+        await cerrar_pool()  # cierra los navegadores del pool de renderizado
+    return ruta_checkpoint
 
 if __name__ == "__main__":
-    resultados = asyncio.run(procesar_empresas_async(df))
-    df_resultado = pd.DataFrame(resultados)
-    df_resultado.to_csv("contacto_empresas_es_3.csv", index=False)
-    print("Datos guardados en contacto_empresas_es_3.csv")
+    parser = argparse.ArgumentParser(description="Busca la URL oficial y el contacto de cada empresa")
+    parser.add_argument("--resume", action="store_true", help=f"continúa desde {RUTA_CHECKPOINT} saltando los CIF ya hechos")
+    args = parser.parse_args()
+
+    ruta_checkpoint = asyncio.run(procesar_empresas_async(df, reanudar=args.resume))
+    exportar_csv(ruta_checkpoint, RUTA_SALIDA, ["Empresa", "CIF", "URL", "Dirección", "Teléfono", "Email"], orden="Posición")
+    print(f"Datos guardados en {RUTA_SALIDA}")
     
     
     # Lo que logré a pesar de las limitaciones:
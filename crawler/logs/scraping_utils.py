@@ -1,27 +1,12 @@
 # Librerías para Funciones de scraping y extracción
 import re
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
+from scraping_comun.motor_contacto import buscar_clave
+# Renderizado con Chromium reutilizado (pool asíncrono y navegador síncrono persistente)
+from scraping_comun.navegador import obtener_html_renderizado, obtener_html_renderizado_async, cerrar_pool
 
-def obtener_html_renderizado(url, espera_ms=3000):
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        page.goto(url, timeout=60000)
-        page.wait_for_timeout(espera_ms)
-        html = page.content()
-        browser.close()
-        return html
-
-def buscar_por_palabra_clave(soup, clave):
-    etiquetas = soup.find_all(text=re.compile(clave, re.IGNORECASE))
-    for etiqueta in etiquetas:
-        padre = etiqueta.find_parent()
-        if padre:
-            texto = padre.get_text(strip=True)
-            if 5 < len(texto) < 150:
-                return texto
-    return " Error"
+def buscar_por_palabra_clave(html, clave, parser=None):
+    # Recibe el HTML (ya no un soup): se parsea con el parser de motor_contacto (PARSER_HTML)
+    return buscar_clave(html, clave, parser)
 
 def extraer_email(texto):
     patron_clasico = r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.(com|es|org|net|info|biz)"
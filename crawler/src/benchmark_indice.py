@@ -0,0 +1,110 @@
+# Librerías para medir el índice de n-gramas frente a extractOne sobre todo el diccionario:
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from rapidfuzz import process, fuzz
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "modules"))
+from scraping_comun.normalizacion import normalizar_serie
+from correccion import corregir_nombre_con_score
+from indice import construir_indice, candidatos_indice
+
+RUTA_EMPRESAS = os.path.join(os.path.dirname(__file__), "..", "data", "raw", "100empresas.csv")
+
+PALABRAS = (
+    "SISTEMAS GARCIA CONSTRUCCIONES SERVICIOS INGENIERIA OBRAS LIMPIEZAS MARTINEZ LOPEZ RODRIGUEZ "
+    "TECNOLOGIA SOLUCIONES INSTALACIONES ELECTRICAS MEDITERRANEO IBERICA NORTE SUR GESTION AMBIENTAL "
+    "SUMINISTROS HOSPITALARIOS TRANSPORTES HERMANOS PEREZ SANCHEZ INFRAESTRUCTURAS MANTENIMIENTO "
+    "INTEGRAL DESARROLLO URBANO PROYECTOS CONSULTORIA ASESORES ALIMENTACION DISTRIBUCIONES VALENCIANA "
+    "ANDALUZA CATALANA GALLEGA ENERGIA RENOVABLES AGUAS FERNANDEZ GOMEZ DIAZ JARDINERIA SEGURIDAD "
+    "VIGILANCIA INFORMATICA REDES COMUNICACIONES MOVILIDAD SANITARIOS EDIFICACIONES"
+).split()
+FORMAS = ["SA", "SL", "SAU", "SLU", "SOCIEDAD LIMITADA", "SCOOP", ""]
+
+def generar_diccionario(tamano, semilla=0):
+    """
+    Nombres reales de 100empresas.csv (normalizados) más nombres sintéticos hasta `tamano`,
+    ordenados como crear_diccionario_empresas (los largos primero).
+    """
+    rng = np.random.default_rng(semilla)
+    reales = pd.read_csv(RUTA_EMPRESAS)["ADJUDICATARIO"].dropna()
+    nombres = set(normalizar_serie(reales).dropna())
+    while len(nombres) < tamano:
+        palabras = rng.choice(PALABRAS, rng.integers(1, 4), replace=False)
+        nombres.add(" ".join([*palabras, rng.choice(FORMAS)]).strip())
+    return sorted(nombres, key=lambda x: -len(x))
+
+def errata(nombre, rng):
+    # Borra, inserta o cambia una letra
+    if len(nombre) < 5:
+        return nombre
+    i = int(rng.integers(len(nombre)))
+    letra = rng.choice(list("AEIOUNRSTL"))
+    return [nombre[:i] + nombre[i + 1:], nombre[:i] + letra + nombre[i:], nombre[:i] + letra + nombre[i + 1:]][i % 3]
+
+def generar_consultas(diccionario, consultas, semilla=1):
+    """
+    Nombres del diccionario con erratas, palabras de menos o de más, como llegan a la corrección.
+    """
+    rng = np.random.default_rng(semilla)
+    resultado = []
+    for nombre in rng.choice(np.array(diccionario, dtype=object), consultas):
+        palabras = nombre.split()
+        caso = rng.random()
+        if caso < 0.4:
+            nombre = errata(nombre, rng)
+        elif caso < 0.6 and len(palabras) > 1:
+            nombre = " ".join(palabras[:-1])
+        elif caso < 0.8:
+            nombre = f"{nombre} {rng.choice(PALABRAS)}"
+        resultado.append(nombre)
+    return resultado
+
+def medir(nombre, funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    segundos = time.perf_counter() - inicio
+    print(f"{nombre:<40} {segundos:8.2f} s")
+    return resultado, segundos
+
+def main(tamano_diccionario=36_000, consultas=400, comprobar=False):
+    diccionario = generar_diccionario(tamano_diccionario)
+    nombres = generar_consultas(diccionario, consultas)
+    print(f"Diccionario: {len(diccionario):,} nombres   Consultas: {len(nombres):,}")
+
+    indice, _ = medir("construir_indice", lambda: construir_indice(diccionario))
+
+    # 1. Mejor candidato: extractOne sobre todo el diccionario frente a los candidatos del índice
+    completo, t_completo = medir("extractOne (diccionario completo)", lambda: [
+        process.extractOne(x, diccionario, scorer=fuzz.WRatio)[:2] for x in nombres
+    ])
+    con_indice, t_indice = medir("extractOne (candidatos del índice)", lambda: [
+        (process.extractOne(x, candidatos_indice(x, indice), scorer=fuzz.WRatio) or (x, 0))[:2] for x in nombres
+    ])
+    print(f"{'Aceleración':<40} {t_completo / t_indice:8.1f}x")
+    distintos = [(x, a, b) for x, a, b in zip(nombres, completo, con_indice) if a != b]
+
+    # 2. Corrección final (con el segundo intento con token_set_ratio y la heurística)
+    esperado, _ = medir("corregir_nombre_con_score (completo)",
+                        lambda: [corregir_nombre_con_score(x, diccionario) for x in nombres])
+    obtenido, _ = medir("corregir_nombre_con_score (índice)",
+                        lambda: [corregir_nombre_con_score(x, diccionario, indice=indice) for x in nombres])
+    distintos += [(x, a, b) for x, a, b in zip(nombres, esperado, obtenido) if a != b]
+
+    print(f"Diferencias: {len(distintos)}")
+    for nombre, a, b in distintos[:10]:
+        print(f"  {nombre!r}: completo {a} / índice {b}")
+    if comprobar and distintos:
+        sys.exit(f"El índice cambia el resultado de {len(distintos)} consultas")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del índice de n-gramas de la corrección")
+    parser.add_argument("--diccionario", type=int, default=36_000, help="nombres del diccionario sintético")
+    parser.add_argument("--consultas", type=int, default=400, help="nombres a corregir")
+    parser.add_argument("--comprobar", action="store_true",
+                        help="termina con error si el índice cambia algún resultado respecto a extractOne")
+    args = parser.parse_args()
+    main(args.diccionario, args.consultas, args.comprobar)
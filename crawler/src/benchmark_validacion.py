@@ -0,0 +1,104 @@
+# Librerías para medir la validación vectorizada frente a la versión fila a fila:
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "modules"))
+from validacion import exportar_casos_sospechosos, aplicar_correcciones_manual, generar_log_correcciones
+
+# ─── Versiones originales con df.apply(axis=1), solo como referencia ─────────
+def sospechoso_filas(df):
+    return df.apply(
+        lambda row: (
+            isinstance(row["CORREGIDO_FINAL"], str) and
+            isinstance(row["NOMBRE_NORMALIZADO"], str) and
+            row["NOMBRE_NORMALIZADO"].split()[0] not in row["CORREGIDO_FINAL"]
+        ),
+        axis=1
+    )
+
+def correcciones_filas(df, correcciones):
+    corregido = df.apply(lambda row: correcciones.get(row["NOMBRE_LIMPIO"], row["CORREGIDO_FINAL"]), axis=1)
+    status = pd.Series(
+        np.where(df["CORREGIDO_FINAL"] != corregido, "Corregido manual", "Sin cambio"), index=df.index
+    )
+    return corregido, status
+
+def tipo_filas(log):
+    def tipo(row):
+        if pd.notna(row["CORRECCION_MANUAL"]):
+            return "Manual"
+        elif row["NOMBRE_LIMPIO"] != row["CORREGIDO_AUTOMÁTICO"]:
+            return "Automática"
+        else:
+            return "Sin cambio"
+    return log.apply(tipo, axis=1)
+
+def generar_datos(filas, semilla=0):
+    """
+    Genera un DataFrame sintético con las columnas que usa la validación.
+    """
+    rng = np.random.default_rng(semilla)
+    base = np.array([f"EMPRESA {i} SL" for i in range(5_000)], dtype=object)
+    otras = np.array([f"GRUPO {i} SA" for i in range(5_000)], dtype=object)
+
+    limpio = base[rng.integers(0, len(base), filas)]
+    corregido = np.where(rng.random(filas) < 0.1, otras[rng.integers(0, len(otras), filas)], limpio)
+    corregido = np.where(rng.random(filas) < 0.01, np.nan, corregido)
+
+    return pd.DataFrame({
+        "NOMBRE_LIMPIO": limpio,
+        "NOMBRE_NORMALIZADO": limpio,
+        "CORREGIDO_FINAL": pd.Series(corregido, dtype=object),
+        "MATCH_SCORE": rng.integers(60, 100, filas),
+    })
+
+def medir(nombre, funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    print(f"{nombre:<40} {time.perf_counter() - inicio:8.2f} s")
+    return resultado
+
+def main(filas=1_000_000):
+    df = generar_datos(filas)
+    revision = pd.DataFrame({"NOMBRE_LIMPIO": [f"EMPRESA {i} SL" for i in range(0, 5_000, 7)]})
+    revision["CORRECCION_MANUAL"] = revision["NOMBRE_LIMPIO"].str.replace("EMPRESA", "EMPRESAS", regex=False)
+    correcciones = dict(zip(revision["NOMBRE_LIMPIO"], revision["CORRECCION_MANUAL"]))
+    print(f"Filas: {filas:,}")
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta_revision = os.path.join(carpeta, "revision_manual.csv")
+        revision.to_csv(ruta_revision, index=False)
+
+        # 1. Bandera de sospechosos
+        esperado = medir("sospechoso (apply)", lambda: sospechoso_filas(df))
+        medir("sospechoso (vectorizado)", lambda: exportar_casos_sospechosos(
+            df, os.path.join(carpeta, "sospechosas.csv")))
+        assert df["sospechoso"].equals(esperado.astype(bool))
+
+        # 2. Correcciones manuales
+        esperado_final, esperado_status = medir("correcciones manuales (apply)",
+                                                lambda: correcciones_filas(df, correcciones))
+        corregido = medir("correcciones manuales (vectorizado)",
+                          lambda: aplicar_correcciones_manual(df.copy(), ruta_revision))
+        assert corregido["CORREGIDO_FINAL"].equals(esperado_final)
+        assert (corregido["STATUS_CORRECCIÓN"] == esperado_status).all()
+
+        # 3. Tipo de corrección del log
+        ruta_log = os.path.join(carpeta, "log.csv")
+        medir("log de correcciones (vectorizado)",
+              lambda: generar_log_correcciones(corregido, ruta_revision, ruta_log))
+        log = pd.read_csv(ruta_log)
+        log_filas = corregido.copy()
+        log_filas["CORREGIDO_AUTOMÁTICO"] = log_filas.get("NOMBRE_CORREGIDO", log_filas["NOMBRE_LIMPIO"])
+        log_filas["CORRECCION_MANUAL"] = log_filas["NOMBRE_LIMPIO"].map(correcciones)
+        esperado_tipo = medir("log de correcciones (apply)", lambda: tipo_filas(log_filas))
+        assert (log["TIPO_CORRECCIÓN"].values == esperado_tipo.values).all()
+
+    print("✅ Resultados idénticos")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -1,11 +1,18 @@
 # Librerías:
+import hashlib
 import pandas as pd
-from normalizacion import normalizar_nombre
+from scraping_comun.normalizacion import normalizar_nombre
+from indice import construir_indice
+from diccionario_persistente import abrir_diccionario, actualizar_diccionario, cargar_diccionario
 from correccion import (
     crear_diccionario_empresas,
+    diccionario_desde_frecuencias,
+    contar_frecuencias_por_bloques,
     corregir_nombre_con_score,
     correccion_por_partes,
-    pipeline_correccion
+    pipeline_correccion,
+    pipeline_correccion_incremental,
+    cerrar_pool_partes
 )
 from validacion import (
     generar_revision_manual,
@@ -13,9 +20,28 @@ from validacion import (
     aplicar_correcciones_manual,
     generar_log_correcciones
 )
+from scraping_comun.intermedios import guardar_intermedio, leer_intermedio, ruta_intermedio
 
-def ejecutar_pipeline(nombre_archivo_entrada="100empresas.csv"):
+def hash_archivo(ruta, tamano_lectura=1 << 20):
+    """
+    SHA-256 del archivo leído por partes (no se carga entero en memoria).
+    """
+    sha = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for parte in iter(lambda: f.read(tamano_lectura), b""):
+            sha.update(parte)
+    return sha.hexdigest()
+
+def ejecutar_pipeline(nombre_archivo_entrada="100empresas.csv", lote=False, ruta_diccionario=None, incremental=False,
+                      procesos=None, tamano_bloque=None, formato=None, usar_indice=True):
     
+    # Con tamano_bloque el archivo se procesa por bloques (archivos mayores que la RAM)
+    if tamano_bloque:
+        return ejecutar_pipeline_por_bloques(
+            nombre_archivo_entrada, tamano_bloque, lote=lote, ruta_diccionario=ruta_diccionario,
+            incremental=incremental, procesos=procesos, formato=formato, usar_indice=usar_indice
+        )
+
     # Cargar datos originales
     try:
         df_empresas = pd.read_csv(nombre_archivo_entrada, encoding="utf-8")
@@ -29,39 +55,134 @@ def ejecutar_pipeline(nombre_archivo_entrada="100empresas.csv"):
         print("La columna 'ADJUDICATARIO' no está presente en el archivo.")
         return
 
+    # En modo incremental solo se corrigen los nombres no vistos y las salidas se agregan al final
+    if incremental and not ruta_diccionario:
+        ruta_diccionario = "diccionario_empresas.sqlite"
+
     # Respaldo del original
-    df_empresas.to_csv("empresas_original.csv", index=False, encoding="utf-8-sig")
+    # (formato="parquet" guarda las tablas intermedias en Parquet; las de revisión siguen en CSV)
+    guardar_intermedio(df_empresas, "empresas_original", formato, anexar=incremental)
 
-    # Corrección automática
-    df_corregido = pipeline_correccion(df_empresas, "ADJUDICATARIO")
-    df_corregido.to_csv("empresas_limpias_corregidas_mejorado.csv", index=False, encoding="utf-8-sig")
+    # Corrección automática (lote=True usa la puntuación por matrices multihilo;
+    # procesos=N reparte el fallback por partes entre N procesos).
+    # Con ruta_diccionario se reutiliza el diccionario en disco; el hash evita contar dos veces el mismo archivo.
+    # El índice de n-gramas preselecciona los candidatos (usar_indice=False puntúa todo el diccionario).
+    fuente = None
+    if ruta_diccionario:
+        fuente = hash_archivo(nombre_archivo_entrada)
+    if incremental:
+        df_corregido = pipeline_correccion_incremental(
+            df_empresas, "ADJUDICATARIO", ruta_diccionario, lote=lote, fuente=fuente, procesos=procesos,
+            usar_indice=usar_indice
+        )
+    else:
+        df_corregido = pipeline_correccion(
+            df_empresas, "ADJUDICATARIO", lote=lote, ruta_diccionario=ruta_diccionario, fuente=fuente,
+            procesos=procesos, usar_indice=usar_indice
+        )
+    cerrar_pool_partes()
+    guardar_intermedio(df_corregido, "empresas_limpias_corregidas_mejorado", formato, anexar=incremental)
     print("Corrección automática exportada.")
 
     # Revisión manual y casos sospechosos
-    generar_revision_manual(df_corregido)
-    exportar_casos_sospechosos(df_corregido)
+    generar_revision_manual(df_corregido, anexar=incremental)
+    exportar_casos_sospechosos(df_corregido, anexar=incremental)
 
     # Aplicar correcciones manuales (si existen)
     df_corregido = aplicar_correcciones_manual(df_corregido)
-    df_corregido.to_csv("empresas_limpias_corregidas_final.csv", index=False, encoding="utf-8-sig")
+    guardar_intermedio(df_corregido, "empresas_limpias_corregidas_final", formato, anexar=incremental)
     print("Corrección final con revisión manual exportada.")
 
     # Log final de correcciones
-    generar_log_correcciones(df_corregido)
+    generar_log_correcciones(df_corregido, anexar=incremental)
     print("Log de correcciones generado.")
 
     # Checklist final
     print("\n Pipeline completado con éxito.")
     print("Archivos generados:")
-    print("- empresas_original.csv")
-    print("- empresas_limpias_corregidas_mejorado.csv")
+    print(f"- {ruta_intermedio('empresas_original', formato)}")
+    print(f"- {ruta_intermedio('empresas_limpias_corregidas_mejorado', formato)}")
     print("- revision_manual.csv")
     print("- correcciones_sospechosas.csv")
-    print("- empresas_limpias_corregidas_final.csv")
+    print(f"- {ruta_intermedio('empresas_limpias_corregidas_final', formato)}")
     print("- log_de_correcciones.csv")
 
+def ejecutar_pipeline_por_bloques(nombre_archivo_entrada, tamano_bloque=100_000, lote=False, ruta_diccionario=None,
+                                  incremental=False, procesos=None, formato=None, usar_indice=True):
+    """
+    Mismo pipeline que ejecutar_pipeline, pero leyendo el archivo por bloques: una primera
+    pasada cuenta las frecuencias y construye el diccionario; en la segunda cada bloque se
+    corrige, se valida y se agrega a las salidas. La memoria depende del tamaño de bloque.
+    """
+    # Validar columna clave
+    try:
+        columnas = pd.read_csv(nombre_archivo_entrada, nrows=0, encoding="utf-8").columns
+    except Exception as e:
+        print(f"Error al cargar archivo: {e}")
+        return
+    if "ADJUDICATARIO" not in columnas:
+        print("La columna 'ADJUDICATARIO' no está presente en el archivo.")
+        return
+
+    if incremental and not ruta_diccionario:
+        ruta_diccionario = "diccionario_empresas.sqlite"
+
+    # 1. Primera pasada: frecuencias de los nombres normalizados de todo el archivo
+    conteo = contar_frecuencias_por_bloques(nombre_archivo_entrada, "ADJUDICATARIO", tamano_bloque)
+    print(f"Primera pasada completada: {len(conteo)} nombres distintos")
+
+    # 2. Diccionario (e índice) una sola vez para todos los bloques
+    fuente = None
+    if ruta_diccionario:
+        fuente = hash_archivo(nombre_archivo_entrada)
+        conexion = abrir_diccionario(ruta_diccionario)
+        try:
+            actualizar_diccionario(conexion, conteo, fuente=fuente, contados=True)
+            diccionario, indice = cargar_diccionario(conexion)
+        finally:
+            conexion.close()
+    else:
+        diccionario = diccionario_desde_frecuencias(conteo)
+        indice = construir_indice(diccionario) if usar_indice and not lote else None
+    del conteo
+
+    # 3. Segunda pasada: corregir, validar y agregar cada bloque a las salidas
+    cache = {}
+    hay_revision = hay_sospechosos = incremental
+    bloques = pd.read_csv(nombre_archivo_entrada, encoding="utf-8", chunksize=tamano_bloque)
+    for numero, df_bloque in enumerate(bloques):
+        anexar = incremental or numero > 0
+        guardar_intermedio(df_bloque, "empresas_original", formato, anexar=anexar)
+
+        # La fuente ya se contabilizó en la primera pasada: aquí no se vuelve a sumar
+        if incremental:
+            df_bloque = pipeline_correccion_incremental(
+                df_bloque, "ADJUDICATARIO", ruta_diccionario, lote=lote, fuente=fuente, procesos=procesos,
+                diccionario=diccionario, indice=indice, usar_indice=usar_indice
+            )
+        else:
+            df_bloque = pipeline_correccion(
+                df_bloque, "ADJUDICATARIO", lote=lote, procesos=procesos,
+                diccionario=diccionario, indice=indice, cache=cache, usar_indice=usar_indice
+            )
+        guardar_intermedio(df_bloque, "empresas_limpias_corregidas_mejorado", formato, anexar=anexar)
+
+        # Las salidas de validación solo se agregan si este run ya escribió en ellas
+        hay_revision = generar_revision_manual(df_bloque, anexar=hay_revision) or hay_revision
+        hay_sospechosos = exportar_casos_sospechosos(df_bloque, anexar=hay_sospechosos) or hay_sospechosos
+
+        df_bloque = aplicar_correcciones_manual(df_bloque)
+        guardar_intermedio(df_bloque, "empresas_limpias_corregidas_final", formato, anexar=anexar)
+        generar_log_correcciones(df_bloque, anexar=anexar)
+        print(f"Bloque {numero + 1} procesado ({len(df_bloque)} filas).")
+
+    # El pool de la corrección por partes se ha reutilizado en todos los bloques
+    cerrar_pool_partes()
+
+    print("\n Pipeline por bloques completado con éxito.")
+
 # Para ver las correcciones en la DF (fueron 10 correcciones manuales)
-df_corregido = pd.read_csv("empresas_limpias_corregidas_final.csv", encoding="utf-8-sig")
+df_corregido = leer_intermedio("empresas_limpias_corregidas_final")
 
 correcciones_automaticas = df_corregido[df_corregido["STATUS_CORRECCIÓN"] == "Corregido"]
 print(f"Correcciones automáticas aplicadas: {len(correcciones_automaticas)}")
@@ -1,11 +1,28 @@
 # Librerías para corrección:
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 from rapidfuzz import process, fuzz
-from normalizacion import normalizar_nombre
+from scraping_comun.normalizacion import normalizar_serie
+from indice import construir_indice, candidatos_indice
+from diccionario_persistente import (
+    abrir_diccionario,
+    actualizar_diccionario,
+    cargar_diccionario,
+    clave_nombre,
+    buscar_correcciones,
+    guardar_correcciones,
+    invalidar_correcciones
+)
 
 # Construcción del diccionario limpio
 def crear_diccionario_empresas(df, columna, min_freq=2, variantes_extra=None):
-    nombres = df[columna].value_counts()
+    return diccionario_desde_frecuencias(df[columna].value_counts(), min_freq, variantes_extra)
+
+def diccionario_desde_frecuencias(nombres, min_freq=2, variantes_extra=None):
+    """
+    Igual que crear_diccionario_empresas, a partir de un conteo nombre → frecuencia ya hecho.
+    """
     base = nombres[nombres >= min_freq].index.tolist()
 
     if variantes_extra:
@@ -16,10 +33,16 @@ def crear_diccionario_empresas(df, columna, min_freq=2, variantes_extra=None):
     return sorted(set(base), key=lambda x: -len(x))  # Prioriza nombres largos
 
 # Corrección con score y heurística
-def corregir_nombre_con_score(nombre, diccionario, umbral=80):
+def corregir_nombre_con_score(nombre, diccionario, umbral=80, indice=None):
     if not nombre or pd.isna(nombre):
         return nombre, 0
 
+    # Con índice, solo se puntúan los candidatos que comparten n-gramas
+    if indice is not None:
+        diccionario = candidatos_indice(nombre, indice)
+        if not diccionario:
+            return nombre, 0
+
     resultado = process.extractOne(nombre, diccionario, scorer=fuzz.WRatio)
     if resultado and resultado[1] < umbral:
         resultado = process.extractOne(nombre, diccionario, scorer=fuzz.token_set_ratio)
@@ -36,7 +59,7 @@ def corregir_nombre_con_score(nombre, diccionario, umbral=80):
     return nombre, 0
 
 # Corrección por partes (fallback)
-def correccion_por_partes(nombre, diccionario, umbral=85):
+def correccion_por_partes(nombre, diccionario, umbral=85, indice=None, cache=None):
     palabras = nombre.split()
     if len(palabras) <= 1:
         return nombre
@@ -46,35 +69,322 @@ def correccion_por_partes(nombre, diccionario, umbral=85):
         if len(palabra) <= 3:
             corregidas.append(palabra)
             continue
-        match, score = corregir_nombre_con_score(palabra, diccionario, umbral)
-        corregidas.append(match if score > umbral else palabra)
+
+        # Palabras frecuentes (SERVICIOS, CONSTRUCCIONES...) se resuelven desde la caché
+        if cache is not None and palabra in cache:
+            corregidas.append(cache[palabra])
+            continue
+        match, score = corregir_nombre_con_score(palabra, diccionario, umbral, indice)
+        corregida = match if score > umbral else palabra
+        if cache is not None:
+            cache[palabra] = corregida
+        corregidas.append(corregida)
 
     return " ".join(corregidas)
 
+# Estado de cada proceso del pool: el diccionario se recibe una sola vez en el initializer
+ESTADO_WORKER = {}
+
+def iniciar_worker_partes(diccionario, indice, umbral):
+    ESTADO_WORKER.update(diccionario=diccionario, indice=indice, umbral=umbral, cache={})
+
+def corregir_bloque_partes(nombres):
+    return [
+        correccion_por_partes(
+            nombre, ESTADO_WORKER["diccionario"], ESTADO_WORKER["umbral"],
+            indice=ESTADO_WORKER["indice"], cache=ESTADO_WORKER["cache"]
+        )
+        for nombre in nombres
+    ]
+
+# Pool de procesos compartido entre llamadas (p. ej. los bloques de ejecutar_pipeline_por_bloques):
+# se crea una vez por diccionario, índice, umbral y nº de procesos, y el diccionario se envía
+# a cada proceso una sola vez. cerrar_pool_partes() lo libera al terminar.
+POOL_PARTES = {"pool": None, "argumentos": None}
+
+def pool_partes(diccionario, indice, umbral, procesos):
+    argumentos = POOL_PARTES["argumentos"]
+    if argumentos is None or not (
+        argumentos[0] is diccionario and argumentos[1] is indice and argumentos[2:] == (umbral, procesos)
+    ):
+        cerrar_pool_partes()
+        POOL_PARTES["pool"] = ProcessPoolExecutor(
+            max_workers=procesos, initializer=iniciar_worker_partes, initargs=(diccionario, indice, umbral)
+        )
+        POOL_PARTES["argumentos"] = (diccionario, indice, umbral, procesos)
+    return POOL_PARTES["pool"]
+
+def cerrar_pool_partes():
+    if POOL_PARTES["pool"] is not None:
+        POOL_PARTES["pool"].shutdown()
+    POOL_PARTES.update(pool=None, argumentos=None)
+
+# Corrección por partes en paralelo (ProcessPoolExecutor)
+def correccion_por_partes_paralela(nombres, diccionario, umbral=85, indice=None, procesos=None, tamano_bloque=500):
+    """
+    Reparte correccion_por_partes entre procesos por bloques de nombres.
+    Cada proceso conserva su propia caché de palabras ya corregidas (también entre llamadas
+    con el mismo diccionario, porque el pool se reutiliza).
+    """
+    nombres = list(nombres)
+
+    bloques = [nombres[i:i + tamano_bloque] for i in range(0, len(nombres), tamano_bloque)]
+    pool = pool_partes(diccionario, indice, umbral, procesos)
+    return [nombre for bloque in pool.map(corregir_bloque_partes, bloques) for nombre in bloque]
+
+# Corrección por lotes (matrices multihilo de RapidFuzz)
+def corregir_lote(nombres, diccionario, umbral=80, max_celdas=10_000_000):
+    """
+    Equivalente vectorizado de corregir_nombre_con_score para una lista de nombres.
+    Puntúa por bloques con process.cdist (workers=-1); cada bloque ocupa como
+    máximo `max_celdas` puntuaciones en memoria.
+    """
+    nombres = list(nombres)
+    matches = np.array(nombres, dtype=object)
+    scores = np.zeros(len(nombres), dtype=object)  # 0 entero o score float, como la versión fila a fila
+    validos = [i for i, nombre in enumerate(nombres) if isinstance(nombre, str) and nombre]
+    if not validos or not diccionario:
+        return matches, scores
+
+    candidatos_dic = np.array(diccionario, dtype=object)
+    tamano_bloque = max(1, max_celdas // len(diccionario))
+
+    for inicio in range(0, len(validos), tamano_bloque):
+        bloque = np.array(validos[inicio:inicio + tamano_bloque])
+        consultas = [nombres[i] for i in bloque]
+        filas = np.arange(len(consultas))
+
+        # 1. WRatio contra todo el diccionario (argmax conserva el primer empate, como extractOne).
+        #    Lo que queda bajo el umbral se descarta igualmente, así que se poda con score_cutoff.
+        matriz = process.cdist(consultas, diccionario, scorer=fuzz.WRatio,
+                               score_cutoff=umbral, dtype=np.float64, workers=-1)
+        mejor = matriz.argmax(axis=1)
+        score = matriz[filas, mejor]
+
+        # 2. Fallback token_set_ratio si no se alcanza el umbral
+        bajos = np.flatnonzero(score < umbral)
+        if len(bajos):
+            matriz = process.cdist(
+                [consultas[i] for i in bajos], diccionario,
+                scorer=fuzz.token_set_ratio, score_cutoff=umbral, dtype=np.float64, workers=-1
+            )
+            mejor[bajos] = matriz.argmax(axis=1)
+            score[bajos] = matriz[np.arange(len(bajos)), mejor[bajos]]
+        del matriz
+
+        # 3. Heurística: tokens en común o prefijo contenido en el match
+        mejor_match = candidatos_dic[mejor]
+        heuristica = np.fromiter(
+            (bool(set(n.split()) & set(m.split())) or n[:4] in m for n, m in zip(consultas, mejor_match)),
+            dtype=bool, count=len(consultas)
+        )
+        aceptados = (score >= umbral) & heuristica
+        matches[bloque[aceptados]] = mejor_match[aceptados]
+        scores[bloque[aceptados]] = score[aceptados]
+
+    return matches, scores
+
+# Corrección por partes en lote (fallback)
+def correccion_por_partes_lote(nombres, diccionario, umbral=85, max_celdas=10_000_000):
+    """
+    Equivalente de correccion_por_partes que puntúa cada palabra distinta una sola vez.
+    """
+    nombres = list(nombres)
+    palabras = list(dict.fromkeys(
+        palabra for nombre in nombres if len(nombre.split()) > 1
+        for palabra in nombre.split() if len(palabra) > 3
+    ))
+    matches, scores = corregir_lote(palabras, diccionario, umbral, max_celdas)
+    correcciones = {p: m for p, m, s in zip(palabras, matches, scores) if s > umbral}
+
+    return [
+        nombre if len(nombre.split()) <= 1
+        else " ".join(correcciones.get(palabra, palabra) for palabra in nombre.split())
+        for nombre in nombres
+    ]
+
+# Corrección de una lista de nombres normalizados distintos
+def corregir_unicos(unicos, diccionario, indice=None, lote=False, procesos=None, usar_indice=True):
+    """
+    Devuelve (matches, scores, finales) para cada nombre de `unicos`.
+    Por defecto se puntúan solo los candidatos del índice de n-gramas (mismo resultado
+    que extractOne sobre todo el diccionario, comprobado con benchmark_indice.py
+    --comprobar); usar_indice=False puntúa el diccionario completo.
+    """
+    if lote:
+        # 3. Corrección con score por lotes
+        matches, scores = corregir_lote(unicos, diccionario, umbral=80)
+
+        # 4. Fallback por partes si el score es bajo
+        finales = matches.copy()
+        bajos = np.flatnonzero(scores < 70)
+        finales[bajos] = correccion_por_partes_lote(matches[bajos], diccionario)
+    else:
+        if not usar_indice:
+            indice = None
+        elif indice is None:
+            indice = construir_indice(diccionario)
+
+        # 3. Corrección con score
+        resultados = [corregir_nombre_con_score(x, diccionario, umbral=80, indice=indice) for x in unicos]
+        matches = np.empty(len(resultados), dtype=object)
+        scores = np.empty(len(resultados), dtype=object)
+        for i, (match, score) in enumerate(resultados):
+            matches[i], scores[i] = match, score
+
+        # 4. Fallback por partes si el score es bajo (en paralelo si se indican procesos)
+        finales = matches.copy()
+        bajos = [i for i, score in enumerate(scores) if score < 70]
+        if procesos and len(bajos) > 1:
+            finales[bajos] = correccion_por_partes_paralela(
+                matches[bajos], diccionario, indice=indice, procesos=procesos
+            )
+        else:
+            cache = {}
+            for i in bajos:
+                finales[i] = correccion_por_partes(matches[i], diccionario, indice=indice, cache=cache)
+
+    return matches, scores, finales
+
+# Primera pasada del modo por bloques: frecuencias de los nombres normalizados
+def contar_frecuencias_por_bloques(ruta, columna_original, tamano_bloque=100_000, encoding="utf-8"):
+    """
+    Lee solo la columna de nombres por bloques y devuelve el conteo de sus formas
+    normalizadas sobre todo el archivo (la memoria depende de los nombres distintos).
+    """
+    conteo = {}
+    for bloque in pd.read_csv(ruta, usecols=[columna_original], chunksize=tamano_bloque, encoding=encoding):
+        codigos, originales = pd.factorize(bloque[columna_original], use_na_sentinel=False)
+        normalizados = normalizar_serie(pd.Series(originales, dtype=object)).to_numpy(dtype=object)
+        for nombre, frecuencia in pd.Series(normalizados[codigos], dtype=object).value_counts(sort=False).items():
+            conteo[nombre] = conteo.get(nombre, 0) + int(frecuencia)
+
+    # Mismo orden que value_counts sobre el archivo completo (frecuencia y luego primera aparición)
+    return pd.Series(conteo, dtype="int64").sort_values(ascending=False, kind="stable")
+
 # Pipeline completo de corrección
-def pipeline_correccion(df, columna_original, variantes_extra=None):
+def pipeline_correccion(df, columna_original, variantes_extra=None, lote=False, ruta_diccionario=None, fuente=None,
+                        procesos=None, diccionario=None, indice=None, cache=None, usar_indice=True):
+    """
+    Con `diccionario` (y su `indice`) ya construidos se omite el paso 2; `cache`
+    (dict normalizado → (match, score, final)) evita repetir nombres entre llamadas.
+    """
+    # 0. Cada nombre distinto se procesa una sola vez y se propaga con los códigos
+    codigos, originales = pd.factorize(df[columna_original], use_na_sentinel=False)
+
     # 1. Normalización previa
-    df["NOMBRE_NORMALIZADO"] = df[columna_original].apply(normalizar_nombre)
+    normalizados = normalizar_serie(pd.Series(originales, dtype=object)).to_numpy(dtype=object)
+    df["NOMBRE_NORMALIZADO"] = normalizados[codigos]
+
+    # 2. Diccionario limpio (las frecuencias se cuentan sobre todas las filas).
+    #    Con ruta_diccionario se reutiliza y actualiza el diccionario persistente en disco.
+    if diccionario is None and ruta_diccionario:
+        conexion = abrir_diccionario(ruta_diccionario)
+        try:
+            actualizar_diccionario(conexion, df["NOMBRE_NORMALIZADO"], variantes_extra=variantes_extra, fuente=fuente)
+            diccionario, indice = cargar_diccionario(conexion)
+        finally:
+            conexion.close()
+    elif diccionario is None:
+        diccionario = crear_diccionario_empresas(df, "NOMBRE_NORMALIZADO", variantes_extra=variantes_extra)
+
+    # 3-4. Corrección con score y fallback por partes, una vez por nombre normalizado
+    codigos, unicos = pd.factorize(df["NOMBRE_NORMALIZADO"])
+    if cache is None:
+        matches, scores, finales = corregir_unicos(
+            unicos, diccionario, indice=indice, lote=lote, procesos=procesos, usar_indice=usar_indice
+        )
+    else:
+        pendientes = [i for i, nombre in enumerate(unicos) if nombre not in cache]
+        if pendientes:
+            m, sc, f = corregir_unicos(
+                unicos[pendientes], diccionario, indice=indice, lote=lote, procesos=procesos, usar_indice=usar_indice
+            )
+            cache.update(zip(unicos[pendientes], zip(m, sc, f)))
+        matches = np.empty(len(unicos), dtype=object)
+        scores = np.empty(len(unicos), dtype=object)
+        finales = np.empty(len(unicos), dtype=object)
+        for i, nombre in enumerate(unicos):
+            matches[i], scores[i], finales[i] = cache[nombre]
+
+    # Propagar los resultados a todas las filas
+    df["MATCH_CORREGIDO"] = matches[codigos]
+    df["MATCH_SCORE"] = pd.Series(scores[codigos], index=df.index).infer_objects()
+    df["CORREGIDO_FINAL"] = finales[codigos]
+
+    # 5. Estado de corrección
+    estados = np.where(np.asarray(unicos, dtype=object) != finales, "Corregido", "Sin cambio")
+    df["STATUS_CORRECCIÓN"] = estados[codigos]
+
+    return df
+
+# Pipeline incremental: solo normaliza y corrige los nombres no vistos en ejecuciones previas
+def pipeline_correccion_incremental(df, columna_original, ruta_diccionario, variantes_extra=None, lote=False, fuente=None,
+                                    procesos=None, diccionario=None, indice=None, usar_indice=True):
+    """
+    Igual que pipeline_correccion con diccionario persistente, pero reutiliza el registro
+    de correcciones (clave = hash del nombre original) guardado en el mismo archivo.
+    Con `diccionario` e `indice` ya cargados no se vuelven a leer del archivo.
+    """
+    conexion = abrir_diccionario(ruta_diccionario)
+    try:
+        # 0. Nombres distintos y su clave de contenido
+        codigos, originales = pd.factorize(df[columna_original], use_na_sentinel=False)
+        claves = [clave_nombre(nombre) if isinstance(nombre, str) else None for nombre in originales]
+        previas = buscar_correcciones(conexion, [clave for clave in claves if clave])
+
+        # 1. Normalización solo de los nombres no registrados
+        normalizados = np.empty(len(originales), dtype=object)
+        no_vistos = [i for i, clave in enumerate(claves) if clave not in previas]
+        for i, clave in enumerate(claves):
+            if clave in previas:
+                normalizados[i] = previas[clave][0]
+        normalizados[no_vistos] = normalizar_serie(
+            pd.Series([originales[i] for i in no_vistos], dtype=object)
+        ).to_numpy(dtype=object)
+        df["NOMBRE_NORMALIZADO"] = normalizados[codigos]
+
+        # 2. Diccionario persistente e invalidación selectiva del registro
+        actualizar_diccionario(conexion, df["NOMBRE_NORMALIZADO"], variantes_extra=variantes_extra, fuente=fuente)
+        invalidadas = invalidar_correcciones(conexion, usar_indice=usar_indice and not lote)
+        if invalidadas:
+            previas = buscar_correcciones(conexion, [clave for clave in claves if clave])
+            print(f"Correcciones invalidadas por cambios en el diccionario: {invalidadas}")
+        if diccionario is None:
+            diccionario, indice = cargar_diccionario(conexion)
+
+        # 3-4. Corrección solo de lo pendiente, una vez por nombre normalizado
+        matches = np.empty(len(originales), dtype=object)
+        scores = np.empty(len(originales), dtype=object)
+        finales = np.empty(len(originales), dtype=object)
+        pendientes = []
+        for i, clave in enumerate(claves):
+            if clave in previas:
+                _, matches[i], scores[i], finales[i] = previas[clave]
+            else:
+                pendientes.append(i)
 
-    # 2. Diccionario limpio
-    diccionario = crear_diccionario_empresas(df, "NOMBRE_NORMALIZADO", variantes_extra=variantes_extra)
+        codigos_pend, unicos = pd.factorize(pd.Series(normalizados[pendientes], dtype=object))
+        m, sc, f = corregir_unicos(
+            unicos, diccionario, indice=indice, lote=lote, procesos=procesos, usar_indice=usar_indice
+        )
+        matches[pendientes], scores[pendientes], finales[pendientes] = m[codigos_pend], sc[codigos_pend], f[codigos_pend]
 
-    # 3. Corrección con score
-    df[["MATCH_CORREGIDO", "MATCH_SCORE"]] = df["NOMBRE_NORMALIZADO"].apply(
-        lambda x: pd.Series(corregir_nombre_con_score(x, diccionario, umbral=80))
-    )
+        guardar_correcciones(conexion, (
+            (claves[i], normalizados[i], matches[i], scores[i], finales[i])
+            for i in pendientes if claves[i]
+        ))
+        print(f"Nombres corregidos en esta ejecución: {len(pendientes)} de {len(originales)} distintos")
+    finally:
+        conexion.close()
 
-    # 4. Fallback por partes si el score es bajo
-    df["CORREGIDO_FINAL"] = df.apply(
-        lambda row: correccion_por_partes(row["MATCH_CORREGIDO"], diccionario)
-        if row["MATCH_SCORE"] < 70 else row["MATCH_CORREGIDO"],
-        axis=1
-    )
+    # Propagar los resultados a todas las filas
+    df["MATCH_CORREGIDO"] = matches[codigos]
+    df["MATCH_SCORE"] = pd.Series(scores[codigos], index=df.index).infer_objects()
+    df["CORREGIDO_FINAL"] = finales[codigos]
 
     # 5. Estado de corrección
-    df["STATUS_CORRECCIÓN"] = df.apply(
-        lambda row: "Corregido" if row["NOMBRE_NORMALIZADO"] != row["CORREGIDO_FINAL"] else "Sin cambio",
-        axis=1
-    )
+    estados = np.where(normalizados != finales, "Corregido", "Sin cambio")
+    df["STATUS_CORRECCIÓN"] = estados[codigos]
 
     return df
@@ -1,8 +1,9 @@
 # Librerías
 import pandas as pd
+from scraping_comun.intermedios import guardar_intermedio, leer_intermedio
 
-# Cargar archivos
-df_empresas = pd.read_csv("empresas_limpias_corregidas_final.csv", encoding="utf-8-sig")
+# Cargar archivos (el intermedio en CSV o Parquet según FORMATO_INTERMEDIOS)
+df_empresas = leer_intermedio("empresas_limpias_corregidas_final")
 df_diccionario = pd.read_csv("diccionario_nombres_corregidos.csv", encoding="utf-8-sig")
 
 # Crear diccionario manual: ADJUDICATARIO → NOMBRE_CORREGIDO_FINAL
@@ -32,13 +33,13 @@ print(corregidos[["ADJUDICATARIO", "ANTES_CORRECCIÓN", "CORREGIDO_FINAL"]])
 corregidos.to_csv("log_correcciones_aplicadas.csv", index=False, encoding="utf-8-sig")
 
 # Exportar archivo final corregido
-df_empresas.to_csv("empresas_corregidas_final.csv", index=False, encoding="utf-8-sig")
+guardar_intermedio(df_empresas, "empresas_corregidas_final")
 
 # Crear nuevo DataFrame con columnas seleccionadas desde df_empresas
 columnas_seleccionadas = ['Nº', 'CORREGIDO_FINAL', 'CIF']
 df_nombres_scraping = df_empresas[columnas_seleccionadas]
 
-# Guardar como CSV limpio y final
-df_nombres_scraping.to_csv("nombres_scraping.csv", index=False, encoding="utf-8-sig")
+# Guardar como archivo limpio y final (entrada de buscar_url)
+guardar_intermedio(df_nombres_scraping, "nombres_scraping")
 
 df_nombres_scraping.head()
\ No newline at end of file
@@ -0,0 +1,227 @@
+# Librerías para el diccionario persistente en disco (SQLite):
+import hashlib
+import sqlite3
+from collections import defaultdict
+import numpy as np
+from rapidfuzz import process, fuzz
+from indice import generar_ngramas, completar_indice, clave_exacta
+
+VERSION_ESQUEMA = 1
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS metadatos (clave TEXT PRIMARY KEY, valor TEXT);
+CREATE TABLE IF NOT EXISTS frecuencias (nombre TEXT PRIMARY KEY, frecuencia INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS diccionario (id INTEGER PRIMARY KEY, nombre TEXT UNIQUE NOT NULL, longitud INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS ngramas (ngrama TEXT PRIMARY KEY, ids BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS fuentes (fuente TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS correcciones (clave TEXT PRIMARY KEY, normalizado TEXT NOT NULL, match TEXT, score, final TEXT);
+CREATE INDEX IF NOT EXISTS correcciones_normalizado ON correcciones (normalizado);
+"""
+
+def abrir_diccionario(ruta="diccionario_empresas.sqlite", n=3):
+    """
+    Abre (o crea) el diccionario persistente y comprueba su versión.
+    """
+    conexion = sqlite3.connect(ruta)
+    conexion.executescript(ESQUEMA)
+
+    metadatos = dict(conexion.execute("SELECT clave, valor FROM metadatos"))
+    if not metadatos:
+        conexion.executemany(
+            "INSERT INTO metadatos VALUES (?, ?)",
+            [("version", str(VERSION_ESQUEMA)), ("n", str(n))]
+        )
+        conexion.commit()
+    elif int(metadatos["version"]) != VERSION_ESQUEMA:
+        conexion.close()
+        raise ValueError(f"Versión de diccionario no compatible en {ruta}: {metadatos['version']}")
+
+    return conexion
+
+def agregar_al_diccionario(conexion, nombres):
+    """
+    Inserta nombres nuevos en el diccionario y actualiza su índice de n-gramas.
+    """
+    n = int(conexion.execute("SELECT valor FROM metadatos WHERE clave = 'n'").fetchone()[0])
+    nuevos_ids = defaultdict(list)
+
+    for nombre in nombres:
+        cursor = conexion.execute(
+            "INSERT OR IGNORE INTO diccionario (nombre, longitud) VALUES (?, ?)", (nombre, len(nombre))
+        )
+        if cursor.rowcount:
+            for ngrama in generar_ngramas(nombre, n):
+                nuevos_ids[ngrama].append(cursor.lastrowid)
+
+    for ngrama, ids in nuevos_ids.items():
+        fila = conexion.execute("SELECT ids FROM ngramas WHERE ngrama = ?", (ngrama,)).fetchone()
+        previos = fila[0] if fila else b""
+        conexion.execute(
+            "INSERT OR REPLACE INTO ngramas VALUES (?, ?)",
+            (ngrama, previos + np.array(ids, dtype=np.int32).tobytes())
+        )
+
+def actualizar_diccionario(conexion, nombres, min_freq=2, variantes_extra=None, fuente=None, contados=False):
+    """
+    Suma las frecuencias de `nombres` (Series de nombres normalizados, o conteo
+    nombre → frecuencia con contados=True) y añade al diccionario los que superan
+    min_freq. Si `fuente` ya se contabilizó, no se vuelve a sumar.
+    """
+    if fuente is not None:
+        if conexion.execute("SELECT 1 FROM fuentes WHERE fuente = ?", (fuente,)).fetchone():
+            nombres = nombres.iloc[:0]
+        else:
+            conexion.execute("INSERT INTO fuentes VALUES (?)", (fuente,))
+
+    # 1. Acumular frecuencias
+    conteo = nombres if contados else nombres.value_counts()
+    conexion.executemany(
+        "INSERT INTO frecuencias VALUES (?, ?) "
+        "ON CONFLICT(nombre) DO UPDATE SET frecuencia = frecuencia + excluded.frecuencia",
+        [(nombre, int(frecuencia)) for nombre, frecuencia in conteo.items()]
+    )
+
+    # 2. Si cambia min_freq se rehace el diccionario completo
+    fila = conexion.execute("SELECT valor FROM metadatos WHERE clave = 'min_freq'").fetchone()
+    if fila is not None and int(fila[0]) != min_freq:
+        conexion.execute("DELETE FROM diccionario")
+        conexion.execute("DELETE FROM ngramas")
+        conexion.execute("DELETE FROM correcciones")  # el registro incremental deja de ser válido
+        conexion.execute("DELETE FROM metadatos WHERE clave = 'id_registro'")
+        candidatos = [r[0] for r in conexion.execute(
+            "SELECT nombre FROM frecuencias WHERE frecuencia >= ? ORDER BY rowid", (min_freq,)
+        )]
+    else:
+        # Solo pueden cruzar el umbral los nombres cuya frecuencia acaba de cambiar
+        conexion.execute("CREATE TEMP TABLE IF NOT EXISTS lote (nombre TEXT PRIMARY KEY)")
+        conexion.execute("DELETE FROM lote")
+        conexion.executemany("INSERT INTO lote VALUES (?)", ((nombre,) for nombre in conteo.index))
+        candidatos = [r[0] for r in conexion.execute(
+            "SELECT f.nombre FROM frecuencias f JOIN lote l ON f.nombre = l.nombre "
+            "WHERE f.frecuencia >= ? ORDER BY f.rowid", (min_freq,)
+        )]
+    conexion.execute("INSERT OR REPLACE INTO metadatos VALUES ('min_freq', ?)", (str(min_freq),))
+
+    # 3. Insertar solo los nombres que aún no están en el diccionario
+    agregar_al_diccionario(conexion, candidatos + list(variantes_extra or []))
+    conexion.commit()
+
+def cargar_diccionario(conexion):
+    """
+    Devuelve el diccionario (nombres largos primero) y su índice de n-gramas
+    con el mismo formato que construir_indice.
+    """
+    n = int(conexion.execute("SELECT valor FROM metadatos WHERE clave = 'n'").fetchone()[0])
+    filas = conexion.execute("SELECT id, nombre FROM diccionario ORDER BY longitud DESC, id").fetchall()
+    diccionario = [nombre for _, nombre in filas]
+
+    # Los n-gramas guardan ids; se traducen a posiciones del diccionario ordenado
+    ids = np.array([id_ for id_, _ in filas], dtype=np.int64)
+    posicion_por_id = np.zeros(int(ids.max()) + 1 if len(ids) else 1, dtype=np.int32)
+    posicion_por_id[ids] = np.arange(len(ids), dtype=np.int32)
+
+    ngramas = {}
+    for ngrama, blob in conexion.execute("SELECT ngrama, ids FROM ngramas"):
+        ngramas[ngrama] = posicion_por_id[np.frombuffer(blob, dtype=np.int32)]
+
+    return diccionario, completar_indice(diccionario, ngramas, n)
+
+# ─── Registro de correcciones (modo incremental) ─────────────────────────────
+def clave_nombre(nombre):
+    """
+    Hash de contenido del nombre original, usado como clave del registro.
+    """
+    return hashlib.sha1(nombre.encode("utf-8")).hexdigest()
+
+def buscar_correcciones(conexion, claves):
+    """
+    Devuelve {clave: (normalizado, match, score, final)} para las claves ya registradas.
+    """
+    conexion.execute("CREATE TEMP TABLE IF NOT EXISTS claves (clave TEXT PRIMARY KEY)")
+    conexion.execute("DELETE FROM claves")
+    conexion.executemany("INSERT OR IGNORE INTO claves VALUES (?)", ((clave,) for clave in claves))
+    filas = conexion.execute(
+        "SELECT c.clave, c.normalizado, c.match, c.score, c.final "
+        "FROM correcciones c JOIN claves k ON c.clave = k.clave"
+    )
+    return {clave: tuple(resto) for clave, *resto in filas}
+
+def guardar_correcciones(conexion, filas):
+    """
+    Registra filas (clave, normalizado, match, score, final).
+    """
+    conexion.executemany(
+        "INSERT OR REPLACE INTO correcciones VALUES (?, ?, ?, ?, ?)",
+        ((clave, normalizado, match, score if isinstance(score, int) else float(score), final)
+         for clave, normalizado, match, score, final in filas)
+    )
+    conexion.commit()
+
+def alcanzan_umbral(consultas, nuevos, umbral, max_celdas=10_000_000):
+    """
+    Máscara de las `consultas` para las que algún nombre de `nuevos` puntúa `umbral`
+    o más con WRatio o token_set_ratio (los dos scorers de corregir_nombre_con_score).
+    """
+    alcanzan = np.zeros(len(consultas), dtype=bool)
+    tamano_bloque = max(1, max_celdas // max(len(nuevos), 1))
+    for inicio in range(0, len(consultas), tamano_bloque):
+        bloque = consultas[inicio:inicio + tamano_bloque]
+        for scorer in (fuzz.WRatio, fuzz.token_set_ratio):
+            matriz = process.cdist(bloque, nuevos, scorer=scorer, score_cutoff=umbral, dtype=np.float64, workers=-1)
+            alcanzan[inicio:inicio + len(bloque)] |= matriz.max(axis=1) >= umbral
+    return alcanzan
+
+def invalidar_correcciones(conexion, usar_indice=False, max_candidatos=500, max_frecuencia=0.15,
+                           umbral=80, umbral_partes=85):
+    """
+    Elimina del registro solo las correcciones que podrían cambiar por los nombres
+    añadidos al diccionario desde la última invalidación.
+    - Sin índice (búsqueda completa): las que algún nombre nuevo podría ganar, es decir,
+      cuyo nombre alcanza `umbral` con algún nombre nuevo o, si pasaron por la corrección
+      por partes (score < 70), alguna de cuyas palabras alcanza `umbral_partes`.
+    - Con índice: las que comparten algún n-grama selectivo o la clave exacta con ellos
+      (mismo criterio que candidatos_indice).
+    """
+    fila = conexion.execute("SELECT valor FROM metadatos WHERE clave = 'id_registro'").fetchone()
+    ultimo_id = int(fila[0]) if fila else 0
+    n = int(conexion.execute("SELECT valor FROM metadatos WHERE clave = 'n'").fetchone()[0])
+    nuevos = [r[0] for r in conexion.execute("SELECT nombre FROM diccionario WHERE id > ?", (ultimo_id,))]
+    max_id = conexion.execute("SELECT COALESCE(MAX(id), 0) FROM diccionario").fetchone()[0]
+
+    invalidados = []
+    if nuevos and not usar_indice:
+        registrados = conexion.execute("SELECT DISTINCT normalizado, score FROM correcciones").fetchall()
+        nombres = [nombre for nombre, _ in registrados]
+        afectados = set(np.asarray(nombres, dtype=object)[alcanzan_umbral(nombres, nuevos, umbral)]) if nombres else set()
+
+        # Las palabras de más de 3 letras de los nombres corregidos por partes
+        por_partes = [nombre for nombre, score in registrados if (score or 0) < 70]
+        palabras = list({p for nombre in por_partes for p in nombre.split() if len(p) > 3})
+        if palabras:
+            cambian = set(np.asarray(palabras, dtype=object)[alcanzan_umbral(palabras, nuevos, umbral_partes)])
+            afectados.update(nombre for nombre in por_partes if cambian.intersection(nombre.split()))
+
+        invalidados = sorted(afectados)
+        conexion.executemany("DELETE FROM correcciones WHERE normalizado = ?", ((nombre,) for nombre in invalidados))
+    elif nuevos:
+        # 1. N-gramas de los nombres nuevos, separando los selectivos de los muy comunes
+        total = conexion.execute("SELECT COUNT(*) FROM diccionario").fetchone()[0]
+        limite = max(max_candidatos, int(total * max_frecuencia))
+        tamanos = dict(conexion.execute("SELECT ngrama, LENGTH(ids) / 4 FROM ngramas"))
+        ngramas_nuevos = set().union(*(generar_ngramas(nombre, n) for nombre in nuevos))
+        selectivos_nuevos = {g for g in ngramas_nuevos if tamanos.get(g, 0) <= limite}
+        claves_nuevas = {clave_exacta(nombre) for nombre in nuevos}
+
+        # 2. Nombres registrados cuya lista de candidatos puede incluir algún nombre nuevo
+        for (normalizado,) in conexion.execute("SELECT DISTINCT normalizado FROM correcciones"):
+            ngramas = generar_ngramas(normalizado, n)
+            sin_selectivos = not any(0 < tamanos.get(g, 0) <= limite for g in ngramas)
+            if (ngramas & selectivos_nuevos or (sin_selectivos and ngramas & ngramas_nuevos)
+                    or clave_exacta(normalizado) in claves_nuevas):
+                invalidados.append(normalizado)
+
+        conexion.executemany("DELETE FROM correcciones WHERE normalizado = ?", ((nombre,) for nombre in invalidados))
+
+    conexion.execute("INSERT OR REPLACE INTO metadatos VALUES ('id_registro', ?)", (str(max_id),))
+    conexion.commit()
+    return len(invalidados)
@@ -0,0 +1,87 @@
+# Librerías para el índice de candidatos (blocking) del diccionario:
+import re
+from collections import defaultdict
+import numpy as np
+
+def generar_ngramas(nombre, n=3):
+    """
+    Devuelve el conjunto de n-gramas de caracteres de un nombre (con bordes de palabra).
+    """
+    if not isinstance(nombre, str) or not nombre:
+        return set()
+
+    texto = f" {nombre} "
+    if len(texto) <= n:
+        return {texto}
+    return {texto[i:i + n] for i in range(len(texto) - n + 1)}
+
+def clave_exacta(nombre):
+    # Igualdad sin mayúsculas, espacios ni puntuación ("OBRAS, S.L." == "obras sl")
+    return re.sub(r"[\W_]+", "", nombre.upper())
+
+def construir_indice(diccionario, n=3):
+    """
+    Construye un índice invertido n-grama → posiciones del diccionario.
+    Se construye una sola vez a partir de crear_diccionario_empresas.
+    """
+    ngramas = defaultdict(list)
+    for posicion, nombre in enumerate(diccionario):
+        for ngrama in generar_ngramas(nombre, n):
+            ngramas[ngrama].append(posicion)
+
+    return completar_indice(list(diccionario), {g: np.array(p, dtype=np.int32) for g, p in ngramas.items()}, n)
+
+def completar_indice(diccionario, ngramas, n):
+    """
+    Añade a las listas de n-gramas el número de n-gramas de cada nombre (para la
+    similitud normalizada) y las posiciones de cada clave exacta.
+    """
+    exactos = defaultdict(list)
+    for posicion, nombre in enumerate(diccionario):
+        exactos[clave_exacta(nombre)].append(posicion)
+
+    return {
+        "diccionario": diccionario,
+        "ngramas": ngramas,
+        "n": n,
+        "tamanos": np.array([len(generar_ngramas(nombre, n)) for nombre in diccionario], dtype=np.float64),
+        "exactos": dict(exactos)
+    }
+
+def candidatos_indice(nombre, indice, max_candidatos=500, max_frecuencia=0.15):
+    """
+    Preselecciona los nombres del diccionario más parecidos a `nombre` por n-gramas.
+    Los coincidentes exactos (sin mayúsculas ni puntuación) entran siempre; el resto se
+    ordena por similitud normalizada: Dice, o contención de un nombre en el otro, como
+    hace WRatio con partial_ratio. Los n-gramas demasiado comunes (SL, SA, ...) no generan
+    candidatos, pero sí cuentan en la similitud.
+    Conserva el orden original del diccionario para respetar los empates de extractOne.
+    """
+    diccionario = indice["diccionario"]
+    ngramas_nombre = generar_ngramas(nombre, indice["n"])
+    listas = [indice["ngramas"][g] for g in ngramas_nombre if g in indice["ngramas"]]
+    exactos = indice["exactos"].get(clave_exacta(nombre), [])
+    if not listas:
+        return [diccionario[p] for p in exactos]
+
+    # 1. Candidatos: nombres que comparten algún n-grama selectivo
+    limite = max(max_candidatos, int(len(diccionario) * max_frecuencia))
+    selectivas = [lista for lista in listas if len(lista) <= limite] or listas
+    posiciones = np.unique(np.concatenate(selectivas))
+
+    # 2. Similitud con todos los n-gramas compartidos
+    if len(posiciones) > max_candidatos:
+        compartidos = np.bincount(np.concatenate(listas), minlength=len(diccionario))[posiciones]
+        tamanos = indice["tamanos"][posiciones]
+        similitud = np.maximum.reduce([
+            2 * compartidos / (len(ngramas_nombre) + tamanos),   # Dice
+            0.9 * compartidos / tamanos,                         # candidato contenido en el nombre
+            0.9 * compartidos / len(ngramas_nombre),             # nombre contenido en el candidato
+        ])
+        # Empates de similitud: primero el que aparece antes en el diccionario (orden estable)
+        mejores = np.argsort(-similitud, kind="stable")[:max_candidatos]
+        posiciones = posiciones[mejores]
+
+    # 3. Exactos siempre incluidos, en el orden del diccionario
+    posiciones = np.union1d(posiciones, np.asarray(exactos, dtype=posiciones.dtype))
+    return [diccionario[p] for p in posiciones]
@@ -1,9 +1,11 @@
 # Librerías para validación:
+import numpy as np
 import pandas as pd
+from scraping_comun.intermedios import exportar_csv
 
-def generar_revision_manual(df, output_file="revision_manual.csv", min_score=60, max_score=85):
+def generar_revision_manual(df, output_file="revision_manual.csv", min_score=60, max_score=85, anexar=False):
     """
-    Exporta casos con score intermedio para revisión humana.
+    Exporta casos con score intermedio para revisión humana. Devuelve True si exportó alguno.
     """
     revision = df[(df["MATCH_SCORE"] > min_score) & (df["MATCH_SCORE"] < max_score)].copy()
     
@@ -13,22 +15,24 @@ def generar_revision_manual(df, output_file="revision_manual.csv", min_score=60,
             "ADJUDICATARIO", "NOMBRE_LIMPIO", "NOMBRE_CORREGIDO", 
             "MATCH_SCORE", "CORREGIDO_FINAL", "CORRECCION_MANUAL"
         ]
-        revision[columnas].to_csv(output_file, index=False, encoding="utf-8-sig")
+        exportar_csv(revision[columnas], output_file, anexar)
         print(f"Revisión manual exportada a: {output_file}")
     else:
         print("No hay casos intermedios para revisión.")
+    return not revision.empty
 
-def exportar_casos_sospechosos(df, output_file="correcciones_sospechosas.csv", delta_longitud=20):
+def exportar_casos_sospechosos(df, output_file="correcciones_sospechosas.csv", delta_longitud=20, anexar=False):
     """
     Detecta correcciones sospechosas por divergencia semántica o longitud excesiva.
+    Devuelve True si exportó alguna.
     """
-    df["sospechoso"] = df.apply(
-        lambda row: (
-            isinstance(row["CORREGIDO_FINAL"], str) and
-            isinstance(row["NOMBRE_NORMALIZADO"], str) and
-            row["NOMBRE_NORMALIZADO"].split()[0] not in row["CORREGIDO_FINAL"]
-        ),
-        axis=1
+    # Primer token del nombre normalizado que no aparece en el corregido
+    son_texto = df["CORREGIDO_FINAL"].map(lambda x: isinstance(x, str)) & \
+        df["NOMBRE_NORMALIZADO"].map(lambda x: isinstance(x, str))
+    primer_token = df["NOMBRE_NORMALIZADO"].where(son_texto, "").str.split().str[0].fillna("")
+    corregido = df["CORREGIDO_FINAL"].where(son_texto, "")
+    df["sospechoso"] = son_texto & np.array(
+        [token not in texto for token, texto in zip(primer_token, corregido)], dtype=bool
     )
     
     casos = df[
@@ -40,10 +44,11 @@ def exportar_casos_sospechosos(df, output_file="correcciones_sospechosas.csv", d
 ]
 
     if not casos.empty:
-        casos.to_csv(output_file, index=False, encoding="utf-8-sig")
+        exportar_csv(casos, output_file, anexar)
         print(f"Correcciones sospechosas exportadas a: {output_file}")
     else:
         print("No se detectaron correcciones sospechosas.")
+    return not casos.empty
 
 def aplicar_correcciones_manual(df, archivo_revision="revision_manual.csv"):
     """
@@ -54,14 +59,11 @@ def aplicar_correcciones_manual(df, archivo_revision="revision_manual.csv"):
         correcciones = dict(zip(revision["NOMBRE_LIMPIO"], revision["CORRECCION_MANUAL"]))
         
         df["NOMBRE_CORREGIDO_PREVIO"] = df["CORREGIDO_FINAL"]
-        df["CORREGIDO_FINAL"] = df.apply(
-            lambda row: correcciones.get(row["NOMBRE_LIMPIO"], row["CORREGIDO_FINAL"]),
-            axis=1
-        )
+        con_correccion = df["NOMBRE_LIMPIO"].isin(list(correcciones))
+        df["CORREGIDO_FINAL"] = df["NOMBRE_LIMPIO"].map(correcciones).where(con_correccion, df["CORREGIDO_FINAL"])
         
-        df["STATUS_CORRECCIÓN"] = df.apply(
-            lambda row: "Corregido manual" if row["NOMBRE_CORREGIDO_PREVIO"] != row["CORREGIDO_FINAL"] else "Sin cambio",
-            axis=1
+        df["STATUS_CORRECCIÓN"] = np.where(
+            df["NOMBRE_CORREGIDO_PREVIO"] != df["CORREGIDO_FINAL"], "Corregido manual", "Sin cambio"
         )
         
         print("🔧 Correcciones manuales aplicadas.")
@@ -70,7 +72,7 @@ def aplicar_correcciones_manual(df, archivo_revision="revision_manual.csv"):
         print(f"Error al aplicar correcciones: {e}")
         return df
 
-def generar_log_correcciones(df, archivo_revision="revision_manual.csv", archivo_salida="log_de_correcciones.csv"):
+def generar_log_correcciones(df, archivo_revision="revision_manual.csv", archivo_salida="log_de_correcciones.csv", anexar=False):
     """
     Genera log final con tipo de corrección aplicada.
     """
@@ -78,27 +80,24 @@ def generar_log_correcciones(df, archivo_revision="revision_manual.csv", archivo
         revision = pd.read_csv(archivo_revision, encoding="utf-8-sig")
         revision_dict = dict(zip(revision["NOMBRE_LIMPIO"], revision["CORRECCION_MANUAL"]))
         
-        log = df.copy()
+        # Solo se copian las columnas que usa el log, no el DataFrame completo
+        log = df[[c for c in ("NOMBRE_LIMPIO", "NOMBRE_CORREGIDO", "CORREGIDO_FINAL") if c in df.columns]].copy()
         log["CORREGIDO_AUTOMÁTICO"] = log.get("NOMBRE_CORREGIDO", log["NOMBRE_LIMPIO"])
         log["CORRECCION_MANUAL"] = log["NOMBRE_LIMPIO"].map(revision_dict)
         log["CORREGIDO_FINAL"] = log["CORREGIDO_FINAL"]
         
-        def tipo(row):
-            if pd.notna(row["CORRECCION_MANUAL"]):
-                return "Manual"
-            elif row["NOMBRE_LIMPIO"] != row["CORREGIDO_AUTOMÁTICO"]:
-                return "Automática"
-            else:
-                return "Sin cambio"
-        
-        log["TIPO_CORRECCIÓN"] = log.apply(tipo, axis=1)
+        log["TIPO_CORRECCIÓN"] = np.select(
+            [log["CORRECCION_MANUAL"].notna(), log["NOMBRE_LIMPIO"] != log["CORREGIDO_AUTOMÁTICO"]],
+            ["Manual", "Automática"],
+            default="Sin cambio"
+        )
         
         columnas = [
             "NOMBRE_LIMPIO", "CORREGIDO_AUTOMÁTICO", "CORRECCION_MANUAL",
             "CORREGIDO_FINAL", "TIPO_CORRECCIÓN"
         ]
         
-        log[columnas].to_csv(archivo_salida, index=False, encoding="utf-8-sig")
+        exportar_csv(log[columnas], archivo_salida, anexar)
         print(f"Log de correcciones guardado en: {archivo_salida}")
     except Exception as e:
         print(f"Error al generar log: {e}")
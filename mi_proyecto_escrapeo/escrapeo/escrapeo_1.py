@@ -19,14 +19,14 @@
 
 # Librerías necesarias para escrapeo de páginas web (sincrónico):
 import pandas as pd  # Para cargar y guardar CSVs
-import requests  # Para obtener el HTML de las páginas
-from bs4 import BeautifulSoup  # Para extraer texto del HTML
-import lxml  # Parser rápido y robusto (usado por BeautifulSoup)
 from fake_useragent import UserAgent  # Para simular navegadores reales
-from googlesearch import search  # Para obtener URLs oficiales
 import re  # Para extraer dirección, teléfono y email
 from tqdm import tqdm  # Para mostrar barra de progreso
 import os
+# Caché HTTP compartida con el resto de scrapers (paquete scraping_comun)
+from scraping_comun.cache_http import obtener_html
+from scraping_comun.busqueda import buscar  # Para obtener URLs oficiales (con caché de consultas)
+from scraping_comun.motor_contacto import texto_visible  # Texto del HTML con lxml/selectolax, sin pasar por BeautifulSoup
 print("Librerías cargadas correctamente.")
 
 # Advertencia para ignorar SyntaxWarnings (no afecta al funcionamiento, pero limpia la salida)
@@ -34,11 +34,11 @@ print("Librerías cargadas correctamente.")
 import warnings
 warnings.filterwarnings("ignore", category=SyntaxWarning)
 
-# Buscar URL oficial en Google (sin cambios, sigue siendo sincrónica)
+# Buscar URL oficial (sincrónica; las consultas repetidas salen de la caché)
 def buscar_url(nombre_empresa):
     query = f"{nombre_empresa} sitio oficial España"
     try:
-        resultados = list(search(query, num_results=5))
+        resultados = buscar(query, num_resultados=5)
         return resultados[0] if resultados else "No encontrada"
     except Exception:
         return "Error en búsqueda"
@@ -48,9 +48,8 @@ def extraer_contacto(url):
     try:
         ua = UserAgent()
         headers = {"User-Agent": ua.random}
-        response = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.text, "lxml")
-        texto = soup.get_text(separator=" ", strip=True)
+        html = obtener_html(url, headers=headers, timeout=10)  # desde la caché si está vigente
+        texto = texto_visible(html)
 
         direccion = re.search(r"(Calle|Avda\.?|Avenida|Polígono|Plaza)[^\n,]{10,100}", texto)
         direccion = direccion.group(0) if direccion else "No encontrada"
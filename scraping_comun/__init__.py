@@ -0,0 +1,4 @@
+# Módulos compartidos por los tres intentos de scraping (crawler, version_02, mi_proyecto_escrapeo):
+# caché HTTP, búsqueda de URLs, índice CIF, navegador, motor de contacto, checkpoint,
+# normalización de nombres e intermedios CSV/Parquet. Se instala una vez con `pip install -e .`
+# desde la raíz del repositorio.
@@ -0,0 +1,103 @@
+# Librerías para la búsqueda de URLs oficiales: proveedores intercambiables, caché persistente y reintentos
+import asyncio
+import contextlib
+import json
+import os
+import threading
+import time
+from . import cache_http
+from .cache_http import cacheado, leer_cache
+
+# Proveedor por defecto ("google" o "fixture") y vigencia de los resultados guardados
+PROVEEDOR = os.environ.get("PROVEEDOR_BUSQUEDA", "google")
+TTL_BUSQUEDA = 30 * 24 * 3600
+MAX_REINTENTOS = 3
+ESPERA_REINTENTO = 2.0              # segundos; se duplica en cada reintento
+INTERVALOS = {"google": 1.0}        # segundos mínimos entre consultas reales al mismo proveedor
+
+# ─── Proveedores ─────────────────────────────────────────────────────────────
+# Cada proveedor es una función (consulta, num_resultados) -> lista de URLs
+def buscar_google(consulta, num_resultados):
+    from googlesearch import search
+    return list(search(consulta, num_results=num_resultados))
+
+# Fixture local para pruebas: JSON {"consulta": ["url", ...]} en la ruta de BUSQUEDA_FIXTURE
+FIXTURE = {"ruta": os.environ.get("BUSQUEDA_FIXTURE"), "datos": None}
+
+def buscar_fixture(consulta, num_resultados):
+    if FIXTURE["datos"] is None:
+        with open(FIXTURE["ruta"], encoding="utf-8") as f:
+            FIXTURE["datos"] = json.load(f)
+    return FIXTURE["datos"].get(consulta, [])[:num_resultados]
+
+PROVEEDORES = {"google": buscar_google, "fixture": buscar_fixture}
+
+def registrar_proveedor(nombre, funcion):
+    PROVEEDORES[nombre] = funcion
+
+def validar_proveedor(proveedor):
+    # Errores de configuración: se avisan antes de consultar (y de reintentar)
+    if proveedor not in PROVEEDORES:
+        raise ValueError(f"Proveedor de búsqueda desconocido: {proveedor!r} (registrados: {', '.join(PROVEEDORES)})")
+    if proveedor == "fixture" and not FIXTURE["ruta"]:
+        raise ValueError("El proveedor 'fixture' necesita la ruta de un JSON en BUSQUEDA_FIXTURE")
+    return proveedor
+
+if PROVEEDOR not in PROVEEDORES:
+    raise ValueError(f"PROVEEDOR_BUSQUEDA desconocido: {PROVEEDOR!r} (opciones: {', '.join(PROVEEDORES)})")
+
+# ─── Cortesía por proveedor (compartida entre hilos) ────────────────────────
+TURNOS = {}
+BLOQUEO_TURNOS = threading.Lock()
+
+def respetar_intervalo(proveedor):
+    with BLOQUEO_TURNOS:
+        turno = TURNOS.setdefault(proveedor, {"bloqueo": threading.Lock(), "siguiente": 0.0})
+    with turno["bloqueo"]:
+        espera = turno["siguiente"] - time.monotonic()
+        if espera > 0:
+            time.sleep(espera)
+        turno["siguiente"] = time.monotonic() + INTERVALOS.get(proveedor, 0.0)
+
+def consultar(consulta, num_resultados, proveedor, reintentos=MAX_REINTENTOS):
+    # Llamada real al proveedor, con backoff exponencial ante errores
+    for intento in range(reintentos):
+        respetar_intervalo(proveedor)
+        try:
+            return PROVEEDORES[proveedor](consulta, num_resultados)
+        except Exception:
+            if intento == reintentos - 1:
+                raise
+            time.sleep(ESPERA_REINTENTO * 2 ** intento)
+
+# ─── API ─────────────────────────────────────────────────────────────────────
+def clave_consulta(consulta, num_resultados):
+    return f"{num_resultados}\n{consulta}"
+
+def buscar(consulta, num_resultados=5, proveedor=None):
+    """
+    Devuelve la lista de URLs para `consulta`. Los resultados (también las listas
+    vacías) se guardan en la caché en disco: repetir una consulta no sale a la red.
+    """
+    proveedor = validar_proveedor(proveedor or PROVEEDOR)
+    texto = cacheado(
+        clave_consulta(consulta, num_resultados),
+        lambda: json.dumps(consultar(consulta, num_resultados, proveedor)),
+        f"busqueda:{proveedor}", TTL_BUSQUEDA
+    )
+    return json.loads(texto)
+
+async def buscar_async(consulta, num_resultados=5, proveedor=None, semaforo=None):
+    """
+    Versión asíncrona de buscar. Los aciertos de caché no ocupan el `semaforo`,
+    que solo acota las consultas reales simultáneas.
+    """
+    proveedor = validar_proveedor(proveedor or PROVEEDOR)
+    entrada = await asyncio.to_thread(
+        leer_cache, clave_consulta(consulta, num_resultados), f"busqueda:{proveedor}", TTL_BUSQUEDA
+    )
+    if entrada and (entrada["fresca"] or cache_http.SIN_RED):
+        return json.loads(entrada["texto"])
+
+    async with semaforo or contextlib.nullcontext():
+        return await asyncio.to_thread(buscar, consulta, num_resultados, proveedor)
@@ -0,0 +1,156 @@
+# Librerías para la caché HTTP en disco compartida por todos los fetchers (requests, aiohttp, CrawlerHub, Playwright)
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+# Ruta de la caché (una sola base SQLite para todos los scripts) y vigencia por defecto
+RUTA_CACHE = os.environ.get("CACHE_HTTP", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_http.sqlite"))
+TTL_POR_DEFECTO = 7 * 24 * 3600
+# Con CACHE_HTTP_SIN_RED=1 nunca se sale a la red: se sirve lo guardado aunque esté caducado
+SIN_RED = os.environ.get("CACHE_HTTP_SIN_RED") == "1"
+
+# Los cuerpos se guardan comprimidos y direccionados por su hash: dos URLs con el mismo HTML comparten fila
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS cuerpos (hash TEXT PRIMARY KEY, datos BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS respuestas (
+    clave TEXT PRIMARY KEY, url TEXT NOT NULL, estado INTEGER, etag TEXT, last_modified TEXT,
+    guardado REAL NOT NULL, max_age REAL, hash TEXT NOT NULL
+);
+"""
+
+CONEXIONES = threading.local()  # una conexión por hilo (asyncio.to_thread usa varios)
+
+def conectar(ruta=None):
+    ruta = ruta or RUTA_CACHE
+    conexiones = CONEXIONES.__dict__.setdefault("por_ruta", {})
+    if ruta not in conexiones:
+        conexion = sqlite3.connect(ruta, timeout=30)
+        conexion.execute("PRAGMA journal_mode=WAL")  # lectores y escritores de varios procesos a la vez
+        conexion.executescript(ESQUEMA)
+        conexiones[ruta] = conexion
+    return conexiones[ruta]
+
+def clave_url(url, espacio="http"):
+    # El espacio separa el HTML crudo del renderizado (Playwright) para la misma URL
+    return hashlib.sha256(f"{espacio}\n{url}".encode("utf-8")).hexdigest()
+
+def leer_cache(url, espacio="http", ttl=TTL_POR_DEFECTO, ruta=None):
+    """
+    Devuelve la entrada guardada ({"texto", "estado", "etag", "last_modified", "fresca"}) o None.
+    """
+    fila = conectar(ruta).execute(
+        "SELECT r.estado, r.etag, r.last_modified, r.guardado, r.max_age, c.datos "
+        "FROM respuestas r JOIN cuerpos c ON r.hash = c.hash WHERE r.clave = ?",
+        (clave_url(url, espacio),)
+    ).fetchone()
+    if fila is None:
+        return None
+
+    estado, etag, last_modified, guardado, max_age, datos = fila
+    vigencia = max_age if max_age is not None else ttl
+    return {
+        "texto": zlib.decompress(datos).decode("utf-8"),
+        "estado": estado,
+        "etag": etag,
+        "last_modified": last_modified,
+        "fresca": time.time() - guardado < vigencia
+    }
+
+def guardar_cache(url, texto, espacio="http", estado=200, cabeceras=None, ruta=None):
+    cabeceras = cabeceras or {}
+    control = cabeceras.get("Cache-Control", "")
+    if "no-store" in control:
+        return
+    max_age = re.search(r"max-age=(\d+)", control)
+
+    datos = texto.encode("utf-8")
+    hash_cuerpo = hashlib.sha256(datos).hexdigest()
+    with conectar(ruta) as conexion:
+        conexion.execute("INSERT OR IGNORE INTO cuerpos VALUES (?, ?)", (hash_cuerpo, zlib.compress(datos, 6)))
+        conexion.execute(
+            "INSERT OR REPLACE INTO respuestas VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (clave_url(url, espacio), url, estado, cabeceras.get("ETag"), cabeceras.get("Last-Modified"),
+             time.time(), float(max_age.group(1)) if max_age else None, hash_cuerpo)
+        )
+
+def renovar_cache(url, espacio="http", ruta=None):
+    # Respuesta 304: el cuerpo guardado sigue siendo válido, solo se renueva la fecha
+    with conectar(ruta) as conexion:
+        conexion.execute("UPDATE respuestas SET guardado = ? WHERE clave = ?", (time.time(), clave_url(url, espacio)))
+
+def cabeceras_condicionales(entrada):
+    cabeceras = {}
+    if entrada and entrada["etag"]:
+        cabeceras["If-None-Match"] = entrada["etag"]
+    if entrada and entrada["last_modified"]:
+        cabeceras["If-Modified-Since"] = entrada["last_modified"]
+    return cabeceras
+
+def limpiar_cache(ruta=None):
+    # Borra los cuerpos que ya no referencia ninguna respuesta
+    with conectar(ruta) as conexion:
+        return conexion.execute("DELETE FROM cuerpos WHERE hash NOT IN (SELECT hash FROM respuestas)").rowcount
+
+# ─── Fetchers HTTP con validación condicional (ETag / Last-Modified) ─────────
+def obtener_html(url, headers=None, timeout=10, ttl=TTL_POR_DEFECTO):
+    import requests
+
+    entrada = leer_cache(url, ttl=ttl)
+    if entrada and (entrada["fresca"] or SIN_RED):
+        return entrada["texto"]
+    if SIN_RED:
+        raise requests.exceptions.ConnectionError(f"Sin copia en caché (modo sin red): {url}")
+
+    response = requests.get(url, headers={**(headers or {}), **cabeceras_condicionales(entrada)}, timeout=timeout)
+    if response.status_code == 304 and entrada:
+        renovar_cache(url)
+        return entrada["texto"]
+    if response.status_code == 200:
+        guardar_cache(url, response.text, estado=200, cabeceras=response.headers)
+    return response.text
+
+async def obtener_html_async(url, session, headers=None, ttl=TTL_POR_DEFECTO):
+    import aiohttp
+
+    # Las operaciones de disco van a un hilo para no bloquear el event loop
+    entrada = await asyncio.to_thread(leer_cache, url, "http", ttl)
+    if entrada and (entrada["fresca"] or SIN_RED):
+        return entrada["texto"]
+    if SIN_RED:
+        raise aiohttp.ClientConnectionError(f"Sin copia en caché (modo sin red): {url}")
+
+    async with session.get(url, headers={**(headers or {}), **cabeceras_condicionales(entrada)}) as response:
+        if response.status == 304 and entrada:
+            await asyncio.to_thread(renovar_cache, url)
+            return entrada["texto"]
+        response.raise_for_status()  # una página de error no se devuelve como si fuera la buscada
+        texto = await response.text()
+        if response.status == 200:
+            await asyncio.to_thread(guardar_cache, url, texto, "http", 200, response.headers)
+        return texto
+
+# ─── Envoltorios para fetchers sin cabeceras HTTP (CrawlerHub, Playwright): solo TTL ───
+def cacheado(url, descargar, espacio, ttl=TTL_POR_DEFECTO):
+    entrada = leer_cache(url, espacio, ttl)
+    if entrada and (entrada["fresca"] or SIN_RED):
+        return entrada["texto"]
+    if SIN_RED:
+        raise LookupError(f"Sin copia en caché (modo sin red): {url}")
+    texto = descargar()
+    guardar_cache(url, texto, espacio)
+    return texto
+
+async def cacheado_async(url, descargar, espacio, ttl=TTL_POR_DEFECTO):
+    entrada = await asyncio.to_thread(leer_cache, url, espacio, ttl)
+    if entrada and (entrada["fresca"] or SIN_RED):
+        return entrada["texto"]
+    if SIN_RED:
+        raise LookupError(f"Sin copia en caché (modo sin red): {url}")
+    texto = await descargar()
+    await asyncio.to_thread(guardar_cache, url, texto, espacio)
+    return texto
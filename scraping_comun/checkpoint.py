@@ -0,0 +1,78 @@
+# Librerías para guardar cada empresa procesada en un checkpoint JSONL y reanudar ejecuciones largas
+import csv
+import itertools
+import json
+import os
+from .indice_cif import normalizar_cif
+
+# Una línea JSON por empresa terminada, en orden de finalización. Solo se añade: un corte
+# (crash, Ctrl-C) pierde como mucho la línea que se estaba escribiendo
+def leer_checkpoint(ruta):
+    if not os.path.exists(ruta):
+        return
+    with open(ruta, encoding="utf-8") as f:
+        for linea in f:
+            try:
+                yield json.loads(linea)
+            except json.JSONDecodeError:
+                continue  # línea a medias de una ejecución interrumpida
+
+def claves_hechas(ruta, campo="CIF"):
+    return {clave for registro in leer_checkpoint(ruta) if (clave := normalizar_cif(registro.get(campo)))}
+
+def abrir_checkpoint(ruta, reanudar=False, campo="CIF"):
+    """
+    Devuelve (archivo para añadir registros, claves ya hechas). Sin `reanudar`, el
+    checkpoint anterior se conserva como <ruta>.anterior y se empieza de cero.
+    """
+    if not reanudar:
+        if os.path.exists(ruta):
+            os.replace(ruta, ruta + ".anterior")
+        return open(ruta, "a", encoding="utf-8"), set()
+
+    hechas = claves_hechas(ruta, campo)
+    archivo = open(ruta, "a+", encoding="utf-8")
+    archivo.seek(0, os.SEEK_END)
+    if archivo.tell():
+        archivo.seek(archivo.tell() - 1)
+        if archivo.read(1) != "\n":
+            archivo.write("\n")  # la línea a medias no se mezcla con el siguiente registro
+    return archivo, hechas
+
+def guardar_registro(archivo, registro):
+    archivo.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+    archivo.flush()
+
+def leer_en_orden(ruta, campo):
+    # Registros ordenados por `campo` (p. ej. la posición en la entrada). En memoria solo
+    # quedan el campo y el desplazamiento de cada línea; los que no lo tienen van al final
+    if not os.path.exists(ruta):
+        return
+    claves = []
+    with open(ruta, "rb") as f:
+        desplazamiento = 0
+        for linea in f:
+            try:
+                valor = json.loads(linea).get(campo)
+                claves.append((valor is None, valor or 0, desplazamiento))
+            except json.JSONDecodeError:
+                pass
+            desplazamiento += len(linea)
+        claves.sort()
+        for _, _, desplazamiento in claves:
+            f.seek(desplazamiento)
+            yield json.loads(f.readline())
+
+def exportar_csv(ruta, ruta_csv, columnas=None, orden=None):
+    # El CSV final se construye desde el checkpoint, registro a registro (sin cargarlo entero);
+    # con `orden`, en el orden de ese campo en vez del de finalización
+    registros = leer_checkpoint(ruta) if orden is None else leer_en_orden(ruta, orden)
+    if columnas is None:
+        primero = next(registros, {})
+        columnas = list(primero)
+        registros = itertools.chain([primero] if primero else [], registros)
+    with open(ruta_csv, "w", newline="", encoding="utf-8") as out:
+        writer = csv.DictWriter(out, fieldnames=columnas, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(registros)
+    return ruta_csv
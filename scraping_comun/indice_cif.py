@@ -0,0 +1,89 @@
+# Librerías para el índice persistente CIF → URL oficial / página de contacto
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# Una fila por empresa; la etapa de búsqueda lo rellena y lo consulta antes de buscar
+RUTA_INDICE = os.environ.get("INDICE_CIF", os.path.join(os.path.dirname(os.path.abspath(__file__)), "indice_cif.sqlite"))
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS empresas (
+    cif TEXT PRIMARY KEY, nombre TEXT, url TEXT, estado TEXT, validada INTEGER NOT NULL DEFAULT 0,
+    pagina_contacto TEXT, actualizado REAL NOT NULL
+);
+"""
+
+CONEXIONES = threading.local()  # una conexión por hilo
+
+def conectar(ruta=None):
+    ruta = ruta or RUTA_INDICE
+    conexiones = CONEXIONES.__dict__.setdefault("por_ruta", {})
+    if ruta not in conexiones:
+        conexion = sqlite3.connect(ruta, timeout=30)
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.executescript(ESQUEMA)
+        conexiones[ruta] = conexion
+    return conexiones[ruta]
+
+def normalizar_cif(cif):
+    # "b-12.345.678" -> "B12345678"; None para celdas vacías
+    if cif is None or cif != cif:
+        return None
+    cif = re.sub(r"[\s.\-]", "", str(cif)).upper()
+    return cif or None
+
+def consultar_cif(cif, modo_estricto=False, ruta=None):
+    """
+    Devuelve {"url", "estado", "validada", "pagina_contacto"} o None. En modo
+    estricto solo sirven las URLs que ya se validaron por contenido.
+    """
+    cif = normalizar_cif(cif)
+    if cif is None:
+        return None
+    fila = conectar(ruta).execute(
+        "SELECT url, estado, validada, pagina_contacto FROM empresas WHERE cif = ?", (cif,)
+    ).fetchone()
+    if fila is None or fila[0] is None or (modo_estricto and not fila[2]):
+        return None
+    return {"url": fila[0], "estado": fila[1], "validada": bool(fila[2]), "pagina_contacto": fila[3]}
+
+def registrar_url(cif, url, estado, validada=False, nombre=None, ruta=None):
+    # Una URL validada no se degrada por una búsqueda posterior sin validar
+    cif = normalizar_cif(cif)
+    if cif is None:
+        return
+    with conectar(ruta) as conexion:
+        anterior = conexion.execute("SELECT url, validada FROM empresas WHERE cif = ?", (cif,)).fetchone()
+        if anterior and anterior[1] and not validada:
+            return
+        conexion.execute(
+            "INSERT INTO empresas (cif, nombre, url, estado, validada, actualizado) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(cif) DO UPDATE SET nombre = COALESCE(excluded.nombre, nombre), url = excluded.url, "
+            "estado = excluded.estado, validada = excluded.validada, actualizado = excluded.actualizado, "
+            "pagina_contacto = CASE WHEN url = excluded.url THEN pagina_contacto END",
+            (cif, nombre, url, estado, int(validada), time.time())
+        )
+
+def consultar_contacto(cif, url, ruta=None):
+    # La página de contacto solo vale si la URL oficial no ha cambiado desde que se sondeó
+    cif = normalizar_cif(cif)
+    if cif is None:
+        return None
+    fila = conectar(ruta).execute(
+        "SELECT pagina_contacto FROM empresas WHERE cif = ? AND url = ?", (cif, url)
+    ).fetchone()
+    return fila[0] if fila else None
+
+def registrar_contacto(cif, url, pagina_contacto, ruta=None):
+    cif = normalizar_cif(cif)
+    if cif is None:
+        return
+    with conectar(ruta) as conexion:
+        conexion.execute(
+            "INSERT INTO empresas (cif, url, estado, pagina_contacto, actualizado) VALUES (?, ?, 'Dominio válido', ?, ?) "
+            "ON CONFLICT(cif) DO UPDATE SET pagina_contacto = excluded.pagina_contacto, "
+            "actualizado = excluded.actualizado WHERE url = excluded.url",
+            (cif, url, pagina_contacto, time.time())
+        )
@@ -0,0 +1,107 @@
+# Librerías para los archivos intermedios del pipeline (CSV o Parquet):
+import os
+import shutil
+import pandas as pd
+
+# Formato de los intermedios: "csv" (por defecto, legible) o "parquet" (columnar, requiere pyarrow)
+FORMATO_INTERMEDIOS = os.environ.get("FORMATO_INTERMEDIOS", "csv")
+
+def ruta_intermedio(nombre, formato=None):
+    return f"{nombre}.{formato or FORMATO_INTERMEDIOS}"
+
+def exportar_csv(df, ruta, anexar=False):
+    """
+    Exporta a CSV. Con anexar=True agrega las filas al final del archivo existente
+    (mismo orden de columnas, sin repetir cabecera ni BOM).
+    """
+    if anexar and os.path.exists(ruta) and os.path.getsize(ruta) > 0:
+        columnas = pd.read_csv(ruta, nrows=0, encoding="utf-8-sig").columns
+        df.reindex(columns=columnas).to_csv(ruta, mode="a", header=False, index=False, encoding="utf-8")
+    else:
+        df.to_csv(ruta, index=False, encoding="utf-8-sig")
+
+def tabla_arrow(df):
+    """
+    Convierte el DataFrame a tabla Arrow con las columnas de texto codificadas como
+    diccionario (índices int32), para que todas las partes compartan el mismo esquema.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    for i, campo in enumerate(tabla.schema):
+        if pa.types.is_string(campo.type) or pa.types.is_large_string(campo.type):
+            columna = pc.dictionary_encode(tabla.column(i).cast(pa.string()))
+        elif pa.types.is_dictionary(campo.type):
+            columna = tabla.column(i).cast(pa.dictionary(pa.int32(), pa.string()))
+        else:
+            continue
+        tabla = tabla.set_column(i, campo.name, columna)
+    return tabla
+
+def igualar_partes(ruta, partes, tabla):
+    """
+    Devuelve `tabla` con el esquema común a las partes ya escritas. Solo se amplían las
+    columnas cuyo tipo cambia (MATCH_SCORE entero en un bloque y decimal en otro pasa a
+    double, también en las partes anteriores, que se reescriben); el resto, como los
+    enteros de Nº, conserva su tipo.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    esquema = pq.read_schema(os.path.join(ruta, partes[0]))
+    comun = pa.unify_schemas([esquema, tabla.schema], promote_options="permissive").remove_metadata()
+    if not comun.equals(esquema.remove_metadata()):
+        for parte in partes:
+            ruta_parte = os.path.join(ruta, parte)
+            pq.write_table(pq.read_table(ruta_parte).select(comun.names).cast(comun), ruta_parte)
+    return tabla.select(comun.names).cast(comun)
+
+def guardar_intermedio(df, nombre, formato=None, anexar=False):
+    """
+    Guarda un intermedio como `nombre`.csv o `nombre`.parquet y devuelve la ruta.
+    En Parquet, anexar=True convierte la ruta en una carpeta de partes que
+    pd.read_parquet lee como una sola tabla.
+    """
+    formato = formato or FORMATO_INTERMEDIOS
+    ruta = ruta_intermedio(nombre, formato)
+    if formato == "csv":
+        exportar_csv(df, ruta, anexar)
+        return ruta
+    if formato != "parquet":
+        raise ValueError(f"Formato de intermedios no soportado: {formato}")
+
+    import pyarrow.parquet as pq
+
+    if not anexar:
+        if os.path.isdir(ruta):
+            shutil.rmtree(ruta)
+        pq.write_table(tabla_arrow(df), ruta)
+        return ruta
+
+    # El archivo único de una ejecución previa pasa a ser la primera parte
+    if os.path.isfile(ruta):
+        temporal = f"{ruta}.tmp"
+        os.replace(ruta, temporal)
+        os.makedirs(ruta)
+        os.replace(temporal, os.path.join(ruta, "parte-00000.parquet"))
+    os.makedirs(ruta, exist_ok=True)
+
+    # Todas las partes comparten esquema: pd.read_parquet las lee como una sola tabla
+    partes = sorted(archivo for archivo in os.listdir(ruta) if archivo.endswith(".parquet"))
+    tabla = tabla_arrow(df)
+    if partes:
+        tabla = igualar_partes(ruta, partes, tabla)
+    pq.write_table(tabla, os.path.join(ruta, f"parte-{len(partes):05d}.parquet"))
+    return ruta
+
+def leer_intermedio(nombre, formato=None, columnas=None):
+    """
+    Lee un intermedio guardado con guardar_intermedio. En Parquet las columnas de
+    texto vuelven como categorías y solo se leen las `columnas` pedidas.
+    """
+    formato = formato or FORMATO_INTERMEDIOS
+    ruta = ruta_intermedio(nombre, formato)
+    if formato == "parquet":
+        return pd.read_parquet(ruta, columns=columnas)
+    return pd.read_csv(ruta, encoding="utf-8-sig", usecols=columnas)
@@ -0,0 +1,89 @@
+# Librerías para completar el contacto con las páginas enlazadas desde la home (profundidad 1)
+import html as html_lib
+import re
+from urllib.parse import urljoin, urldefrag, urlparse
+
+CAMPOS = ("email", "telefono", "direccion")
+MAX_PAGINAS_POR_DOMINIO = 3  # páginas además de la home
+
+# Enlaces que suelen llevar los datos de contacto, por orden de preferencia
+PATRONES_ENLACE = [
+    re.compile(r"contact|kontakt|d[oó]nde[-_\s]?estamos|localizaci[oó]n|ubicaci[oó]n|on[-_\s]som", re.I),
+    re.compile(r"aviso[-_\s]?legal|nota[-_\s]?legal|\blegal\b|imprint|impressum", re.I),
+    re.compile(r"about|sobre[-_\s]?nosotros|qui[eé]nes[-_\s]?somos|nosotros|qui[-_\s]?som|la[-_\s]?empresa", re.I),
+]
+PATRON_ANCLA = re.compile(r"<a\b[^>]*?\bhref\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s>]+))[^>]*>(.*?)</a\s*>", re.I | re.S)
+PATRON_ETIQUETA = re.compile(r"<[^>]+>")
+EXTENSIONES_IGNORADAS = (".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".zip", ".doc", ".docx", ".xls", ".xlsx")
+
+def dominio(url):
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+def clave_pagina(url):
+    # Misma página con o sin www, http/https o barra final
+    return dominio(url), urlparse(url).path.rstrip("/") or "/", urlparse(url).query
+
+def prioridad_enlace(url, texto):
+    # 0 = contacto, 1 = aviso legal, 2 = quiénes somos; None si el enlace no interesa
+    ruta = urlparse(url).path
+    for prioridad, patron in enumerate(PATRONES_ENLACE):
+        if patron.search(ruta) or patron.search(texto):
+            return prioridad
+    return None
+
+def descubrir_enlaces(html, url_base, max_paginas=MAX_PAGINAS_POR_DOMINIO):
+    """
+    Devuelve hasta `max_paginas` URLs del mismo dominio enlazadas desde `html` que
+    parecen de contacto, aviso legal o quiénes somos, ordenadas por preferencia.
+    """
+    propio = dominio(url_base)
+    inicio = clave_pagina(url_base)
+    candidatos = {}  # clave de página -> (prioridad, posición, url)
+    for posicion, ancla in enumerate(PATRON_ANCLA.finditer(html)):
+        href = html_lib.unescape(next(g for g in ancla.groups()[:3] if g is not None)).strip()
+        if not href or href.startswith(("#", "mailto:", "tel:", "javascript:")):
+            continue
+        url = urldefrag(urljoin(url_base, href))[0]
+        clave = clave_pagina(url)
+        if (urlparse(url).scheme not in ("http", "https") or clave[0] != propio or clave == inicio
+                or clave[1].lower().endswith(EXTENSIONES_IGNORADAS)):
+            continue
+        texto = html_lib.unescape(PATRON_ETIQUETA.sub(" ", ancla.group(4)))
+        prioridad = prioridad_enlace(url, texto)
+        if prioridad is not None and (clave not in candidatos or prioridad < candidatos[clave][0]):
+            candidatos[clave] = (prioridad, candidatos.get(clave, (None, posicion, url))[1], url)
+    return [url for _, _, url in sorted(candidatos.values())[:max_paginas]]
+
+def completo(campos):
+    return all(campos.get(campo) for campo in CAMPOS)
+
+async def rastrear_contacto(url, html, extraer, descargar, max_paginas=MAX_PAGINAS_POR_DOMINIO, conocidas=()):
+    """
+    Extrae los campos de la home y, si falta alguno, visita de una en una las páginas
+    enlazadas (primero las `conocidas`) hasta completarlos o agotar `max_paginas`.
+    `extraer(url, html)` devuelve (campos, html_final) con None en los campos que
+    faltan; `descargar(url)` devuelve el HTML. Devuelve (campos, páginas que aportaron).
+    """
+    campos, html = await extraer(url, html)
+    aportes = [url] if any(campos.values()) else []
+    if completo(campos):
+        return campos, aportes
+
+    enlaces = {}
+    for enlace in [*conocidas, *descubrir_enlaces(html, url, max_paginas)]:
+        if clave_pagina(enlace) != clave_pagina(url):
+            enlaces.setdefault(clave_pagina(enlace), enlace)
+    for enlace in list(enlaces.values())[:max_paginas]:
+        try:
+            nuevos, _ = await extraer(enlace, await descargar(enlace))
+        except Exception:
+            continue
+        faltantes = [campo for campo in CAMPOS if not campos.get(campo) and nuevos.get(campo)]
+        for campo in faltantes:
+            campos[campo] = nuevos[campo]
+        if faltantes:
+            aportes.append(enlace)
+        if completo(campos):
+            break
+    return campos, aportes
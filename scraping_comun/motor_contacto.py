@@ -0,0 +1,254 @@
+# Librerías para el motor de extracción de contacto en una sola pasada
+import html as entidades
+import os
+import re
+from bisect import bisect_right
+
+# ─── Tokenización ────────────────────────────────────────────────────────────
+# Todos los parsers producen lo mismo (texto, nodos, elementos):
+# - texto: los nodos de texto visibles unidos por espacios, sin espacios repetidos
+# - nodos: [(inicio en texto, índice del elemento padre)] en orden de documento
+# - elementos: [[inicio, fin, sección]] con el rango de texto de cada elemento
+ELEMENTOS_VACIOS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+ELEMENTOS_SIN_TEXTO = {"script", "style", "noscript", "template"}  # BeautifulSoup tampoco los incluye en get_text
+SECCIONES_ETIQUETA = {"footer": "footer", "address": "contacto", "header": "cabecera", "nav": "navegacion"}
+PATRON_SECCION_CONTACTO = re.compile(r"contact|info|footer", re.I)
+SECCIONES_CONTACTO = ("contacto", "footer")  # preferidas al elegir el primer resultado de cada tipo
+
+def nuevo_documento():
+    return {"partes": [], "nodos": [], "elementos": [[0, None, "cuerpo"]], "posicion": 0}  # elemento 0: raíz
+
+def anadir_texto(documento, texto, padre):
+    texto = " ".join(texto.split())
+    if texto:
+        documento["nodos"].append((documento["posicion"], padre))
+        documento["partes"].append(texto)
+        documento["posicion"] += len(texto) + 1
+
+def abrir_elemento(documento, etiqueta, clases, padre):
+    # La sección se decide por la etiqueta, por class/id (contact, info, footer) o se hereda del padre
+    seccion = SECCIONES_ETIQUETA.get(etiqueta)
+    if seccion is None:
+        seccion = "contacto" if clases and PATRON_SECCION_CONTACTO.search(clases) else documento["elementos"][padre][2]
+    documento["elementos"].append([documento["posicion"], None, seccion])
+    return len(documento["elementos"]) - 1
+
+def cerrar_elemento(documento, indice):
+    documento["elementos"][indice][1] = documento["posicion"]
+
+def resultado(documento):
+    cerrar_elemento(documento, 0)
+    return " ".join(documento["partes"]), documento["nodos"], documento["elementos"]
+
+# Parser "regex": un único recorrido con expresiones regulares, sin dependencias
+PATRON_HTML = re.compile(
+    r"<!--.*?-->|<(/?)([a-zA-Z][\w:-]*)((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>|<[^>]*>|([^<]+)",
+    re.S
+)
+PATRON_CLASE = re.compile(r"""(?:class|id)\s*=\s*["']?([^"'>]*)""", re.I)
+
+def tokenizar_regex(html):
+    documento = nuevo_documento()
+    pila = [("", 0)]
+    omitir = None  # etiqueta script/style abierta: su contenido no es texto visible
+
+    for match in PATRON_HTML.finditer(html):
+        cierre, etiqueta, atributos, texto = match.groups()
+        if texto is not None:
+            if not omitir:
+                anadir_texto(documento, entidades.unescape(texto), pila[-1][1])
+            continue
+        if etiqueta is None:
+            continue
+
+        etiqueta = etiqueta.lower()
+        if omitir:
+            if cierre and etiqueta == omitir:
+                omitir = None
+            continue
+
+        if cierre:
+            # Cierra hasta la etiqueta correspondiente (HTML mal anidado incluido)
+            for i in range(len(pila) - 1, 0, -1):
+                if pila[i][0] == etiqueta:
+                    for _, indice in pila[i:]:
+                        cerrar_elemento(documento, indice)
+                    del pila[i:]
+                    break
+        elif etiqueta in ELEMENTOS_SIN_TEXTO:
+            omitir = None if atributos.rstrip().endswith("/") else etiqueta
+        elif etiqueta not in ELEMENTOS_VACIOS and not atributos.rstrip().endswith("/"):
+            clases = " ".join(PATRON_CLASE.findall(atributos))
+            pila.append((etiqueta, abrir_elemento(documento, etiqueta, clases, pila[-1][1])))
+
+    for _, indice in pila[1:]:
+        cerrar_elemento(documento, indice)
+    return resultado(documento)
+
+# Parser "lxml": árbol construido en C (libxml2), recorrido con iterwalk
+def tokenizar_lxml(html):
+    from lxml import etree
+    from lxml import html as lxml_html
+
+    documento = nuevo_documento()
+    try:
+        raiz = lxml_html.document_fromstring(html, parser=lxml_html.HTMLParser(remove_comments=True, remove_pis=True))
+    except (etree.ParserError, ValueError):  # documento vacío o con declaración de encoding
+        return tokenizar_regex(html)
+
+    pila = [0]
+    recorrido = etree.iterwalk(raiz, events=("start", "end"))
+    for evento, elemento in recorrido:
+        etiqueta = elemento.tag if isinstance(elemento.tag, str) else None
+        visible = etiqueta is not None and etiqueta not in ELEMENTOS_SIN_TEXTO
+        if evento == "start":
+            if not visible:
+                recorrido.skip_subtree()
+                continue
+            clases = f"{elemento.get('class', '')} {elemento.get('id', '')}".strip()
+            pila.append(abrir_elemento(documento, etiqueta, clases, pila[-1]))
+            if elemento.text:
+                anadir_texto(documento, elemento.text, pila[-1])
+        else:
+            if visible:
+                cerrar_elemento(documento, pila.pop())
+            if elemento.tail:  # el texto tras la etiqueta pertenece al padre
+                anadir_texto(documento, elemento.tail, pila[-1])
+    return resultado(documento)
+
+# Parser "selectolax": motor lexbor (C), el más rápido de construir
+def tokenizar_selectolax(html):
+    from selectolax.lexbor import LexborHTMLParser
+
+    documento = nuevo_documento()
+    raiz = LexborHTMLParser(html).root
+    if raiz is None:
+        return resultado(documento)
+
+    pila = [(iter([raiz]), 0)]
+    while pila:
+        hijos, padre = pila[-1]
+        nodo = next(hijos, None)
+        if nodo is None:
+            pila.pop()
+            if padre:
+                cerrar_elemento(documento, padre)
+            continue
+        etiqueta = nodo.tag
+        if etiqueta == "-text":
+            anadir_texto(documento, nodo.text(deep=False), padre)
+        elif etiqueta[0] not in "-_#!" and etiqueta not in ELEMENTOS_SIN_TEXTO:
+            atributos = nodo.attributes
+            clases = f"{atributos.get('class') or ''} {atributos.get('id') or ''}".strip()
+            pila.append((nodo.iter(include_text=True), abrir_elemento(documento, etiqueta, clases, padre)))
+    return resultado(documento)
+
+TOKENIZADORES = {"regex": tokenizar_regex, "lxml": tokenizar_lxml, "selectolax": tokenizar_selectolax}
+
+def parser_por_defecto():
+    # PARSER_HTML elige el parser; si no, el más rápido disponible
+    if os.environ.get("PARSER_HTML"):
+        return os.environ["PARSER_HTML"]
+    for nombre, modulo in (("selectolax", "selectolax.lexbor"), ("lxml", "lxml.html")):
+        try:
+            __import__(modulo)
+            return nombre
+        except ImportError:
+            continue
+    return "regex"
+
+PARSER_HTML = parser_por_defecto()
+if PARSER_HTML not in TOKENIZADORES:
+    raise ValueError(f"PARSER_HTML desconocido: {PARSER_HTML!r} (opciones: {', '.join(TOKENIZADORES)})")
+
+def tokenizar(html, parser=None):
+    return TOKENIZADORES[parser or PARSER_HTML](html)
+
+def texto_visible(html, parser=None):
+    # Texto de la página como lo vería un lector (sin scripts ni estilos)
+    return tokenizar(html, parser)[0]
+
+def buscar_clave(html, clave, parser=None):
+    """
+    Texto del elemento que contiene el primer nodo de texto con `clave` (regex), si
+    tiene entre 5 y 150 caracteres; " Error" si no hay ninguno.
+    """
+    texto, nodos, elementos = tokenizar(html, parser)
+    patron = re.compile(clave, re.IGNORECASE)
+    finales = [inicio for inicio, _ in nodos[1:]] + [len(texto) + 1]
+    for (inicio, padre), fin in zip(nodos, finales):
+        if patron.search(texto, inicio, fin - 1):
+            valor = texto[elementos[padre][0]:elementos[padre][1]].strip()
+            if 5 < len(valor) < 150:
+                return valor
+    return " Error"
+
+# ─── Patrones (todos en una sola expresión; se recorren en una pasada) ───────
+PATRONES = [
+    ("email", r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]*[a-zA-Z]"),
+    ("email_ofuscado", r"[a-zA-Z0-9_.+-]+\s?[\[(](?:@|at)[\])]\s?[a-zA-Z0-9-]+\s?[\[(](?:\.|dot)[\])]\s?[a-zA-Z]{2,}"),
+    ("direccion", r"(?:C/|Calle|Avda\.?|Avenida|Plaza|Paseo|Polígono|Camino|Carretera|Ctra\.|Carrer|Urbanización)"
+                  r"[\s\w.,º#/-]+?\d{1,4}[A-Za-z]?(?:,?\s+\d{5})?,?\s+[A-ZÁÉÍÓÚÑa-záéíóúñüÜ]+"),
+    ("clave_direccion", r"(?i:Dirección|Dónde estamos)"),
+    ("clave_telefono", r"(?i:Teléfono|Llámanos)"),
+    ("clave_email", r"(?i:E-?mail|Correo)"),
+    ("telefono", r"(?:\+\d{1,3}[\s.\-()]*)?(?:\d{2,4}[\s.\-()]*){2,3}\d{2,4}"),  # 91 234 56 78, 91.234.56.78
+]
+# Todas las coincidencias empiezan al inicio de una palabra: el lookbehind común descarta
+# enseguida las posiciones intermedias en vez de probar cada alternativa en cada carácter.
+# El punto no corta palabra ("Tlf.91.234.56.78"): los emails se recorren desde su inicio
+PATRON_CONTACTO = re.compile(
+    r"(?<![\w+-])(?:" + "|".join(f"(?P<{tipo}>{patron})" for tipo, patron in PATRONES) + ")"
+)
+DIGITOS_TELEFONO = 9
+PATRON_AT = re.compile(r"\s*[\[(](?:@|at)[\])]\s*")
+PATRON_DOT = re.compile(r"\s*[\[(](?:\.|dot)[\])]\s*")
+
+def analizar_documento(html, parser=None):
+    """
+    Extrae en una sola pasada todas las coincidencias del documento. Cada una es
+    {"tipo", "valor", "inicio", "fin", "seccion"}, con posiciones sobre el texto
+    devuelto. En las palabras clave, "valor" es el texto del elemento que las contiene.
+    """
+    texto, nodos, elementos = tokenizar(html, parser)
+    inicios = [inicio for inicio, _ in nodos]
+    coincidencias = []
+
+    for match in PATRON_CONTACTO.finditer(texto):
+        tipo, valor = match.lastgroup, match.group()
+        if tipo == "telefono" and sum(c.isdigit() for c in valor) < DIGITOS_TELEFONO:
+            continue
+
+        inicio, fin = match.span()
+        elemento = elementos[nodos[bisect_right(inicios, inicio) - 1][1]] if nodos else elementos[0]
+        if tipo.startswith("clave_"):
+            valor = texto[elemento[0]:elemento[1]]
+        elif tipo == "email_ofuscado":
+            tipo = "email"
+            valor = PATRON_DOT.sub(".", PATRON_AT.sub("@", valor))
+
+        coincidencias.append({
+            "tipo": tipo, "valor": valor.strip(), "inicio": inicio, "fin": fin, "seccion": elemento[2]
+        })
+    return {"texto": texto, "coincidencias": coincidencias}
+
+# ─── Selección de resultados ─────────────────────────────────────────────────
+def primera(coincidencias, tipo, secciones=SECCIONES_CONTACTO, filtro=None):
+    # Primera coincidencia del tipo, dando prioridad a las secciones de contacto
+    candidatas = [c for c in coincidencias if c["tipo"] == tipo and (filtro is None or filtro(c["valor"]))]
+    for coincidencia in candidatas:
+        if coincidencia["seccion"] in secciones:
+            return coincidencia
+    return candidatas[0] if candidatas else None
+
+def valores(coincidencias, tipo, secciones=SECCIONES_CONTACTO):
+    # Todos los valores distintos del tipo, primero los de las secciones de contacto
+    ordenadas = sorted(
+        (c for c in coincidencias if c["tipo"] == tipo), key=lambda c: c["seccion"] not in secciones
+    )
+    return list(dict.fromkeys(c["valor"] for c in ordenadas))
+
+def valor_clave(coincidencias, tipo, por_defecto=" Error"):
+    # Equivale a buscar_por_palabra_clave: texto del primer elemento con la clave y longitud razonable
+    coincidencia = primera(coincidencias, tipo, secciones=(), filtro=lambda valor: 5 < len(valor) < 150)
+    return coincidencia["valor"] if coincidencia else por_defecto
@@ -0,0 +1,214 @@
+# Librerías para reutilizar Chromium entre renderizados (Playwright)
+import asyncio
+import atexit
+import time
+from urllib.parse import urlparse
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutErrorSync
+from .cache_http import cacheado, cacheado_async
+
+# Configuración del pool: pocos navegadores, contextos acotados y reciclados cada N navegaciones
+NAVEGADORES = 1
+CONTEXTOS_POR_NAVEGADOR = 4
+NAVEGACIONES_POR_CONTEXTO = 50
+
+# ─── Perfil ligero ───────────────────────────────────────────────────────────
+# Para extraer contacto solo hacen falta el documento y el JS que lo pinta: el resto se aborta
+TIPOS_BLOQUEADOS = {"image", "media", "font", "stylesheet", "texttrack", "eventsource", "websocket", "manifest", "other"}
+DOMINIOS_RASTREO = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "facebook.net", "facebook.com", "hotjar.com", "clarity.ms", "linkedin.com", "twitter.com",
+    "tiktok.com", "cookiebot.com", "onetrust.com", "youtube.com", "vimeo.com"
+)
+# La página está lista cuando aparece contenido de contacto o cuando la red queda en reposo.
+# El pie suele venir ya en la plantilla estática (antes de que el JS pinte el contacto), así
+# que solo cuenta como respaldo, pasada una parte del presupuesto de espera
+SELECTOR_CONTACTO = (
+    "address, a[href^='mailto:'], a[href^='tel:'], "
+    "[itemprop='email'], [itemprop='telephone'], [itemprop='address']"
+)
+SELECTOR_PIE = "footer, [id*='contact' i], [class*='contact' i], [id*='footer' i], [class*='footer' i]"
+ESPERA_MAXIMA_MS = 3000  # presupuesto de espera tras DOMContentLoaded (antes era una espera fija)
+FRACCION_SOLO_CONTACTO = 0.5  # parte del presupuesto en la que el pie todavía no basta
+
+def recurso_bloqueado(request):
+    if request.resource_type in TIPOS_BLOQUEADOS:
+        return True
+    # El documento principal nunca se bloquea por dominio: la web oficial puede ser una
+    # página de facebook.com, linkedin.com o youtube.com
+    if request.is_navigation_request() and request.frame.parent_frame is None:
+        return False
+    dominio = urlparse(request.url).hostname or ""
+    return any(dominio == rastreo or dominio.endswith("." + rastreo) for rastreo in DOMINIOS_RASTREO)
+
+async def bloquear_recursos(route):
+    if recurso_bloqueado(route.request):
+        await route.abort()
+    else:
+        await route.continue_()
+
+def bloquear_recursos_sync(route):
+    if recurso_bloqueado(route.request):
+        route.abort()
+    else:
+        route.continue_()
+
+async def nuevo_contexto(navegador):
+    contexto = await navegador.new_context()
+    await contexto.route("**/*", bloquear_recursos)
+    return contexto
+
+async def esperar_pie(page, espera_ms):
+    # Respaldo: el pie solo cuenta después de dar tiempo al contacto a aparecer
+    inicial = espera_ms * FRACCION_SOLO_CONTACTO
+    await asyncio.sleep(inicial / 1000)
+    await page.wait_for_selector(SELECTOR_PIE, state="attached", timeout=espera_ms - inicial)
+
+async def esperar_lista(page, espera_ms=ESPERA_MAXIMA_MS):
+    # Termina con la primera condición que se cumpla; si ninguna se cumple, al agotar espera_ms
+    esperas = [
+        asyncio.ensure_future(page.wait_for_selector(SELECTOR_CONTACTO, state="attached", timeout=espera_ms)),
+        asyncio.ensure_future(page.wait_for_load_state("networkidle", timeout=espera_ms)),
+        asyncio.ensure_future(esperar_pie(page, espera_ms)),
+    ]
+    try:
+        for espera in asyncio.as_completed(esperas):
+            try:
+                await espera
+                return
+            except PlaywrightTimeoutError:
+                continue
+    finally:
+        for espera in esperas:
+            espera.cancel()
+
+def esperar_lista_sync(page, espera_ms=ESPERA_MAXIMA_MS):
+    # Sin event loop no se pueden vigilar las condiciones a la vez: primero el contacto durante
+    # la parte reservada, luego el pie si ya está y, si no, la red en reposo con el tiempo que sobre
+    limite = time.monotonic() + espera_ms / 1000
+    try:
+        page.wait_for_selector(SELECTOR_CONTACTO, state="attached", timeout=espera_ms * FRACCION_SOLO_CONTACTO)
+        return
+    except PlaywrightTimeoutErrorSync:
+        pass
+    if page.query_selector(SELECTOR_PIE) is not None:
+        return
+    restante = (limite - time.monotonic()) * 1000
+    if restante > 0:
+        try:
+            page.wait_for_load_state("networkidle", timeout=restante)
+        except PlaywrightTimeoutErrorSync:
+            pass
+
+# ─── Pool asíncrono ──────────────────────────────────────────────────────────
+# Cada hueco es {"navegador", "contexto", "usos"}; la cola limita las páginas abiertas a la vez
+POOL = {"playwright": None, "huecos": None, "todos": [], "navegaciones": NAVEGACIONES_POR_CONTEXTO}
+BLOQUEO_POOL = asyncio.Lock()
+
+async def iniciar_pool(navegadores=NAVEGADORES, contextos_por_navegador=CONTEXTOS_POR_NAVEGADOR,
+                       navegaciones_por_contexto=NAVEGACIONES_POR_CONTEXTO):
+    async with BLOQUEO_POOL:
+        if POOL["playwright"] is not None:
+            return
+
+        playwright = await async_playwright().start()
+        huecos = asyncio.Queue()
+        todos = []
+        for _ in range(navegadores):
+            navegador = await playwright.chromium.launch(headless=True)
+            for _ in range(contextos_por_navegador):
+                hueco = {"navegador": navegador, "contexto": await nuevo_contexto(navegador), "usos": 0}
+                todos.append(hueco)
+                huecos.put_nowait(hueco)
+
+        POOL.update(playwright=playwright, huecos=huecos, todos=todos, navegaciones=navegaciones_por_contexto)
+
+async def reciclar_hueco(hueco):
+    # Si el navegador se cayó se relanza; el contexto se cambia por uno nuevo para liberar memoria
+    if not hueco["navegador"].is_connected():
+        anterior = hueco["navegador"]
+        hueco["navegador"] = await POOL["playwright"].chromium.launch(headless=True)
+        for otro in POOL["todos"]:
+            if otro["navegador"] is anterior:
+                otro["navegador"], otro["usos"] = hueco["navegador"], POOL["navegaciones"]
+    else:
+        try:
+            await hueco["contexto"].close()
+        except Exception:
+            pass
+    hueco["contexto"] = await nuevo_contexto(hueco["navegador"])
+    hueco["usos"] = 0
+
+async def obtener_html_renderizado_async(url, espera_ms=ESPERA_MAXIMA_MS, timeout=60000):
+    # El HTML renderizado se guarda en la caché en disco: una URL ya vista no vuelve a abrir página
+    return await cacheado_async(url, lambda: renderizar_async(url, espera_ms, timeout), "playwright")
+
+async def renderizar_async(url, espera_ms, timeout):
+    if POOL["playwright"] is None:
+        await iniciar_pool()
+
+    hueco = await POOL["huecos"].get()
+    try:
+        if hueco["usos"] >= POOL["navegaciones"] or not hueco["navegador"].is_connected():
+            await reciclar_hueco(hueco)
+
+        page = await hueco["contexto"].new_page()
+        try:
+            await page.goto(url, timeout=timeout, wait_until="domcontentloaded")
+            await esperar_lista(page, espera_ms)  # espera carga JS, como mucho espera_ms
+            return await page.content()
+        finally:
+            hueco["usos"] += 1
+            await page.close()
+    finally:
+        POOL["huecos"].put_nowait(hueco)
+
+async def cerrar_pool():
+    async with BLOQUEO_POOL:
+        if POOL["playwright"] is None:
+            return
+        for navegador in {id(h["navegador"]): h["navegador"] for h in POOL["todos"]}.values():
+            try:
+                await navegador.close()
+            except Exception:
+                pass
+        await POOL["playwright"].stop()
+        POOL.update(playwright=None, huecos=None, todos=[])
+
+# ─── Versión síncrona (un navegador reutilizado, para scripts sin asyncio) ───
+NAVEGADOR_SYNC = {"playwright": None, "navegador": None, "contexto": None, "usos": 0}
+
+def cerrar_navegador_sync():
+    if NAVEGADOR_SYNC["playwright"] is not None:
+        try:
+            NAVEGADOR_SYNC["navegador"].close()
+        finally:
+            NAVEGADOR_SYNC["playwright"].stop()
+        NAVEGADOR_SYNC.update(playwright=None, navegador=None, contexto=None, usos=0)
+
+def obtener_html_renderizado(url, espera_ms=ESPERA_MAXIMA_MS, timeout=60000, navegaciones_por_contexto=NAVEGACIONES_POR_CONTEXTO):
+    return cacheado(url, lambda: renderizar(url, espera_ms, timeout, navegaciones_por_contexto), "playwright")
+
+def renderizar(url, espera_ms, timeout, navegaciones_por_contexto):
+    if NAVEGADOR_SYNC["playwright"] is None:
+        NAVEGADOR_SYNC["playwright"] = sync_playwright().start()
+        atexit.register(cerrar_navegador_sync)
+    if NAVEGADOR_SYNC["navegador"] is None or not NAVEGADOR_SYNC["navegador"].is_connected():
+        NAVEGADOR_SYNC.update(
+            navegador=NAVEGADOR_SYNC["playwright"].chromium.launch(headless=True), contexto=None, usos=0
+        )
+    if NAVEGADOR_SYNC["contexto"] is None or NAVEGADOR_SYNC["usos"] >= navegaciones_por_contexto:
+        if NAVEGADOR_SYNC["contexto"] is not None:
+            NAVEGADOR_SYNC["contexto"].close()
+        contexto = NAVEGADOR_SYNC["navegador"].new_context()
+        contexto.route("**/*", bloquear_recursos_sync)
+        NAVEGADOR_SYNC.update(contexto=contexto, usos=0)
+
+    page = NAVEGADOR_SYNC["contexto"].new_page()
+    try:
+        page.goto(url, timeout=timeout, wait_until="domcontentloaded")
+        esperar_lista_sync(page, espera_ms)  # espera carga JS, como mucho espera_ms
+        return page.content()
+    finally:
+        NAVEGADOR_SYNC["usos"] += 1
+        page.close()
@@ -0,0 +1,109 @@
+# Librerías para normalizar los nombres de las empresas del archivo .csv
+import re
+import unicodedata
+from functools import lru_cache
+
+# Patrones precompilados (se compilan una sola vez al importar el módulo)
+PATRON_PARENTESIS = re.compile(r'\(.*?\)')
+PATRON_SA_UNIPERSONAL = re.compile(r'\bS\.?A\.?\b')
+PATRON_NO_PERMITIDOS = re.compile(r"[^A-Z0-9&/ ]")
+PATRON_ESPACIOS = re.compile(r"\s+")
+
+# Sustituciones legales y comerciales, en orden de prioridad
+SUSTITUCIONES = [
+    (r'\bS\.?A\.?U\.?\b', 'SAU'),
+    (r'\bS\.?L\.?U\.?\b', 'SLU'),
+    (r'\bS\.?A\.?\b', 'SA'),
+    (r'\bS\.?L\.?\b', 'SL'),
+    (r'\bC\.?V\.?\b', 'CV'),
+    (r'\bCOOP\.?\b', 'COOP'),
+    (r'\bINC\.?\b', 'INC'),
+    (r'\bLTDA\.?\b', 'LTDA'),
+    (r'\bEIRL\.?\b', 'EIRL')
+]
+
+# Todas las sustituciones en una sola alternancia (un grupo por sufijo)
+PATRON_SUFIJOS = re.compile(
+    "|".join(f"(?P<s{i}>{patron})" for i, (patron, _) in enumerate(SUSTITUCIONES)),
+    flags=re.IGNORECASE
+)
+
+def sustituir_sufijos(nombre):
+    """
+    Aplica las sustituciones legales en una sola pasada, con el mismo resultado
+    que aplicarlas una a una en el orden de SUSTITUCIONES.
+    """
+    partes = []
+    ultimo_fin = 0
+    anterior = None  # (fin, prioridad, terminaba en punto) del último reemplazo
+
+    for match in PATRON_SUFIJOS.finditer(nombre):
+        prioridad = int(match.lastgroup[1:])
+        inicio, fin = match.span()
+
+        # Un reemplazo previo de mayor prioridad que terminaba en "." y está pegado
+        # a este match le quita el límite de palabra (\b): en pasadas sucesivas no se aplicaría
+        if anterior and anterior[0] == inicio and anterior[2] and anterior[1] < prioridad:
+            continue
+
+        partes.append(nombre[ultimo_fin:inicio])
+        partes.append(SUSTITUCIONES[prioridad][1])
+        ultimo_fin = fin
+        anterior = (fin, prioridad, match.group().endswith("."))
+
+    partes.append(nombre[ultimo_fin:])
+    return "".join(partes)
+
+@lru_cache(maxsize=200_000)
+def normalizar_texto(nombre):
+    # 1. Eliminar contenido entre paréntesis
+    nombre = PATRON_PARENTESIS.sub('', nombre)
+
+    # 2. Convertir a mayúsculas
+    nombre = nombre.upper()
+
+    # 3. Eliminar acentos y caracteres no ASCII (incluye ñ → n)
+    nombre = unicodedata.normalize("NFKD", nombre).encode("ASCII", "ignore").decode("utf-8")
+
+    # 4. Reemplazo especial si contiene "UNIPERSONAL"
+    if "UNIPERSONAL" in nombre:
+        nombre = PATRON_SA_UNIPERSONAL.sub('SAU', nombre)
+
+    # 5. Aplicar todas las sustituciones legales y comerciales
+    nombre = sustituir_sufijos(nombre)
+
+    # 6. Eliminar cualquier carácter que no sea letra, número, espacio, &, /
+    nombre = PATRON_NO_PERMITIDOS.sub(" ", nombre)
+
+    # 7. Reemplazar múltiples espacios por uno solo
+    nombre = PATRON_ESPACIOS.sub(" ", nombre).strip()
+
+    return nombre
+
+def normalizar_nombre(nombre):
+    if not isinstance(nombre, str):
+        return ""
+
+    # Los nombres repetidos se resuelven desde la caché
+    return normalizar_texto(nombre)
+
+def normalizar_serie(serie):
+    """
+    Versión vectorizada de normalizar_nombre para una columna completa.
+    """
+    es_texto = serie.map(lambda x: isinstance(x, str))
+    nombres = serie.where(es_texto, "").astype(str)
+
+    nombres = nombres.str.replace(PATRON_PARENTESIS, '', regex=True)
+    nombres = nombres.str.upper()
+    nombres = nombres.str.normalize("NFKD").str.encode("ASCII", "ignore").str.decode("utf-8")
+
+    unipersonal = nombres.str.contains("UNIPERSONAL", regex=False)
+    if unipersonal.any():
+        nombres[unipersonal] = nombres[unipersonal].str.replace(PATRON_SA_UNIPERSONAL, 'SAU', regex=True)
+
+    nombres = nombres.map(sustituir_sufijos)
+    nombres = nombres.str.replace(PATRON_NO_PERMITIDOS, " ", regex=True)
+    nombres = nombres.str.replace(PATRON_ESPACIOS, " ", regex=True).str.strip()
+
+    return nombres
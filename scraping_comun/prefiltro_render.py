@@ -0,0 +1,110 @@
+# Librerías para decidir, mirando solo el HTML crudo, si una página necesita Playwright
+import re
+from collections import Counter
+from .motor_contacto import analizar_documento
+
+UMBRAL_TEXTO = 500      # regla anterior: renderizar si el texto visible tenía menos de 500 caracteres
+RATIO_SCRIPT = 5        # bytes de <script> por carácter de texto a partir de los que el texto lo pinta JS
+BYTES_SCRIPT_EXTERNO = 2000  # peso de cada <script src> (no se descarga): un bundle externo también pinta texto
+RUTA_DECISIONES = "decisiones_render.txt"
+
+# Raíces vacías de frameworks SPA (React, Vue, Next, Nuxt, Gatsby, Angular)
+PATRON_RAIZ_SPA = re.compile(
+    r"<(div|main|section)\b[^>]*\bid\s*=\s*[\"']?(?:root|app|__next|__nuxt|___gatsby)\b[^>]*>\s*</\1>"
+    r"|<app-root\b[^>]*>\s*</app-root>",
+    re.I
+)
+PATRON_NOSCRIPT_JS = re.compile(
+    r"<noscript\b[^>]*>[^<]*(?:<[^/][^>]*>[^<]*)*?(?:javascript|JS)\b", re.I
+)
+PATRON_SCRIPT = re.compile(r"<script\b[^>]*>(.*?)</script>", re.I | re.S)
+PATRON_ETIQUETA = re.compile(r"<[^>]+>")
+PATRON_SCRIPT_EXTERNO = re.compile(r"<script\b[^>]*\bsrc\s*=", re.I)
+# Un código suelto (404, 500...) solo cuenta al principio o al final del <title> o <h1>
+# ("404 - Página no encontrada"); en el texto hace falta la frase ("error 404", "not found"),
+# para no confundir "más de 500 clientes" con un error
+CODIGOS_ERROR = r"(?:404|403|410|500|502|503)"
+PATRON_TITULAR = re.compile(r"<(title|h1)\b[^>]*>(.*?)</\1\s*>", re.I | re.S)
+PATRON_CODIGO_TITULAR = re.compile(rf"^\W*(?:error\W*)?{CODIGOS_ERROR}\b|\b{CODIGOS_ERROR}\W*$", re.I)
+PATRON_ERROR = re.compile(
+    rf"\b(?:(?:error|c[oó]digo|code|http)\W{{0,3}}{CODIGOS_ERROR}|{CODIGOS_ERROR}\W{{0,3}}(?:error|not found|forbidden)"
+    r"|not found|página no encontrada|pagina no encontrada|no se ha encontrado"
+    r"|forbidden|access denied|acceso denegado|service unavailable|servicio no disponible)\b",
+    re.I
+)
+TIPOS_CONTACTO = {"email", "telefono", "direccion"}
+
+def es_pagina_error(html, texto):
+    titulares = [PATRON_ETIQUETA.sub(" ", contenido).strip() for _, contenido in PATRON_TITULAR.findall(html)]
+    if any(PATRON_CODIGO_TITULAR.search(titular) or PATRON_ERROR.search(titular) for titular in titulares):
+        return True
+    return bool(PATRON_ERROR.search(texto[:300]))
+
+def bytes_script(html):
+    # Scripts en línea por su tamaño; los externos, por un peso fijo
+    return (sum(len(script) for script in PATRON_SCRIPT.findall(html))
+            + BYTES_SCRIPT_EXTERNO * len(PATRON_SCRIPT_EXTERNO.findall(html)))
+
+def necesita_render(html, documento):
+    """
+    Clasifica la página a partir del HTML crudo y de analizar_documento(html).
+    Devuelve (renderizar, motivo).
+    """
+    texto = documento["texto"]
+    # 1. Los datos de contacto ya están en el HTML estático: renderizar no aporta nada
+    if any(c["tipo"] in TIPOS_CONTACTO for c in documento["coincidencias"]):
+        return False, "contacto en HTML estático"
+
+    # 2. Páginas de error: el navegador vería el mismo error
+    if len(texto) < UMBRAL_TEXTO and es_pagina_error(html, texto):
+        return False, "página de error"
+
+    # 3. Señales de contenido pintado por JavaScript
+    if PATRON_RAIZ_SPA.search(html):
+        return True, "raíz SPA vacía"
+    if PATRON_NOSCRIPT_JS.search(html):
+        return True, "noscript pide JavaScript"
+    if len(texto) < UMBRAL_TEXTO:
+        if bytes_script(html) > RATIO_SCRIPT * max(len(texto), 1):
+            return True, "mucho script y poco texto"
+        return False, "página corta pero completa"
+    return False, "texto suficiente"
+
+def clasificar(html):
+    # Parseo y clasificación en una sola llamada (se ejecuta en el ejecutor de parseo)
+    documento = analizar_documento(html)
+    renderizar, motivo = necesita_render(html, documento)
+    return documento, renderizar, motivo
+
+# ─── Registro de decisiones ──────────────────────────────────────────────────
+def registrar_decision(url, renderizar, motivo, longitud_texto, ruta=RUTA_DECISIONES):
+    # Se anota también lo que habría hecho la regla anterior para medir los renders evitados
+    regla_anterior = longitud_texto < UMBRAL_TEXTO
+    with open(ruta, "a", encoding="utf-8") as f:
+        f.write(f"{url} | render: {renderizar} | regla {UMBRAL_TEXTO}: {regla_anterior} | "
+                f"texto: {longitud_texto} | motivo: {motivo}\n")
+
+def resumen_decisiones(ruta=RUTA_DECISIONES):
+    """
+    Lee el registro y cuenta renders hechos, evitados (la regla anterior los habría
+    hecho) y añadidos (la regla anterior no los habría hecho), con sus motivos.
+    """
+    resumen = {"paginas": 0, "renders": 0, "evitados": 0, "añadidos": 0, "motivos": Counter()}
+    with open(ruta, encoding="utf-8") as f:
+        for linea in f:
+            campos = dict(parte.split(": ", 1) for parte in linea.rstrip("\n").split(" | ")[1:])
+            renderizar = campos["render"] == "True"
+            regla_anterior = campos[f"regla {UMBRAL_TEXTO}"] == "True"
+            resumen["paginas"] += 1
+            resumen["renders"] += renderizar
+            resumen["evitados"] += regla_anterior and not renderizar
+            resumen["añadidos"] += renderizar and not regla_anterior
+            resumen["motivos"][campos["motivo"]] += 1
+    return resumen
+
+if __name__ == "__main__":
+    resumen = resumen_decisiones()
+    print(f"Páginas: {resumen['paginas']} | renders: {resumen['renders']} | "
+          f"evitados: {resumen['evitados']} | añadidos: {resumen['añadidos']}")
+    for motivo, total in resumen["motivos"].most_common():
+        print(f"  {motivo:<28} {total}")
@@ -0,0 +1,30 @@
+# Regresión: el índice de n-gramas no cambia las correcciones respecto al diccionario completo
+import os
+import random
+import pandas as pd
+import pytest
+from correccion import pipeline_correccion
+
+RUTA_EMPRESAS = os.path.join(os.path.dirname(__file__), "..", "crawler", "data", "raw", "100empresas.csv")
+
+def errata(nombre, rng):
+    i = rng.randrange(len(nombre))
+    return nombre[:i] + nombre[i + 1:]
+
+@pytest.fixture
+def empresas():
+    # Cada nombre real dos veces (entra en el diccionario) más variantes con erratas, en minúsculas y sin forma jurídica
+    rng = random.Random(0)
+    nombres = pd.read_csv(RUTA_EMPRESAS)["ADJUDICATARIO"].dropna().tolist()
+    filas = nombres * 2
+    filas += [errata(nombre, rng) for nombre in nombres]
+    filas += [nombre.lower() for nombre in nombres[::3]]
+    filas += [nombre.rsplit(",", 1)[0] for nombre in nombres[::2]]
+    return pd.DataFrame({"ADJUDICATARIO": filas})
+
+@pytest.mark.parametrize("persistente", [False, True])
+def test_indice_no_cambia_correcciones(empresas, tmp_path, persistente):
+    ruta = lambda nombre: str(tmp_path / f"{nombre}.sqlite") if persistente else None
+    sin_indice = pipeline_correccion(empresas.copy(), "ADJUDICATARIO", ruta_diccionario=ruta("sin"), usar_indice=False)
+    con_indice = pipeline_correccion(empresas.copy(), "ADJUDICATARIO", ruta_diccionario=ruta("con"), usar_indice=True)
+    pd.testing.assert_frame_equal(con_indice, sin_indice)
@@ -0,0 +1,39 @@
+# Regresión: los intermedios Parquet conservan los tipos al leerlos y al anexar partes
+import pandas as pd
+import pytest
+from scraping_comun.intermedios import guardar_intermedio, leer_intermedio
+
+pytest.importorskip("pyarrow")
+
+def test_parquet_conserva_tipos(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    df = pd.DataFrame({
+        "Nº": [1, 2],
+        "CIF_NUM": [2**60 + 1, 7],
+        "ADJUDICATARIO": ["ACCIONA AGUA SA", "ACEINSA MOVILIDAD SA"],
+        "MATCH_SCORE": [90, 0],
+        "CORRECCION_MANUAL": [None, None],
+    })
+    guardar_intermedio(df, "empresas", "parquet")
+    leido = leer_intermedio("empresas", "parquet")
+
+    assert leido["Nº"].dtype == "int64"
+    assert leido["CIF_NUM"].tolist() == [2**60 + 1, 7]
+    assert leido["MATCH_SCORE"].dtype == "int64"
+    assert isinstance(leido["ADJUDICATARIO"].dtype, pd.CategoricalDtype)
+    assert leido["ADJUDICATARIO"].astype(str).tolist() == df["ADJUDICATARIO"].tolist()
+
+def test_parquet_anexar_amplia_solo_columnas_que_cambian(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    primero = pd.DataFrame({"Nº": [1], "MATCH_SCORE": [90], "CORRECCION_MANUAL": [None], "EMPRESA": ["X"]})
+    segundo = pd.DataFrame({"Nº": [2], "MATCH_SCORE": [85.5], "CORRECCION_MANUAL": ["Y SL"], "EMPRESA": ["Z"]})
+    guardar_intermedio(primero, "empresas", "parquet", anexar=True)
+    guardar_intermedio(segundo, "empresas", "parquet", anexar=True)
+    leido = leer_intermedio("empresas", "parquet")
+
+    assert leido["Nº"].dtype == "int64"
+    assert leido["Nº"].tolist() == [1, 2]
+    assert leido["MATCH_SCORE"].dtype == "float64"
+    assert leido["MATCH_SCORE"].tolist() == [90.0, 85.5]
+    assert leido["CORRECCION_MANUAL"].astype(object).where(leido["CORRECCION_MANUAL"].notna(), None).tolist() == [None, "Y SL"]
+    assert leido["EMPRESA"].astype(str).tolist() == ["X", "Z"]
@@ -0,0 +1,58 @@
+# Regresión: reanudar desde el checkpoint no vuelve a buscar ni a descargar las empresas ya hechas
+import asyncio
+import csv
+import importlib
+import json
+import sys
+import pandas as pd
+import pytest
+
+pytest.importorskip("crawl4ai")
+
+@pytest.fixture
+def main_async(tmp_path, monkeypatch):
+    # main_async lee nombres_normalizados_para_scraping.csv del directorio actual al importarse
+    monkeypatch.chdir(tmp_path)
+    pd.DataFrame({
+        "NOMBRE_CORREGIDO_FINAL_MANUAL_NORMALIZADO": [f"EMPRESA {i}" for i in range(6)],
+        "CIF": [f"B{i:08d}" for i in range(6)],
+    }).to_csv("nombres_normalizados_para_scraping.csv", index=False)
+    sys.modules.pop("main_async", None)
+    modulo = importlib.import_module("main_async")
+    monkeypatch.setattr(modulo, "INTERVALO_DOMINIO", 0)
+    monkeypatch.setattr(modulo, "consultar_cif", lambda cif: None)
+    monkeypatch.setattr(modulo, "registrar_url", lambda *args: None)
+    yield modulo
+    sys.modules.pop("main_async", None)
+
+def test_reanudar_no_repite_empresas(main_async, tmp_path, monkeypatch):
+    buscadas, descargadas = [], []
+
+    def buscar_url(nombre):
+        buscadas.append(nombre)
+        return f"https://{nombre.replace(' ', '').lower()}.es"
+
+    async def extraer_contacto_async(url, propagar_errores=False, turno=None):
+        descargadas.append(url)
+        return "Calle Mayor 1", "910000000", "info@empresa.es"
+
+    monkeypatch.setattr(main_async, "buscar_url", buscar_url)
+    monkeypatch.setattr(main_async, "extraer_contacto_async", extraer_contacto_async)
+
+    # Ejecución anterior interrumpida: filas 0, 2 y 4 ya en el checkpoint (la última línea, a medias)
+    ruta = tmp_path / "checkpoint.jsonl"
+    with open(ruta, "w", encoding="utf-8") as f:
+        for posicion in (4, 0, 2):
+            f.write(json.dumps({"Empresa": f"EMPRESA {posicion}", "CIF": f"B{posicion:08d}", "Posición": posicion}) + "\n")
+        f.write('{"Empresa": "EMPRESA 5", "CI')
+
+    asyncio.run(main_async.procesar_empresas_async(main_async.df, ruta_checkpoint=str(ruta), reanudar=True))
+
+    assert sorted(buscadas) == ["EMPRESA 1", "EMPRESA 3", "EMPRESA 5"]
+    assert sorted(descargadas) == ["https://empresa1.es", "https://empresa3.es", "https://empresa5.es"]
+
+    # El CSV final tiene cada empresa una vez y en el orden de la entrada
+    ruta_csv = tmp_path / "salida.csv"
+    main_async.exportar_csv(str(ruta), str(ruta_csv), ["Empresa", "CIF"], orden="Posición")
+    with open(ruta_csv, encoding="utf-8") as f:
+        assert [fila["Empresa"] for fila in csv.DictReader(f)] == [f"EMPRESA {i}" for i in range(6)]
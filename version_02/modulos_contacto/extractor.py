@@ -1,39 +1,29 @@
 # extractor.py
 # Librerías del auxiliar
-import re                           # para aplicar expresiones regulares (regex)
-from bs4 import BeautifulSoup       # para parsear y navegar el contenido HTML
 
+# Motor de extracción en una sola pasada (paquete compartido scraping_comun)
+from scraping_comun.motor_contacto import analizar_documento, primera, valores
 
-# Función de extracción de la información de contacto:
-def extraer_contacto(html_content):
-    soup = BeautifulSoup(html_content, 'html.parser')
-    posibles_secciones = soup.find_all(['footer', 'div', 'p', 'span'], class_=re.compile(r'contact|info|footer', re.I))
-    textos_a_buscar = [sec.get_text() for sec in posibles_secciones]
-    textos_a_buscar.append(soup.get_text())
-
-    texto_combinado = " ".join(textos_a_buscar)
-    texto_limpio = re.sub(r'\s+', ' ', texto_combinado).strip()
+LOCALIDADES = ["Madrid", "Albacete", "Palma", "Málaga"]
 
-    email_regex = r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+"
-    telefono_regex = r"(?:\+34)?[\s.-]?\d{2,3}[\s.-]?\d{2,3}[\s.-]?\d{2,3}"
-    direccion_regex = r"(?:Calle|Avda|Avenida|Plaza|Paseo|Camino|Ctra\.|Carrer)[\s\w.,º#-]+?\d{1,4}[A-Za-z]?(?:\s+\d{5})?\s+[A-ZÁÉÍÓÚÑa-záéíóúñüÜ]+"
+# Validación semántica por localidad
+def validar_localidad(direccion):
+    return any(loc in direccion for loc in LOCALIDADES)
 
-    email = re.search(email_regex, texto_limpio)
-    telefono = re.search(telefono_regex, texto_limpio)
-    direcciones = [match.group(0).strip() for match in re.finditer(direccion_regex, texto_limpio)]
-
-    # Validación semántica por localidad
-    def validar_localidad(direccion):
-        localidades = ["Madrid", "Albacete", "Palma", "Málaga"]
-        return any(loc in direccion for loc in localidades)
+# Función de extracción de la información de contacto:
+def extraer_contacto(html_content):
+    # Un solo recorrido del documento; en cada campo se prefieren las secciones de contacto (footer, class contact/info)
+    coincidencias = analizar_documento(html_content)["coincidencias"]
 
-    direcciones_filtradas = [d for d in direcciones if validar_localidad(d)]
+    email = primera(coincidencias, "email")
+    telefono = primera(coincidencias, "telefono")
+    direcciones_filtradas = [d for d in valores(coincidencias, "direccion") if validar_localidad(d)]
     direccion_final = "; ".join(direcciones_filtradas) if direcciones_filtradas else "No encontrado"
 
     return {
         "direccion": direccion_final,
-        "telefono": telefono.group(0).strip() if telefono else "No encontrado",
-        "email": email.group(0).strip() if email else "No encontrado"
+        "telefono": telefono["valor"] if telefono else "No encontrado",
+        "email": email["valor"] if email else "No encontrado"
     }
     
 if __name__ == "__main__": 
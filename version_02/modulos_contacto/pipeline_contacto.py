@@ -1,9 +1,11 @@
 # pipeline_contacto.py
 # Scraping asincrónico con Playwright para extraer contacto desde URLs oficiales
 
+import argparse
 import asyncio
 import csv
 import aiohttp
+import pandas as pd
 from tqdm import tqdm
 
 # Manejo de errores específicos de Playwright
@@ -13,117 +15,214 @@ from playwright._impl._errors import TargetClosedError
 # Función de extracción personalizada
 from extractor import extraer_contacto
 
-MAX_CONCURRENCY = 5  # Número máximo de tareas concurrentes
-
-# Buscar página de contacto dentro del sitio
-async def buscar_pagina_contacto(url_base):
-    posibles_urls = [
-        f"{url_base.rstrip('/')}/contacto",
-        f"{url_base.rstrip('/')}/contact",
-        f"{url_base.rstrip('/')}/about-us",
-        f"{url_base.rstrip('/')}/sobre-nosotros"
-    ]
-    timeout = aiohttp.ClientTimeout(total=15)
-    async with aiohttp.ClientSession(timeout=timeout) as session:
-        for url_pagina in posibles_urls:
+# Caché HTTP, índice CIF, navegador, checkpoint e intermedios compartidos con el resto de scrapers (paquete scraping_comun)
+from scraping_comun.cache_http import cacheado_async, obtener_html_async
+from scraping_comun.indice_cif import consultar_contacto, registrar_contacto
+from scraping_comun.navegador import nuevo_contexto, esperar_lista  # Perfil ligero: sin imágenes/fuentes/CSS/rastreadores
+from scraping_comun.mini_crawler import CAMPOS, rastrear_contacto  # Home y, si faltan campos, páginas enlazadas
+from scraping_comun.checkpoint import abrir_checkpoint, guardar_registro, leer_en_orden, exportar_csv
+from scraping_comun.indice_cif import normalizar_cif
+from scraping_comun.intermedios import leer_intermedio, guardar_intermedio, ruta_intermedio, FORMATO_INTERMEDIOS
+from scraping_comun.prefiltro_render import clasificar  # ¿el HTML estático basta o hace falta el navegador?
+
+MAX_CONCURRENCY = 5  # Número de workers por defecto (se cambia con --concurrencia)
+CAMPOS_CONTACTO = ["empresa", "url", "email", "telefono", "direccion", "error"]
+RUTA_CHECKPOINT = "contacto.jsonl"  # una línea por empresa terminada; --resume salta sus CIF
+
+# Leer las filas de urls (en Parquet los valores nulos pasan a "" como en csv.DictReader)
+def leer_urls():
+    if FORMATO_INTERMEDIOS == "parquet":
+        df = leer_intermedio("urls").astype(object)
+        return df.where(df.notna(), "").to_dict("records")
+    with open(ruta_intermedio("urls"), newline='', encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+# Guardar resultados en contacto.csv o contacto.parquet a partir del checkpoint,
+# en el orden de urls (no en el de finalización de los workers)
+def guardar_contactos(ruta_checkpoint=RUTA_CHECKPOINT):
+    if FORMATO_INTERMEDIOS == "parquet":
+        df = pd.DataFrame(list(leer_en_orden(ruta_checkpoint, "posicion")), columns=CAMPOS_CONTACTO)
+        return guardar_intermedio(df, "contacto")
+    return exportar_csv(ruta_checkpoint, "contacto.csv", CAMPOS_CONTACTO, orden="posicion")
+
+# Cargar una URL en la página del worker y devolver el HTML renderizado
+# (sin esperar a "load": basta el DOM y que aparezca el contacto o se calme la red)
+async def renderizar(page, url):
+    await page.goto(url, timeout=30000, wait_until="domcontentloaded")
+    await esperar_lista(page)
+    return await page.content()
+
+async def descargar(page, url):
+    return await cacheado_async(url, lambda: renderizar(page, url), "playwright")
+
+# Sesión HTTP compartida por todo el pipeline: keep-alive, caché DNS y límite de conexiones por host
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/115.0.0.0 Safari/537.36"
+    )
+}
+LIMITE_CONEXIONES = 100
+LIMITE_POR_HOST = 4
+SESION = {"session": None}
+
+async def obtener_sesion():
+    if SESION["session"] is None or SESION["session"].closed:
+        conector = aiohttp.TCPConnector(
+            limit=LIMITE_CONEXIONES, limit_per_host=LIMITE_POR_HOST,
+            ttl_dns_cache=300, keepalive_timeout=30
+        )
+        SESION["session"] = aiohttp.ClientSession(
+            connector=conector, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=15)
+        )
+    return SESION["session"]
+
+async def cerrar_sesion():
+    if SESION["session"] is not None:
+        await SESION["session"].close()
+        SESION["session"] = None
+
+# Páginas enlazadas (contacto, aviso legal...): primero el HTML estático por la sesión compartida
+# (con caché HTTP y ETag); solo si parece pintado por JavaScript se abre en el navegador
+async def descargar_enlazada(page, url):
+    try:
+        html = await obtener_html_async(url, await obtener_sesion())
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return await descargar(page, url)
+    _, renderizar_pagina, _ = await asyncio.to_thread(clasificar, html)
+    return await descargar(page, url) if renderizar_pagina else html
+
+# Adaptador para el mini-crawler: "No encontrado" pasa a None (campo pendiente)
+async def extraer_campos(url, html):
+    contacto = extraer_contacto(html)
+    return {campo: None if contacto.get(campo, "No encontrado") == "No encontrado" else contacto[campo]
+            for campo in CAMPOS}, html
+
+# Procesar una empresa con la página reutilizable del worker
+async def procesar_url(page, row):
+    url_principal = row.get("URL_OFICIAL")
+    empresa = row.get("CORREGIDO_FINAL")
+
+    if not url_principal or url_principal in ["No encontrada", "Error"]:
+        return {
+            "empresa": empresa, "url": url_principal, "email": "", 
+            "telefono": "", "direccion": "", "error": "URL no válida"
+        }
+
+    # Primero la home; si faltan campos, las páginas de contacto / aviso legal / quiénes somos
+    # enlazadas desde ella (la que ya sirvió para este CIF va primero), hasta completarlos
+    cif = row.get("CIF")
+    conocida = await asyncio.to_thread(consultar_contacto, cif, url_principal)
+    url_a_scrapear = url_principal
+
+    try:
+        html = await descargar(page, url_principal)
+        campos, aportes = await rastrear_contacto(
+            url_principal, html, extraer_campos, lambda url: descargar_enlazada(page, url),
+            conocidas=[conocida] if conocida and conocida != url_principal else []
+        )
+        url_a_scrapear = next((url for url in aportes if url != url_principal), url_principal)
+        if url_a_scrapear != conocida:
+            await asyncio.to_thread(registrar_contacto, cif, url_principal, url_a_scrapear)
+        return {
+            "empresa": empresa, "url": url_a_scrapear, 
+            "email": campos["email"] or "No encontrado", 
+            "telefono": campos["telefono"] or "No encontrado", 
+            "direccion": campos["direccion"] or "No encontrado", "error": ""
+        }
+    except PlaywrightTimeoutError:
+        return {
+            "empresa": empresa, "url": url_a_scrapear, "email": "", 
+            "telefono": "", "direccion": "", "error": "TimeoutError"
+        }
+    except TargetClosedError:
+        return {
+            "empresa": empresa, "url": url_a_scrapear, "email": "", 
+            "telefono": "", "direccion": "", "error": "TargetClosedError"
+        }
+    except Exception as e:
+        return {
+            "empresa": empresa, "url": url_a_scrapear, "email": "", 
+            "telefono": "", "direccion": "", "error": str(e)
+        }
+
+# Worker: abre una sola página y la reutiliza para todas las filas que saca de la cola
+async def worker(browser, cola, checkpoint, progreso):
+    contexto = await nuevo_contexto(browser)
+    page = await contexto.new_page()
+    try:
+        while (tarea := await cola.get()) is not None:
+            posicion, row = tarea
+            if page.is_closed():  # la página se cerró (crash o TargetClosedError): se abre otra
+                page = await contexto.new_page()
             try:
-                async with session.head(url_pagina, allow_redirects=True) as response:
-                    if response.status == 200:
-                        return url_pagina
-            except aiohttp.ClientError:
-                continue
-    return url_base  # Fallback si no se encuentra página específica
-
-# Procesar cada empresa con semáforo de concurrencia
-async def procesar_url_con_semaforo(semaforo, page, row):
-    async with semaforo:
-        url_principal = row.get("URL_OFICIAL")
-        empresa = row.get("CORREGIDO_FINAL")
-
-        if not url_principal or url_principal in ["No encontrada", "Error"]:
-            try:
-                await page.close()
-            except Exception:
-                pass
-            return {
-                "empresa": empresa, "url": url_principal, "email": "", 
-                "telefono": "", "direccion": "", "error": "URL no válida"
-            }
-
-        url_a_scrapear = await buscar_pagina_contacto(url_principal)
-
+                resultado = await procesar_url(page, row)
+            except Exception as e:
+                resultado = {
+                    "empresa": "", "url": "", "email": "", 
+                    "telefono": "", "direccion": "", "error": str(e)
+                }
+            guardar_registro(checkpoint, {**resultado, "cif": row.get("CIF"), "posicion": posicion})
+            progreso.update(1)
+    finally:
         try:
-            await page.goto(url_a_scrapear, timeout=30000, wait_until="load")
-            html = await page.content()
-            contacto = extraer_contacto(html)
-            return {
-                "empresa": empresa, "url": url_a_scrapear, 
-                "email": contacto.get("email", ""), 
-                "telefono": contacto.get("telefono", ""), 
-                "direccion": contacto.get("direccion", ""), "error": ""
-            }
-        except PlaywrightTimeoutError:
-            return {
-                "empresa": empresa, "url": url_a_scrapear, "email": "", 
-                "telefono": "", "direccion": "", "error": "TimeoutError"
-            }
-        except TargetClosedError:
-            return {
-                "empresa": empresa, "url": url_a_scrapear, "email": "", 
-                "telefono": "", "direccion": "", "error": "TargetClosedError"
-            }
-        except Exception as e:
-            return {
-                "empresa": empresa, "url": url_a_scrapear, "email": "", 
-                "telefono": "", "direccion": "", "error": str(e)
-            }
-        finally:
-            try:
-                await page.close()
-            except Exception:
-                pass
-
-# Función principal del pipeline
-async def main():
-    resultados_raw = []
-    semaforo = asyncio.Semaphore(MAX_CONCURRENCY)
+            await contexto.close()
+        except Exception:
+            pass
+
+# Función principal del pipeline: N workers con su página, alimentados por una cola acotada
+# Cada resultado va al checkpoint en cuanto termina; con reanudar=True se saltan los CIF ya hechos
+async def main(concurrencia=MAX_CONCURRENCY, reanudar=False):
+    try:
+        reader = leer_urls()
+    except FileNotFoundError:
+        print(f"No se encontró el archivo 'urls.{FORMATO_INTERMEDIOS}'. Verifica la ruta.")
+        return
+
+    checkpoint, hechas = abrir_checkpoint(RUTA_CHECKPOINT, reanudar, campo="cif")
+    cola = asyncio.Queue(maxsize=concurrencia * 2)
+    progreso = tqdm(total=len(reader), desc="Extrayendo contactos")
+
+    async def productor():
+        for posicion, row in enumerate(reader):
+            if normalizar_cif(row.get("CIF")) in hechas:
+                progreso.update(1)
+                continue
+            await cola.put((posicion, row))
+        for _ in range(concurrencia):
+            await cola.put(None)
 
     async with async_playwright() as p:
         browser = await p.chromium.launch()
-
+        tareas = [
+            asyncio.create_task(etapa)
+            for etapa in (productor(), *(worker(browser, cola, checkpoint, progreso) for _ in range(concurrencia)))
+        ]
         try:
-            with open("urls.csv", newline='', encoding="utf-8") as f:
-                reader = list(csv.DictReader(f))
-                tareas = []
-                for row in reader:
-                    page = await browser.new_page()
-                    tareas.append(procesar_url_con_semaforo(semaforo, page, row))
-
-                for coro in tqdm(asyncio.as_completed(tareas), total=len(tareas), desc="Extrayendo contactos"):
-                    try:
-                        resultado = await coro
-                    except Exception as e:
-                        resultado = {
-                            "empresa": "", "url": "", "email": "", 
-                            "telefono": "", "direccion": "", "error": str(e)
-                        }
-                    resultados_raw.append(resultado)
-
-        except FileNotFoundError:
-            print("No se encontró el archivo 'urls.csv'. Verifica la ruta.")
-            return
-
-        await browser.close()
-
-    # Guardar resultados
-    with open("contacto.csv", "w", newline='', encoding="utf-8") as out:
-        fieldnames = ["empresa", "url", "email", "telefono", "direccion", "error"]
-        writer = csv.DictWriter(out, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(resultados_raw)
+            await asyncio.gather(*tareas)
+        finally:
+            # Si un worker falla, los demás se cancelan y se esperan antes de cerrar el checkpoint
+            for tarea in tareas:
+                tarea.cancel()
+            await asyncio.gather(*tareas, return_exceptions=True)
+            progreso.close()
+            checkpoint.close()
+            await browser.close()
+            await cerrar_sesion()
+
+    # Guardar resultados (desde el checkpoint, incluidas las empresas de ejecuciones anteriores)
+    return guardar_contactos(RUTA_CHECKPOINT)
 
 # Disparador de ejecución
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extrae datos de contacto desde las URLs oficiales")
+    parser.add_argument("--concurrencia", type=int, default=MAX_CONCURRENCY,
+                        help=f"número de workers (páginas abiertas a la vez), por defecto {MAX_CONCURRENCY}")
+    parser.add_argument("--resume", action="store_true",
+                        help=f"continúa desde {RUTA_CHECKPOINT} saltando los CIF ya procesados")
+    args = parser.parse_args()
+
     print("Iniciando pipeline de contacto...")
-    asyncio.run(main())
-    print("Pipeline finalizado. Revisa contacto.csv para resultados.")
\ No newline at end of file
+    ruta_salida = asyncio.run(main(args.concurrencia, args.resume))
+    print(f"Pipeline finalizado. Revisa {ruta_salida} para resultados.")
\ No newline at end of file
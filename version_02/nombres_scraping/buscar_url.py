@@ -1,15 +1,20 @@
 # Sistema asincrónico para búsqueda de URLs oficiales de empresas
 # Librerías
-import pandas as pd                                         # Manipulación y análisis de datos en Python
-import requests                                             # Para hacer peticiones HTTP
+import re                                                   # Limpieza de etiquetas al validar por contenido
+import codecs                                               # Decodificación incremental del cuerpo en streaming
+import html                                                 # Entidades HTML (&eacute; → é) antes de normalizar
+import aiohttp                                              # Peticiones HTTP asíncronas (validación por contenido)
 import asyncio                                              # Soporte para programación asíncrona, varias tareas al mismo tiempo
 import warnings                                             # Manejo de advertencias
-from googlesearch import search                             # Búsqueda en Google
 from tqdm.asyncio import tqdm_asyncio                       # Barra de progreso para tareas asíncronas
 from bs4 import BeautifulSoup                               # Análisis de documentos HTML y XML
 
 warnings.filterwarnings("ignore", category=SyntaxWarning)   # Ignorar advertencias de sintaxis
-from tqdm import tqdm
+from scraping_comun.cache_http import leer_cache, renovar_cache, cabeceras_condicionales, SIN_RED  # Caché en disco con TTL y ETag
+from scraping_comun.normalizacion import normalizar_nombre, normalizar_texto  # Misma normalización que el pipeline de corrección
+from scraping_comun.busqueda import buscar_async                           # Búsqueda con proveedores intercambiables y caché de consultas
+from scraping_comun.indice_cif import consultar_cif, registrar_url         # Índice persistente CIF → URL oficial
+from scraping_comun.intermedios import leer_intermedio, guardar_intermedio, FORMATO_INTERMEDIOS  # CSV o Parquet, como el pipeline de corrección
 
 # ─── Configuración ──────────────────────────────────────────────────────────
 # Definición de los headers para las peticiones HTTP, simula visita a la página web
@@ -20,27 +25,136 @@ HEADERS = {
         "Chrome/115.0.0.0 Safari/537.36 Edg/115.0.1901.203"
     )
 }
+CONCURRENCIA_BUSQUEDA = 4   # consultas reales simultáneas al buscador
+# Máximo que se descarga de cada candidata al validar por contenido. Un nombre que solo aparece
+# más allá de este límite no se ve: la candidata queda "sin validar" (None), no rechazada
+PRESUPUESTO_BYTES = 512 * 1024
+TAMANO_BLOQUE = 16 * 1024
 
-# ─── Extracción de localidad ─────────────────────────────────────────────────
-# Esta función es un marcador de posición:
-def contiene_nombre_empresa(url, nombre_empresa):
+# ─── Sesión HTTP para la validación por contenido ───────────────────────────
+SESION = {"session": None}
+
+async def obtener_sesion():
+    if SESION["session"] is None or SESION["session"].closed:
+        SESION["session"] = aiohttp.ClientSession(headers=HEADERS, timeout=aiohttp.ClientTimeout(total=5))
+    return SESION["session"]
+
+async def cerrar_sesion():
+    if SESION["session"] is not None:
+        await SESION["session"].close()
+        SESION["session"] = None
+
+# ─── Validación por contenido (streaming) ───────────────────────────────────
+PATRON_ETIQUETAS = re.compile(r"<[^>]*>")
+PATRON_ULTIMO_ESPACIO = re.compile(r"\s(?=\S*$)")
+
+# Los bloques de página no pasan por la caché lru de normalizar_texto (solo sirve para nombres)
+normalizar_fragmento = normalizar_texto.__wrapped__
+
+def partir_bloque(texto):
+    """
+    Separa el texto en la parte que ya puede normalizarse y el resto, que continúa
+    en el siguiente bloque: no se corta ninguna palabra ni etiqueta entre bloques.
+    """
+    espacio = PATRON_ULTIMO_ESPACIO.search(texto)
+    corte = espacio.end() if espacio else 0
+    abierta = texto.rfind("<")
+    if abierta > texto.rfind(">"):
+        corte = min(corte, abierta)
+    return texto[:corte], texto[corte:]
+
+def texto_normalizado(fragmento):
+    return normalizar_fragmento(html.unescape(PATRON_ETIQUETAS.sub(" ", fragmento)))
+
+async def contiene_nombre_empresa(url, nombre_empresa, presupuesto=PRESUPUESTO_BYTES):
+    """
+    Comprueba si la página contiene el nombre normalizado de la empresa. Lee el cuerpo
+    por bloques y corta en cuanto lo encuentra o supera `presupuesto` bytes.
+    Devuelve True si lo encuentra, False si la página entera no lo contiene (o no se
+    puede descargar) y None si se agotó el presupuesto sin encontrarlo: sin validar.
+    """
+    objetivo = normalizar_nombre(nombre_empresa)
+    if not objetivo:
+        return False
+
+    # Página ya descargada por otro scraper y aún vigente (o modo sin red): se valida sin salir a la red
+    entrada = await asyncio.to_thread(leer_cache, url)
+    if entrada and (entrada["fresca"] or SIN_RED):
+        return objetivo in texto_normalizado(entrada["texto"])
+    if SIN_RED:
+        return False
+
+    decodificador = codecs.getincrementaldecoder("utf-8")("replace")
+    anterior, pendiente, leidos = "", "", 0
     try:
-        response = requests.get(url, headers=HEADERS, timeout=5)
-        return nombre_empresa.lower() in response.text.lower()
-    except requests.exceptions.RequestException:
+        session = await obtener_sesion()
+        # Copia caducada: petición condicional; con 304 sigue valiendo la guardada
+        async with session.get(url, headers=cabeceras_condicionales(entrada)) as response:
+            if response.status == 304 and entrada:
+                await asyncio.to_thread(renovar_cache, url)
+                return objetivo in texto_normalizado(entrada["texto"])
+            async for bloque in response.content.iter_chunked(TAMANO_BLOQUE):
+                leidos += len(bloque)
+                completo, pendiente = partir_bloque(pendiente + decodificador.decode(bloque))
+                # Se arrastra el final normalizado del bloque anterior para los nombres partidos entre bloques
+                normalizado = f"{anterior} {texto_normalizado(completo)}"
+                if objetivo in normalizado:
+                    return True
+                anterior = normalizado[-len(objetivo):]
+                if leidos >= presupuesto:
+                    break
+            else:
+                # Página leída entera: la ausencia del nombre es un resultado negativo
+                return objetivo in f"{anterior} {texto_normalizado(pendiente)}"
+    except (aiohttp.ClientError, asyncio.TimeoutError):
         return False
-    
+    # Presupuesto agotado: el resto sin procesar aún puede completar el nombre; si no, sin validar
+    return True if objetivo in f"{anterior} {texto_normalizado(pendiente)}" else None
+
+async def primera_validada(candidatas, nombre_empresa, presupuesto=PRESUPUESTO_BYTES):
+    """
+    Todas las candidatas se validan a la vez; gana la primera en el orden del buscador
+    y las de menor prioridad se cancelan en cuanto hay una válida. Devuelve
+    (url o None, hay candidatas sin validar por superar el presupuesto).
+    """
+    validaciones = [
+        asyncio.ensure_future(contiene_nombre_empresa(url, nombre_empresa, presupuesto)) for url in candidatas
+    ]
+    sin_validar = False
+    try:
+        for validacion, url in zip(validaciones, candidatas):
+            resultado = await validacion
+            if resultado:
+                return url, sin_validar
+            sin_validar = sin_validar or resultado is None
+    finally:
+        for validacion in validaciones:
+            validacion.cancel()
+    return None, sin_validar
+
 # ─── Extracción de localidad desde el nombre ────────────────────────────────
 def contiene_localidad(url, nombre_empresa):
     return True # 
 
 # ─── Búsqueda asincrónica CORREGIDA ─────────────────────────────────────────
-async def buscar_url_oficial_async(nombre_empresa, modo_estricto=False):
-    loop = asyncio.get_event_loop()
+async def recordar_url(cif, nombre_empresa, url, estado, validada):
+    # Guarda la URL encontrada en el índice CIF para las próximas ejecuciones
+    await asyncio.to_thread(registrar_url, cif, url, estado, validada, nombre_empresa)
+    return url, estado
+
+async def buscar_url_oficial_async(nombre_empresa, modo_estricto=False, semaforo=None, cif=None,
+                                   presupuesto=PRESUPUESTO_BYTES):
     try:
+        # Empresa ya resuelta en otra ejecución: sin búsqueda ni validación
+        # (en modo estricto solo se reutilizan las URLs validadas por contenido)
+        conocida = await asyncio.to_thread(consultar_cif, cif, modo_estricto)
+        if conocida:
+            return conocida["url"], conocida["estado"]
+
         query = f"{nombre_empresa} sitio oficial empresa España"
-        resultados = await loop.run_in_executor(None, lambda: list(search(query, num_results=5)))
+        resultados = await buscar_async(query, num_resultados=5, semaforo=semaforo)
 
+        candidatas = []
         for url in resultados:
             # Validación de URL sospechosa
             if not url.startswith("http"):
@@ -50,15 +164,17 @@ async def buscar_url_oficial_async(nombre_empresa, modo_estricto=False):
             # Filtrar dominios no deseados
             if "google.com" in url or "youtube.com" in url or url.startswith("/search"):
                 continue
+            candidatas.append(url)
 
-            # Validación por contenido si modo_estricto está activado
-            if modo_estricto:
-                if contiene_nombre_empresa(url, nombre_empresa):
-                    return url, "Validada por contenido"
-                else:
-                    continue  # Si no contiene el nombre, sigue buscando
-            else:
-                return url, "Dominio válido"
+        # Validación por contenido si modo_estricto está activado (candidatas en paralelo)
+        if modo_estricto:
+            url, sin_validar = await primera_validada(candidatas, nombre_empresa, presupuesto)
+            if url:
+                return await recordar_url(cif, nombre_empresa, url, "Validada por contenido", True)
+            if sin_validar:
+                return "No encontrada", "Sin validar (página mayor que el presupuesto)"
+        elif candidatas:
+            return await recordar_url(cif, nombre_empresa, candidatas[0], "Dominio válido", False)
 
         return "No encontrada", "Sin resultados"
 
@@ -66,20 +182,19 @@ async def buscar_url_oficial_async(nombre_empresa, modo_estricto=False):
         return f"Error: {e}", "Error en la búsqueda"
 
 # ─── Función principal para procesar el DataFrame CORREGIDA ──────────────────
-async def procesar_dataframe(df):
+async def procesar_dataframe(df, concurrencia=CONCURRENCIA_BUSQUEDA, modo_estricto=False, presupuesto=PRESUPUESTO_BYTES):
+    # Todas las búsquedas en marcha a la vez; el semáforo acota las que salen a la red
+    semaforo = asyncio.Semaphore(concurrencia)
     tareas = [
-        (i, buscar_url_oficial_async(row['CORREGIDO_FINAL'])) 
-        for i, row in df.iterrows()
+        buscar_url_oficial_async(nombre, modo_estricto, semaforo=semaforo, cif=cif, presupuesto=presupuesto)
+        for nombre, cif in zip(df['CORREGIDO_FINAL'], df['CIF'])
     ]
 
-    resultados = [None] * len(df)  # Prepara lista vacía con mismo largo
-
-    for i, coro in tqdm(tareas, desc="Buscando URLs"):
-        try:
-            resultado = await coro
-        except Exception as e:
-            resultado = ("Error: " + str(e), "Error en la búsqueda")
-        resultados[i] = resultado  # Asigna en la posición correcta
+    # gather conserva el orden de las filas; buscar_url_oficial_async ya captura sus errores
+    try:
+        resultados = await tqdm_asyncio.gather(*tareas, desc="Buscando URLs")
+    finally:
+        await cerrar_sesion()
 
     df['URL_OFICIAL'], df['ESTADO'] = zip(*resultados)
     return df
@@ -87,8 +202,7 @@ async def procesar_dataframe(df):
 # ─── Carga y validación del CSV ───────────────────────────────────────────────
 if __name__ == "__main__":
     try:
-        RUTA_CSV = "nombres_scraping.csv"
-        df = pd.read_csv(RUTA_CSV)
+        df = leer_intermedio("nombres_scraping")
 
         REQUIRED_COLS = {"CORREGIDO_FINAL", "CIF"}
         if not REQUIRED_COLS.issubset(df.columns):
@@ -97,10 +211,10 @@ if __name__ == "__main__":
         df_resultado = asyncio.run(procesar_dataframe(df))
         
         # El archivo de salida para este script será la entrada para el siguiente
-        df_resultado.to_csv("urls.csv", index=False)
+        ruta_salida = guardar_intermedio(df_resultado, "urls")
         
-        print("✅ URLs oficiales guardadas en urls.csv")
+        print(f"✅ URLs oficiales guardadas en {ruta_salida}")
     except FileNotFoundError:
-        print("Error: El archivo 'nombres_scraping.csv' no se encuentra.")
+        print(f"Error: El archivo 'nombres_scraping.{FORMATO_INTERMEDIOS}' no se encuentra.")
     except Exception as e:
         print(f"Ocurrió un error inesperado: {e}")
\ No newline at end of file